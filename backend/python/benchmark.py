@@ -0,0 +1,1286 @@
+"""
+Benchmarks for the OR-Tools scheduler
+
+Usage:
+    python benchmark.py build [--sizes 50,100,200,400,800]
+    python benchmark.py compile [--sizes 50,100,200,400,800] [--repeat 5]
+    python benchmark.py conflict-model [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py assignment-model [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py slot-load [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py prefilter [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py profiles [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py objective-mode [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py warm-start [--input ../scheduler_input.json | --courses 60] [--time-limit 60] [--change 0.05]
+    python benchmark.py delta [--input ../scheduler_input.json | --courses 60] [--time-limit 60]
+    python benchmark.py lns [--input ../scheduler_input.json | --courses 400] [--availability 0.85] [--time-limit 20]
+    python benchmark.py greedy [--sizes 200,400,800] [--time-limit 60]
+    python benchmark.py feasibility [--sizes 200,800,5000] [--time-limit 120]
+    python benchmark.py explain [--sizes 100,400,800] [--time-limit 120]
+    python benchmark.py soft [--sizes 200,800] [--time-limit 60]
+    python benchmark.py validate [--rows 1000,10000,100000] [--repeat 3]
+    python benchmark.py conflicts [--rows 1000,5000,20000] [--repeat 5]
+    python benchmark.py worker [--input ../scheduler_input.json | --courses 20] [--requests 5] [--time-limit 10]
+    python benchmark.py decompose [--sizes 200,400] [--workers 4] [--time-limit 120]
+    python benchmark.py scale [--ladder 50,100,250,500,1000,2500,5000] [--time-limit 60] [--seed 0]
+                              [--availability 1.0] [--output scale_results.json]
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import copy
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any
+
+import compiled_problem
+from course_scheduler import CourseScheduler, OBJECTIVE_TIER_WEIGHTS
+from decomposition import DecomposedScheduler
+from feasibility import FeasibilityCheck
+from greedy_scheduler import GreedyScheduler
+from instance_generator import generate_instance, courses_for_instances
+from utils import detect_time_slot_conflicts
+from validator import ScheduleValidator
+
+def benchmark_model_build(sizes: List[int]) -> List[Dict[str, Any]]:
+    """
+    Measure scheduler set-up and decision variable creation time per catalogue size
+
+    Args:
+        sizes: Catalogue sizes (number of courses) to measure
+
+    Returns:
+        List of measurement dictionaries
+    """
+    results = []
+
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            scheduler = CourseScheduler(data)
+            init_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scheduler._create_decision_variables()
+            variables_time = time.perf_counter() - start
+
+        results.append({
+            "courses": num_courses,
+            "instances": scheduler.total_course_instances,
+            "professors": len(scheduler.professors),
+            "professor_courses": len(scheduler.professor_courses),
+            "init_seconds": round(init_time, 4),
+            "variables_seconds": round(variables_time, 4)
+        })
+
+    return results
+
+def benchmark_compile(sizes: List[int], repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    Measure problem compilation time per catalogue size, separately from solving
+
+    Args:
+        sizes: Catalogue sizes (number of courses) to measure
+        repeat: Number of compilations to average over
+
+    Returns:
+        List of measurement dictionaries
+    """
+    results = []
+
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            problem = compiled_problem.compile_problem(data)
+        compile_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            key = compiled_problem.problem_fingerprint(data)
+        fingerprint_time = (time.perf_counter() - start) / repeat
+
+        compiled_problem.clear_cache()
+        compiled_problem.compile_problem(data, key)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compiled_problem.compile_problem(data, key)
+        cached_time = (time.perf_counter() - start) / repeat
+
+        results.append({
+            "courses": num_courses,
+            "instances": problem.num_instances,
+            "professors": problem.num_professors,
+            "slots": problem.num_slots,
+            "compile_seconds": round(compile_time, 5),
+            "fingerprint_seconds": round(fingerprint_time, 5),
+            "cached_seconds": round(cached_time, 6)
+        })
+
+    return results
+
+def model_size(scheduler: CourseScheduler) -> Dict[str, int]:
+    """
+    Count variables and constraints in a scheduler's CP-SAT model
+
+    Args:
+        scheduler: Scheduler whose model has been built
+
+    Returns:
+        Dictionary with variable and constraint counts
+    """
+    proto = scheduler.model.Proto()
+    return {
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints)
+    }
+
+def slot_load_cost(scheduler: CourseScheduler) -> int:
+    """
+    Evaluate the solved schedule's slot loads with the ladder penalty
+
+    This is comparable across slot-load penalty encodings, unlike the
+    objective value itself.
+
+    Args:
+        scheduler: Scheduler whose model has been solved
+
+    Returns:
+        Total ladder penalty over all slots
+    """
+    counts = [scheduler.solver.Value(count_var) for count_var in scheduler.courses_per_timeslot.values()]
+    table = scheduler._ladder_penalty_table(max(counts, default=0))
+    return sum(table[count] for count in counts)
+
+def benchmark_option_variants(data: Dict[str, Any], variants: Dict[str, Dict[str, Any]],
+                              time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Solve the same input once per set of scheduler options and compare the runs
+
+    Args:
+        data: Scheduler input dictionary
+        variants: Mapping of variant name to the options it sets
+        time_limit: Solver time limit in seconds for each run
+
+    Returns:
+        List of measurement dictionaries, one per variant
+    """
+    results = []
+
+    for name, options in variants.items():
+        run_data = copy.deepcopy(data)
+        run_data.setdefault("options", {}).update(options)
+        run_data["options"]["maxTimeInSeconds"] = time_limit
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler = CourseScheduler(run_data)
+            result = scheduler.solve()
+
+        statistics = result.get("result", {}).get("statistics", {})
+        total_time = statistics.get("solver_time", result.get("solver_time", 0))
+        phases = statistics.get("profile", result.get("profile", {})).get("phases", {})
+        search_time = phases.get("solve", {}).get("wall_time", scheduler.solver.WallTime())
+        solved = statistics.get("solver_status") in ("OPTIMAL", "FEASIBLE")
+
+        results.append({
+            "variant": name,
+            **model_size(scheduler),
+            "build_seconds": round(total_time - search_time, 3),
+            "solve_seconds": round(search_time, 3),
+            "first_solution_seconds": round(scheduler.solution_timer.first_solution_time or 0, 3),
+            "load_cost": slot_load_cost(scheduler) if solved else None,
+            "tiers": {name: scheduler.solver.Value(tier) for name, tier in scheduler.objective_tiers} if solved else {},
+            "max_load": max(scheduler.solver.Value(v) for v in scheduler.courses_per_timeslot.values()) if solved else None,
+            "objective": scheduler.solver.ObjectiveValue() if solved else None,
+            "status": statistics.get("solver_status", result.get("status")),
+            "scheduled": statistics.get("scheduled_courses"),
+            "lns": statistics.get("lns")
+        })
+
+    return results
+
+def print_variant_table(rows: List[Dict[str, Any]]):
+    """Print the rows returned by benchmark_option_variants as a table."""
+    print(f"{'variant':>10} {'variables':>10} {'constraints':>12} {'build (s)':>10} {'first (s)':>10} "
+          f"{'solve (s)':>10} {'status':>10} {'scheduled':>10} {'load cost':>10} {'max load':>9}")
+    for row in rows:
+        print(f"{row['variant']:>10} {row['variables']:>10} {row['constraints']:>12} {row['build_seconds']:>10} "
+              f"{row['first_solution_seconds']:>10} {row['solve_seconds']:>10} {row['status']:>10} "
+              f"{str(row['scheduled']):>10} {str(row['load_cost']):>10} {str(row['max_load']):>9}")
+
+def perturb_instance(data: Dict[str, Any], fraction: float, seed: int = 0) -> Dict[str, Any]:
+    """
+    Copy an input with a fraction of its courses and professor-course assignments removed
+
+    Args:
+        data: Scheduler input dictionary
+        fraction: Fraction of courses and of professor-course assignments to remove
+        seed: Random seed
+
+    Returns:
+        Perturbed copy of the input
+    """
+    rng = random.Random(seed)
+    perturbed = copy.deepcopy(data)
+
+    removed = {c["course_id"] for c in perturbed["courses"] if rng.random() < fraction}
+    perturbed["courses"] = [c for c in perturbed["courses"] if c["course_id"] not in removed]
+    perturbed["professorCourses"] = [
+        pc for pc in perturbed.get("professorCourses", [])
+        if pc["course_id"] not in removed and rng.random() >= fraction
+    ]
+    return perturbed
+
+def benchmark_warm_start(data: Dict[str, Any], change: float, time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Compare cold and warm starts on a slightly changed input
+
+    The original input is solved once. Its schedule is then used as the hint
+    for the changed input, with and without hint repair, and compared with a
+    cold solve of the changed input.
+
+    Args:
+        data: Scheduler input dictionary
+        change: Fraction of courses and assignments removed from the input
+        time_limit: Solver time limit in seconds for each run
+
+    Returns:
+        List of measurement dictionaries, one per run
+    """
+    data = copy.deepcopy(data)
+    data.setdefault("options", {})["maxTimeInSeconds"] = time_limit
+    with contextlib.redirect_stdout(io.StringIO()):
+        previous = CourseScheduler(data).solve()
+    previous_schedule = previous.get("result", {}).get("scheduled_courses", [])
+
+    changed = perturb_instance(data, change)
+    warm = dict(changed, previousSchedule=previous_schedule)
+    variants = {
+        "cold": changed,
+        "warm": warm,
+        "warm+repair": dict(warm, options=dict(changed["options"], repairHint=True))
+    }
+
+    results = []
+    for name, run_data in variants.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler = CourseScheduler(run_data)
+            result = scheduler.solve()
+
+        statistics = result.get("result", {}).get("statistics", {})
+        solved = result.get("success", False)
+        warm_start = statistics.get("warm_start") or {}
+        results.append({
+            "variant": name,
+            "status": statistics.get("solver_status", result.get("status")),
+            "first_solution_seconds": round(scheduler.solution_timer.first_solution_time or 0, 3),
+            "solve_seconds": statistics.get("profile", {}).get("phases", {}).get("solve", {}).get("wall_time"),
+            "objective": scheduler.solver.ObjectiveValue() if solved else None,
+            "hint_survival": warm_start.get("survival_rate")
+        })
+
+    return results
+
+def benchmark_delta(data: Dict[str, Any], time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Compare a full re-solve with a delta re-solve after one availability edit
+
+    The busiest professor of the base schedule becomes unavailable on the day
+    of one of their classes.
+
+    Args:
+        data: Scheduler input dictionary
+        time_limit: Solver time limit in seconds for each run
+
+    Returns:
+        List of measurement dictionaries, one per run
+    """
+    data = copy.deepcopy(data)
+    data.setdefault("options", {})["maxTimeInSeconds"] = time_limit
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = CourseScheduler(data).solve()
+    base_schedule = base["result"]["scheduled_courses"]
+
+    # Take one teaching day away from the busiest professor
+    load = {}
+    for entry in base_schedule:
+        load[entry["professor_id"]] = load.get(entry["professor_id"], 0) + 1
+    professor_id = max(load, key=load.get)
+    lost_day = next(entry["day_of_week"] for entry in base_schedule if entry["professor_id"] == professor_id)
+
+    changed = copy.deepcopy(data)
+    availability = changed.setdefault("professorAvailability", {})
+    current = availability.get(professor_id) or {}
+    new_availability = {}
+    for slot in changed["timeSlots"]:
+        day = slot["day_of_week"]
+        if day != lost_day and (not current or slot["timeslot_id"] in current.get(day, [])):
+            new_availability.setdefault(day, []).append(slot["timeslot_id"])
+    availability[professor_id] = new_availability
+
+    base_assignments = {(e["course_id"], e["class_instance"]): (e["professor_id"], e["timeslot_id"]) for e in base_schedule}
+    variants = {
+        "full": changed,
+        "delta": dict(changed, previousSchedule=base_schedule, changes={"professors": [professor_id]},
+                      options=dict(changed["options"], deltaResolve=True))
+    }
+
+    results = []
+    for name, run_data in variants.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler = CourseScheduler(run_data)
+            result = scheduler.solve()
+
+        statistics = result.get("result", {}).get("statistics", {})
+        scheduled = result.get("result", {}).get("scheduled_courses", [])
+        moved = sum(
+            1 for e in scheduled
+            if base_assignments.get((e["course_id"], e["class_instance"])) != (e["professor_id"], e["timeslot_id"])
+        )
+        results.append({
+            "variant": name,
+            **model_size(scheduler),
+            "status": statistics.get("solver_status", result.get("status")),
+            "total_seconds": round(statistics.get("solver_time", result.get("solver_time", 0)), 3),
+            "scheduled": statistics.get("scheduled_courses"),
+            "moved": moved,
+            "free_instances": (statistics.get("delta") or {}).get("free_instances")
+        })
+
+    return results
+
+def schedule_balance(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Balance of a result's schedule, comparable across solving strategies
+
+    Args:
+        result: Scheduler result dictionary
+
+    Returns:
+        Day imbalance (busiest minus quietest day), maximum slot load and the
+        sum of squared slot loads
+    """
+    slot_loads = {}
+    day_loads = {}
+    for entry in result.get("result", {}).get("scheduled_courses", []):
+        slot_loads[entry["timeslot_id"]] = slot_loads.get(entry["timeslot_id"], 0) + 1
+        day_loads[entry["day_of_week"]] = day_loads.get(entry["day_of_week"], 0) + 1
+    return {
+        "day_imbalance": max(day_loads.values(), default=0) - min(day_loads.values(), default=0),
+        "max_load": max(slot_loads.values(), default=0),
+        "load_squares": sum(load ** 2 for load in slot_loads.values())
+    }
+
+def benchmark_decomposition(sizes: List[int], workers: int, time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Monolithic solve vs component decomposition on multi-department inputs
+
+    Args:
+        sizes: Catalogue sizes (courses) to generate, one department per 20 courses
+        workers: Process pool size of the decomposed solve
+        time_limit: Solver time limit in seconds of the monolithic solve and
+            of each subproblem
+
+    Returns:
+        List of measurement dictionaries, one per size and variant
+    """
+    results = []
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+        variants = {
+            "monolithic": (CourseScheduler, {}),
+            "decomposed": (DecomposedScheduler, {"decompositionWorkers": workers}),
+            "no-balance": (DecomposedScheduler, {"decompositionWorkers": workers, "balanceTimeLimit": 0})
+        }
+
+        monolithic_seconds = None
+        for name, (scheduler_class, options) in variants.items():
+            run_data = dict(data, options=dict(options, maxTimeInSeconds=time_limit))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = scheduler_class(run_data).solve()
+            seconds = time.perf_counter() - start
+            if monolithic_seconds is None:
+                monolithic_seconds = seconds
+
+            statistics = result.get("result", {}).get("statistics", {})
+            decomposition = statistics.get("decomposition", {})
+            results.append({
+                "courses": num_courses,
+                "variant": name,
+                "subproblems": len(decomposition.get("subproblems", [])) or 1,
+                "total_seconds": round(seconds, 3),
+                "speedup": round(monolithic_seconds / seconds, 2),
+                "status": statistics.get("solver_status", result.get("status")),
+                "scheduled": statistics.get("scheduled_courses"),
+                **schedule_balance(result)
+            })
+
+    return results
+
+def benchmark_greedy(sizes: List[int], time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Greedy drafts on their own and as CP-SAT hints
+
+    Args:
+        sizes: Catalogue sizes (courses) to generate
+        time_limit: Solver time limit in seconds of the CP-SAT runs
+
+    Returns:
+        List of measurement dictionaries, one per size and variant
+    """
+    results = []
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            draft = GreedyScheduler(data).solve()
+        results.append({
+            "courses": num_courses,
+            "variant": "greedy",
+            "seconds": round(time.perf_counter() - start, 3),
+            "first_solution_seconds": None,
+            "status": draft["result"]["statistics"]["solver_status"],
+            "scheduled": draft["result"]["statistics"]["scheduled_courses"],
+            "objective": None,
+            **schedule_balance(draft)
+        })
+
+        for name, options in (("cp-sat", {}), ("greedy-hint", {"greedyHint": True})):
+            run_data = dict(data, options=dict(options, maxTimeInSeconds=time_limit))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                scheduler = CourseScheduler(run_data)
+                result = scheduler.solve()
+            solved = result.get("success", False)
+            results.append({
+                "courses": num_courses,
+                "variant": name,
+                "seconds": round(time.perf_counter() - start, 3),
+                "first_solution_seconds": round(scheduler.solution_timer.first_solution_time or 0, 3),
+                "status": result.get("result", {}).get("statistics", {}).get("solver_status", result.get("status")),
+                "scheduled": result.get("result", {}).get("statistics", {}).get("scheduled_courses"),
+                "objective": scheduler.solver.ObjectiveValue() if solved else None,
+                **schedule_balance(result)
+            })
+
+    return results
+
+def oversubscribe_professors(data: Dict[str, Any], num_professors: int = 2, extra: int = 1) -> Dict[str, Any]:
+    """
+    Copy an input in which a few new professors are the only ones qualified for too many courses
+
+    The professors share every single-class course of the most common
+    duration, up to one slot per professor and slot of that duration plus
+    extra, so the copy is infeasible although every course on its own has a
+    qualified, available professor.
+
+    Args:
+        data: Scheduler input dictionary
+        num_professors: Number of professors to add
+        extra: Number of courses beyond the professors' slot capacity
+
+    Returns:
+        Infeasible copy of the input
+    """
+    overloaded = copy.deepcopy(data)
+    durations = [slot["duration_minutes"] for slot in data["timeSlots"]]
+    duration = max(set(durations), key=durations.count)
+    capacity = num_professors * durations.count(duration)
+    courses = [
+        c["course_id"] for c in data["courses"]
+        if c["duration_minutes"] == duration and c.get("num_classes", 1) == 1
+    ][:capacity + extra]
+
+    professor_ids = [f"OVERLOADED-{n}" for n in range(num_professors)]
+    overloaded["professors"] += [dict(data["professors"][0], professor_id=p) for p in professor_ids]
+    overloaded["professorCourses"] = [
+        pc for pc in data.get("professorCourses", []) if pc["course_id"] not in courses
+    ] + [{"professor_id": p, "course_id": c} for c in courses for p in professor_ids]
+    return overloaded
+
+def benchmark_feasibility(sizes: List[int], time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Pre-check time on feasible inputs, and time to an answer on infeasible ones
+
+    Args:
+        sizes: Catalogue sizes (courses) to generate
+        time_limit: Solver time limit in seconds of the runs without pre-checks
+
+    Returns:
+        List of measurement dictionaries, one per size and variant
+    """
+    results = []
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+        problem = compiled_problem.compile_problem(data)
+        check = FeasibilityCheck(problem)
+        passed = check.run()
+        results.append({
+            "courses": num_courses,
+            "variant": "feasible",
+            "seconds": round(check.seconds, 4),
+            "status": "passed" if passed else "failed",
+            "issue": None
+        })
+
+        infeasible = oversubscribe_professors(data)
+        for name, enabled in (("pre-check", True), ("cp-sat only", False)):
+            run_data = dict(infeasible, options={"feasibilityCheck": enabled, "maxTimeInSeconds": time_limit})
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = CourseScheduler(run_data).solve()
+            results.append({
+                "courses": num_courses,
+                "variant": name,
+                "seconds": round(time.perf_counter() - start, 3),
+                "status": result.get("status", "FEASIBLE"),
+                "issue": (result.get("issues") or [None])[-1]
+            })
+
+    return results
+
+def back_to_back_conflict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy an input in which one professor must teach two courses in back-to-back slots
+
+    A new professor is the only one qualified for two single-class courses
+    and is available in just the first two slots of their duration on the
+    first teaching day. The pre-solve checks pass, since each slot counts
+    once, but the break rule makes the copy infeasible.
+
+    Args:
+        data: Scheduler input dictionary
+
+    Returns:
+        Infeasible copy of the input
+    """
+    conflict = copy.deepcopy(data)
+    duration = data["timeSlots"][0]["duration_minutes"]
+    day = data["timeSlots"][0]["day_of_week"]
+    slots = sorted(
+        (slot for slot in data["timeSlots"] if slot["duration_minutes"] == duration and slot["day_of_week"] == day),
+        key=lambda slot: slot["start_time"]
+    )[:2]
+    courses = [
+        c["course_id"] for c in data["courses"]
+        if c["duration_minutes"] == duration and c.get("num_classes", 1) == 1
+    ][:2]
+
+    conflict["professors"].append(dict(data["professors"][0], professor_id="BACK-TO-BACK"))
+    conflict["professorCourses"] = [
+        pc for pc in data.get("professorCourses", []) if pc["course_id"] not in courses
+    ] + [{"professor_id": "BACK-TO-BACK", "course_id": c} for c in courses]
+    conflict["professorAvailability"] = dict(data.get("professorAvailability") or {},
+                                             **{"BACK-TO-BACK": {day: [slot["timeslot_id"] for slot in slots]}})
+    return conflict
+
+def benchmark_explain(sizes: List[int], time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Time to prove infeasibility and to extract a minimal infeasible core
+
+    Args:
+        sizes: Catalogue sizes (courses) to generate
+        time_limit: Solver time limit in seconds, also used for the explanation
+
+    Returns:
+        List of measurement dictionaries, one per size
+    """
+    results = []
+    for num_courses in sizes:
+        data = back_to_back_conflict(generate_instance(num_courses))
+        # The pre-checks already reject this input, so skip them to time the explanation
+        data["options"] = {"maxTimeInSeconds": time_limit, "explainTimeLimit": time_limit, "feasibilityCheck": False}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = CourseScheduler(data).solve()
+        explanation = result.get("infeasible_core") or {}
+        total = time.perf_counter() - start
+        results.append({
+            "courses": num_courses,
+            "status": result.get("status", "FEASIBLE"),
+            "solve_seconds": round(total - explanation.get("seconds", 0), 3),
+            "explain_seconds": explanation.get("seconds"),
+            "guarded_groups": explanation.get("guarded_groups"),
+            "minimal": explanation.get("minimal"),
+            "core": [entry["description"] for entry in explanation.get("core", [])]
+        })
+    return results
+
+def benchmark_soft_completion(sizes: List[int], time_limit: float) -> List[Dict[str, Any]]:
+    """
+    Hard vs soft completion on feasible and oversubscribed inputs
+
+    Args:
+        sizes: Catalogue sizes (courses) to generate
+        time_limit: Solver time limit in seconds
+
+    Returns:
+        List of measurement dictionaries, one per size, input and mode
+    """
+    results = []
+    for num_courses in sizes:
+        data = generate_instance(num_courses)
+        for variant, run_input in (("feasible", data), ("oversubscribed", oversubscribe_professors(data))):
+            for mode, soft in (("hard", False), ("soft", True)):
+                run_data = dict(run_input, options={"softCompletion": soft, "maxTimeInSeconds": time_limit})
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = CourseScheduler(run_data).solve()
+                statistics = result.get("result", {}).get("statistics", {})
+                conflicts = result.get("result", {}).get("conflicts", [])
+                results.append({
+                    "courses": num_courses,
+                    "variant": variant,
+                    "mode": mode,
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "status": statistics.get("solver_status", result.get("status")),
+                    "instances": statistics.get("total_courses"),
+                    "scheduled": statistics.get("scheduled_courses", 0),
+                    "core_unscheduled": statistics.get("completion", {}).get("core_unscheduled"),
+                    "reason": conflicts[0]["blocking_reason"] if conflicts else None
+                })
+
+    return results
+
+def random_schedule(data: Dict[str, Any], seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Scheduled course rows with random but plausible assignments
+
+    Every course gets one of its qualified professors and one slot number of
+    its duration; multi-class courses follow a random day pattern. Nothing
+    prevents clashes, so the rows exercise every validator rule.
+
+    Args:
+        data: Scheduler input dictionary from generate_instance
+        seed: Random seed
+
+    Returns:
+        Rows shaped like result.scheduled_courses
+    """
+    rng = random.Random(seed)
+    professors = {}
+    for pc in data["professorCourses"]:
+        professors.setdefault(pc["course_id"], []).append(pc["professor_id"])
+    numbers = {}
+    days = []
+    for slot in data["timeSlots"]:
+        number, day = slot["timeslot_id"].split("-")
+        numbers.setdefault(slot["duration_minutes"], set()).add(number)
+        if day not in days:
+            days.append(day)
+    patterns = {2: [("MON", "WED"), ("TUE", "THU")], 3: [("MON", "TUE", "THU")]}
+
+    rows = []
+    for course in data["courses"]:
+        num_classes = course.get("num_classes", 1)
+        number = rng.choice(sorted(numbers[course["duration_minutes"]]))
+        course_days = rng.choice(patterns[num_classes]) if num_classes > 1 else (rng.choice(days),)
+        professor_id = rng.choice(professors.get(course["course_id"]) or [data["professors"][0]["professor_id"]])
+        for instance, day in enumerate(course_days, 1):
+            rows.append({
+                "scheduled_course_id": f"SC-{course['course_id']}_{instance}",
+                "course_id": course["course_id"],
+                "professor_id": professor_id,
+                "timeslot_id": f"{number}-{day}",
+                "class_instance": instance,
+                "is_override": False
+            })
+    return rows
+
+def benchmark_validator(row_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Validator time against the number of scheduled rows
+
+    Each size is also run with the cyclic garbage collector paused, which
+    is only safe in this single-threaded harness: the rows allocate many
+    small containers that the collector otherwise rescans.
+
+    Args:
+        row_counts: Target numbers of scheduled rows
+        repeat: Runs per size; the fastest is reported
+
+    Returns:
+        List of measurement dictionaries, one per size
+    """
+    results = []
+    for num_rows in row_counts:
+        data = generate_instance(courses_for_instances(num_rows), availability_density=0.85)
+        rows = random_schedule(data)
+        index_start = time.perf_counter()
+        validator = ScheduleValidator(data)
+        index_seconds = time.perf_counter() - index_start
+        report = min((validator.validate(rows) for _ in range(repeat)), key=lambda r: r["seconds"])
+        gc.disable()
+        try:
+            paused = min(validator.validate(rows)["seconds"] for _ in range(repeat))
+        finally:
+            gc.enable()
+        results.append({
+            "rows": len(rows),
+            "index_seconds": round(index_seconds, 4),
+            "validate_seconds": report["seconds"],
+            "validate_seconds_gc_paused": paused,
+            "microseconds_per_row": round(report["seconds"] / len(rows) * 1e6, 2),
+            "violations": report["counts"]
+        })
+    return results
+
+def legacy_detect_time_slot_conflicts(scheduled_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The original utils.detect_time_slot_conflicts, kept as the benchmark baseline
+
+    Detect conflicts where multiple courses are scheduled in the same time slot
+
+    Args:
+        scheduled_courses: List of scheduled course dictionaries
+
+    Returns:
+        List of conflicts
+    """
+    conflicts = []
+
+    # Group courses by time slot
+    courses_by_slot = {}
+
+    for course in scheduled_courses:
+        day = course.get('day_of_week')
+        slot_id = course.get('timeslot_id')
+
+        if day and slot_id:
+            key = f"{day}_{slot_id}"
+
+            if key not in courses_by_slot:
+                courses_by_slot[key] = []
+
+            courses_by_slot[key].append(course)
+
+    # Check for conflicts
+    for slot_key, courses in courses_by_slot.items():
+        if len(courses) > 1:
+            day, slot_id = slot_key.split('_')
+
+            # Check for core course conflicts
+            core_courses = [c for c in courses if c.get('is_core', False)]
+            if len(core_courses) > 1:
+                conflicts.append({
+                    "conflict_type": "CORE_COURSE_CONFLICT",
+                    "day_of_week": day,
+                    "timeslot_id": slot_id,
+                    "courses": core_courses,
+                    "description": "Multiple core courses scheduled at the same time"
+                })
+
+            # Check for professor conflicts
+            professors = {}
+            for course in courses:
+                prof_id = course.get('professor_id')
+                if prof_id:
+                    if prof_id not in professors:
+                        professors[prof_id] = []
+
+                    professors[prof_id].append(course)
+
+            for prof_id, prof_courses in professors.items():
+                if len(prof_courses) > 1:
+                    conflicts.append({
+                        "conflict_type": "PROFESSOR_CONFLICT",
+                        "day_of_week": day,
+                        "timeslot_id": slot_id,
+                        "professor_id": prof_id,
+                        "courses": prof_courses,
+                        "description": f"Professor {prof_id} is scheduled to teach multiple courses at the same time"
+                    })
+
+    return conflicts
+
+def benchmark_conflict_detection(row_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    utils.detect_time_slot_conflicts against the original implementation
+
+    The rows are greedy drafts of generated catalogues, shaped like solver
+    output, with is_core copied from course_data so both implementations
+    see the same rows. Each size is run without program_ids, where both
+    find the same conflicts, and with them, where only the indexed
+    implementation also reports program clashes (programs are not part of
+    the greedy model).
+
+    Args:
+        row_counts: Target numbers of scheduled rows
+        repeat: Runs per size and implementation; the fastest is reported
+
+    Returns:
+        List of measurement dictionaries, one per size and implementation
+    """
+    results = []
+    for num_rows in row_counts:
+        data = generate_instance(courses_for_instances(num_rows))
+        drafts = GreedyScheduler(data).solve()["result"]["scheduled_courses"]
+
+        for programs in (False, True):
+            rows = [dict(row, is_core=row["course_data"]["is_core"],
+                         program_ids=row["course_data"]["program_ids"] if programs else [])
+                    for row in drafts]
+            for name, detect in (("original", legacy_detect_time_slot_conflicts), ("indexed", detect_time_slot_conflicts)):
+                seconds = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    conflicts = detect(rows)
+                    elapsed = time.perf_counter() - start
+                    seconds = elapsed if seconds is None else min(seconds, elapsed)
+                counts = {}
+                for conflict in conflicts:
+                    counts[conflict["conflict_type"]] = counts.get(conflict["conflict_type"], 0) + 1
+                results.append({
+                    "rows": len(rows),
+                    "programs": programs,
+                    "implementation": name,
+                    "milliseconds": round(seconds * 1000, 2),
+                    "conflicts": counts
+                })
+    return results
+
+def benchmark_worker(data: Dict[str, Any], num_requests: int) -> Dict[str, Any]:
+    """
+    Request latency of one scheduler_interface.py process per request vs a warm worker
+
+    Args:
+        data: Scheduler input sent with every request
+        num_requests: Requests per variant
+
+    Returns:
+        Dictionary with the per-request latencies of both variants and the
+        worker's start-up and warm-up times
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scheduler_interface.py")
+    payload = json.dumps(data)
+
+    cold = []
+    for _ in range(num_requests):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script], input=payload, capture_output=True, text=True, check=True)
+        cold.append(round(time.perf_counter() - start, 4))
+
+    start = time.perf_counter()
+    worker = subprocess.Popen([sys.executable, script, "--worker"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True)
+
+    def request(message):
+        worker.stdin.write(json.dumps(message) + "\n")
+        worker.stdin.flush()
+        while True:
+            response = json.loads(worker.stdout.readline())
+            if response.get("id") == message["id"] and response["type"] != "event":
+                return response
+
+    json.loads(worker.stdout.readline())
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    request({"id": "warmup", "type": "warmup", "data": data})
+    warmup = time.perf_counter() - start
+
+    warm = []
+    for n in range(num_requests):
+        start = time.perf_counter()
+        request({"id": f"solve-{n}", "type": "solve", "data": data})
+        warm.append(round(time.perf_counter() - start, 4))
+    request({"id": "shutdown", "type": "shutdown"})
+    worker.stdin.close()
+    worker.wait()
+
+    return {"cold": cold, "warm": warm, "worker_ready": round(ready, 4), "worker_warmup": round(warmup, 4)}
+
+def run_scale_point(num_instances: int, seed: int, time_limit: float,
+                    availability_density: float) -> Dict[str, Any]:
+    """
+    Generate and solve one instance of the scaling benchmark
+
+    Args:
+        num_instances: Target number of course instances
+        seed: Generator seed
+        time_limit: Solver time limit in seconds
+        availability_density: Professor availability density
+
+    Returns:
+        Measurement dictionary
+    """
+    data = generate_instance(courses_for_instances(num_instances), seed,
+                             availability_density=availability_density)
+    data["options"] = {"maxTimeInSeconds": time_limit}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler = CourseScheduler(data)
+        result = scheduler.solve()
+
+    statistics = result.get("result", {}).get("statistics", {})
+    profile = statistics.get("profile", result.get("profile", {}))
+    phases = profile.get("phases", {})
+    solved = result.get("success", False)
+
+    return {
+        "target_instances": num_instances,
+        "instances": scheduler.total_course_instances,
+        "courses": len(scheduler.courses),
+        "professors": len(scheduler.professors),
+        "seed": seed,
+        "variables": profile.get("variables"),
+        "constraints": profile.get("constraints"),
+        "build_seconds": round(sum(entry["wall_time"] for name, entry in phases.items()
+                                   if name not in ("solve", "extract_solution")), 4),
+        "solve_seconds": phases.get("solve", {}).get("wall_time"),
+        "first_solution_seconds": scheduler.solution_timer.first_solution_time,
+        "status": statistics.get("solver_status", result.get("status")),
+        "objective": scheduler.solver.ObjectiveValue() if solved else None,
+        "best_bound": scheduler.solver.BestObjectiveBound() if solved else None,
+        "scheduled": statistics.get("scheduled_courses"),
+        "peak_rss_mb": phases.get("extract_solution", {}).get("process_peak_rss_mb")
+    }
+
+def benchmark_scaling(ladder: List[int], seed: int, time_limit: float,
+                      availability_density: float) -> Dict[str, Any]:
+    """
+    Run the scaling benchmark over a ladder of instance counts
+
+    Every size runs in a fresh process so peak memory is not carried over
+    from the previous size.
+
+    Args:
+        ladder: Target numbers of course instances
+        seed: Generator seed
+        time_limit: Solver time limit in seconds per size
+        availability_density: Professor availability density
+
+    Returns:
+        Machine-readable benchmark report
+    """
+    from ortools import __version__ as ortools_version
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for num_instances in ladder:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            row = executor.submit(run_scale_point, num_instances, seed, time_limit, availability_density).result()
+        print(f"{row['instances']:>9} {row['variables']:>10} {row['constraints']:>12} {row['build_seconds']:>10} "
+              f"{row['solve_seconds']:>10} {row['status']:>10} {str(row['objective']):>12} {row['peak_rss_mb']:>10}",
+              flush=True)
+        results.append(row)
+
+    return {
+        "benchmark": "scale",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "ortools": ortools_version,
+        "parameters": {
+            "ladder": ladder,
+            "seed": seed,
+            "time_limit": time_limit,
+            "availability_density": availability_density
+        },
+        "results": results
+    }
+
+def load_input(args) -> Dict[str, Any]:
+    """
+    Load the benchmark input from --input, or build a synthetic one from --courses
+
+    An input whose professorAvailability is a list of availability rows, as
+    in backend/scheduler_input.json, gets the per-professor, per-day map of
+    available slots that schedulerService.js builds from the same rows.
+    """
+    if getattr(args, "input", None):
+        with open(args.input) as f:
+            data = json.load(f)
+        if isinstance(data.get('professorAvailability'), list):
+            availability = {}
+            for row in data['professorAvailability']:
+                slots = availability.setdefault(row['professor_id'], {}).setdefault(row['day_of_week'], [])
+                if row['is_available']:
+                    slots.append(row['timeslot_id'])
+            data['professorAvailability'] = availability
+        return data
+    return generate_instance(args.courses, availability_density=getattr(args, "availability", 1.0))
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Model-build time against catalogue size")
+    build_parser.add_argument("--sizes", default="50,100,200,400,800")
+
+    compile_parser = subparsers.add_parser("compile", help="Problem compilation time against catalogue size")
+    compile_parser.add_argument("--sizes", default="50,100,200,400,800")
+    compile_parser.add_argument("--repeat", type=int, default=5)
+
+    conflict_parser = subparsers.add_parser("conflict-model", help="Pairwise vs interval professor-conflict model")
+    conflict_parser.add_argument("--input", help="Scheduler input JSON file")
+    conflict_parser.add_argument("--courses", type=int, default=60)
+    conflict_parser.add_argument("--time-limit", type=float, default=60)
+
+    assignment_parser = subparsers.add_parser("assignment-model", help="Separate vs triple-indexed assignment variables")
+    assignment_parser.add_argument("--input", help="Scheduler input JSON file")
+    assignment_parser.add_argument("--courses", type=int, default=60)
+    assignment_parser.add_argument("--time-limit", type=float, default=60)
+
+    slot_load_parser = subparsers.add_parser("slot-load", help="Slot-load penalty encodings")
+    slot_load_parser.add_argument("--input", help="Scheduler input JSON file")
+    slot_load_parser.add_argument("--courses", type=int, default=60)
+    slot_load_parser.add_argument("--time-limit", type=float, default=60)
+
+    prefilter_parser = subparsers.add_parser("prefilter", help="With and without domain pre-filtering")
+    prefilter_parser.add_argument("--input", help="Scheduler input JSON file")
+    prefilter_parser.add_argument("--courses", type=int, default=60)
+    prefilter_parser.add_argument("--time-limit", type=float, default=60)
+
+    profiles_parser = subparsers.add_parser("profiles", help="Named solver profiles and auto selection")
+    profiles_parser.add_argument("--input", help="Scheduler input JSON file")
+    profiles_parser.add_argument("--courses", type=int, default=60)
+    profiles_parser.add_argument("--time-limit", type=float, default=60)
+
+    objective_parser = subparsers.add_parser("objective-mode", help="Weighted vs lexicographic objective")
+    objective_parser.add_argument("--input", help="Scheduler input JSON file")
+    objective_parser.add_argument("--courses", type=int, default=60)
+    objective_parser.add_argument("--time-limit", type=float, default=60)
+
+    warm_parser = subparsers.add_parser("warm-start", help="Cold start vs warm start from a previous schedule")
+    warm_parser.add_argument("--input", help="Scheduler input JSON file")
+    warm_parser.add_argument("--courses", type=int, default=60)
+    warm_parser.add_argument("--time-limit", type=float, default=60)
+    warm_parser.add_argument("--change", type=float, default=0.05, help="Fraction of the input to change")
+
+    delta_parser = subparsers.add_parser("delta", help="Full vs delta re-solve after an availability edit")
+    delta_parser.add_argument("--input", help="Scheduler input JSON file")
+    delta_parser.add_argument("--courses", type=int, default=60)
+    delta_parser.add_argument("--time-limit", type=float, default=60)
+
+    lns_parser = subparsers.add_parser("lns", help="Plain CP-SAT search vs adaptive LNS at the same time limit")
+    lns_parser.add_argument("--input", help="Scheduler input JSON file")
+    lns_parser.add_argument("--courses", type=int, default=400)
+    lns_parser.add_argument("--availability", type=float, default=0.85, help="Availability density (0-1)")
+    lns_parser.add_argument("--time-limit", type=float, default=20)
+
+    greedy_parser = subparsers.add_parser("greedy", help="Greedy drafts alone and as CP-SAT hints")
+    greedy_parser.add_argument("--sizes", default="200,400,800")
+    greedy_parser.add_argument("--time-limit", type=float, default=60)
+
+    feasibility_parser = subparsers.add_parser("feasibility", help="Pre-solve checks on feasible and infeasible inputs")
+    feasibility_parser.add_argument("--sizes", default="200,800,5000")
+    feasibility_parser.add_argument("--time-limit", type=float, default=120)
+
+    explain_parser = subparsers.add_parser("explain", help="Minimal infeasible core of a back-to-back conflict")
+    explain_parser.add_argument("--sizes", default="100,400,800")
+    explain_parser.add_argument("--time-limit", type=float, default=120)
+
+    soft_parser = subparsers.add_parser("soft", help="Hard vs soft completion on feasible and oversubscribed inputs")
+    soft_parser.add_argument("--sizes", default="200,800")
+    soft_parser.add_argument("--time-limit", type=float, default=60)
+
+    validate_parser = subparsers.add_parser("validate", help="Schedule validator time against schedule size")
+    validate_parser.add_argument("--rows", default="1000,10000,100000")
+    validate_parser.add_argument("--repeat", type=int, default=3)
+
+    conflicts_parser = subparsers.add_parser("conflicts", help="Indexed vs original time-slot conflict detection")
+    conflicts_parser.add_argument("--rows", default="1000,5000,20000")
+    conflicts_parser.add_argument("--repeat", type=int, default=5)
+
+    worker_parser = subparsers.add_parser("worker", help="Process per request vs persistent worker latency")
+    worker_parser.add_argument("--input", help="Scheduler input JSON file")
+    worker_parser.add_argument("--courses", type=int, default=20)
+    worker_parser.add_argument("--requests", type=int, default=5)
+    worker_parser.add_argument("--time-limit", type=float, default=10)
+
+    decompose_parser = subparsers.add_parser("decompose", help="Monolithic vs component-decomposed solve")
+    decompose_parser.add_argument("--sizes", default="200,400")
+    decompose_parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    decompose_parser.add_argument("--time-limit", type=float, default=120)
+
+    scale_parser = subparsers.add_parser("scale", help="Build/solve time and memory over a size ladder")
+    scale_parser.add_argument("--ladder", default="50,100,250,500,1000,2500,5000",
+                              help="Target numbers of course instances")
+    scale_parser.add_argument("--time-limit", type=float, default=60)
+    scale_parser.add_argument("--seed", type=int, default=0)
+    scale_parser.add_argument("--availability", type=float, default=1.0, help="Availability density (0-1)")
+    scale_parser.add_argument("--output", default="scale_results.json")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'instances':>10} {'profs':>6} {'prof-courses':>13} {'init (s)':>10} {'variables (s)':>14}")
+        for row in benchmark_model_build(sizes):
+            print(f"{row['courses']:>8} {row['instances']:>10} {row['professors']:>6} "
+                  f"{row['professor_courses']:>13} {row['init_seconds']:>10} {row['variables_seconds']:>14}")
+
+    elif args.command == "compile":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'instances':>10} {'profs':>6} {'slots':>6} {'compile (s)':>12} "
+              f"{'fingerprint (s)':>16} {'cached (s)':>11}")
+        for row in benchmark_compile(sizes, args.repeat):
+            print(f"{row['courses']:>8} {row['instances']:>10} {row['professors']:>6} {row['slots']:>6} "
+                  f"{row['compile_seconds']:>12} {row['fingerprint_seconds']:>16} {row['cached_seconds']:>11}")
+
+    elif args.command == "conflict-model":
+        print_variant_table(benchmark_option_variants(load_input(args), {
+            "pairwise": {"professorConflictModel": "pairwise"},
+            "interval": {"professorConflictModel": "interval"}
+        }, args.time_limit))
+
+    elif args.command == "assignment-model":
+        print_variant_table(benchmark_option_variants(load_input(args), {
+            "separate": {"assignmentModel": "separate"},
+            "triple": {"assignmentModel": "triple"}
+        }, args.time_limit))
+
+    elif args.command == "slot-load":
+        print_variant_table(benchmark_option_variants(load_input(args), {
+            "ladder": {"slotLoadPenalty": "ladder"},
+            "table": {"slotLoadPenalty": "table"},
+            "convex": {"slotLoadPenalty": "convex"},
+            "squared": {"slotLoadPenalty": "squared"}
+        }, args.time_limit))
+
+    elif args.command == "prefilter":
+        print_variant_table(benchmark_option_variants(load_input(args), {
+            "off": {"domainPrefilter": False},
+            "on": {"domainPrefilter": True}
+        }, args.time_limit))
+
+    elif args.command == "profiles":
+        print_variant_table(benchmark_option_variants(load_input(args), {
+            "draft": {"solverProfile": "draft"},
+            "quick": {"solverProfile": "quick"},
+            "balanced": {"solverProfile": "balanced"},
+            "thorough": {"solverProfile": "thorough"},
+            "auto": {"solverProfile": "auto"}
+        }, args.time_limit))
+
+    elif args.command == "objective-mode":
+        rows = benchmark_option_variants(load_input(args), {
+            "weighted": {"objectiveMode": "weighted"},
+            "lexicographic": {"objectiveMode": "lexicographic"}
+        }, args.time_limit)
+        print_variant_table(rows)
+        print()
+        print(f"{'variant':>14} " + " ".join(f"{name:>16}" for name in OBJECTIVE_TIER_WEIGHTS))
+        for row in rows:
+            print(f"{row['variant']:>14} " + " ".join(f"{str(row['tiers'].get(name)):>16}" for name in OBJECTIVE_TIER_WEIGHTS))
+
+    elif args.command == "warm-start":
+        print(f"{'variant':>12} {'status':>10} {'first (s)':>10} {'solve (s)':>10} {'objective':>12} {'hint survival':>14}")
+        for row in benchmark_warm_start(load_input(args), args.change, args.time_limit):
+            print(f"{row['variant']:>12} {row['status']:>10} {row['first_solution_seconds']:>10} "
+                  f"{str(row['solve_seconds']):>10} {str(row['objective']):>12} {str(row['hint_survival']):>14}")
+
+    elif args.command == "delta":
+        print(f"{'variant':>8} {'variables':>10} {'constraints':>12} {'status':>10} {'total (s)':>10} "
+              f"{'scheduled':>10} {'moved':>6} {'free':>6}")
+        for row in benchmark_delta(load_input(args), args.time_limit):
+            print(f"{row['variant']:>8} {row['variables']:>10} {row['constraints']:>12} {row['status']:>10} "
+                  f"{row['total_seconds']:>10} {str(row['scheduled']):>10} {row['moved']:>6} {str(row['free_instances']):>6}")
+
+    elif args.command == "lns":
+        rows = benchmark_option_variants(load_input(args), {
+            "cp-sat": {"lns": False},
+            "lns": {"lns": True}
+        }, args.time_limit)
+        print_variant_table(rows)
+        print()
+        for row in rows:
+            print(f"{row['variant']}: objective {row['objective']}")
+            if row["lns"]:
+                print(f"  {row['lns']['iterations']} iterations")
+                for step in row["lns"]["trajectory"]:
+                    print(f"  {step['elapsed']:>8}s  {step['neighbourhood']:>17}  {step['courses_relaxed']:>5} courses  "
+                          f"objective {step['objective']}")
+                for kind, entry in row["lns"]["neighbourhoods"].items():
+                    print(f"  {kind:>17}: tried {entry['tried']}, improved {entry['improved']}, "
+                          f"gain {entry['gain']}, weight {entry['weight']}")
+
+    elif args.command == "greedy":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'variant':>12} {'total (s)':>10} {'first (s)':>10} {'status':>10} {'scheduled':>10} "
+              f"{'objective':>12} {'day imbal':>10} {'max load':>9}")
+        for row in benchmark_greedy(sizes, args.time_limit):
+            print(f"{row['courses']:>8} {row['variant']:>12} {row['seconds']:>10} {str(row['first_solution_seconds']):>10} "
+                  f"{row['status']:>10} {str(row['scheduled']):>10} {str(row['objective']):>12} "
+                  f"{row['day_imbalance']:>10} {row['max_load']:>9}", flush=True)
+
+    elif args.command == "feasibility":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'variant':>12} {'seconds':>10} {'status':>12}  issue")
+        for row in benchmark_feasibility(sizes, args.time_limit):
+            print(f"{row['courses']:>8} {row['variant']:>12} {row['seconds']:>10} {row['status']:>12}  "
+                  f"{row['issue'] or ''}", flush=True)
+
+    elif args.command == "explain":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'status':>12} {'solve (s)':>10} {'explain (s)':>12} {'groups':>7} {'minimal':>8}  core")
+        for row in benchmark_explain(sizes, args.time_limit):
+            print(f"{row['courses']:>8} {row['status']:>12} {row['solve_seconds']:>10} {str(row['explain_seconds']):>12} "
+                  f"{str(row['guarded_groups']):>7} {str(row['minimal']):>8}  {'; '.join(row['core'])}", flush=True)
+
+    elif args.command == "soft":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'variant':>15} {'mode':>5} {'seconds':>8} {'status':>10} {'scheduled':>10} "
+              f"{'core left':>10}  first blocking reason")
+        for row in benchmark_soft_completion(sizes, args.time_limit):
+            print(f"{row['courses']:>8} {row['variant']:>15} {row['mode']:>5} {row['seconds']:>8} {row['status']:>10} "
+                  f"{str(row['scheduled']):>10} {str(row['core_unscheduled']):>10}  {row['reason'] or ''}", flush=True)
+
+    elif args.command == "validate":
+        row_counts = [int(rows) for rows in args.rows.split(',')]
+        print(f"{'rows':>8} {'index (s)':>10} {'check (s)':>10} {'no gc (s)':>10} {'us/row':>8}  violations")
+        for row in benchmark_validator(row_counts, args.repeat):
+            print(f"{row['rows']:>8} {row['index_seconds']:>10} {row['validate_seconds']:>10} "
+                  f"{row['validate_seconds_gc_paused']:>10} {row['microseconds_per_row']:>8}  {row['violations']}",
+                  flush=True)
+
+    elif args.command == "conflicts":
+        row_counts = [int(rows) for rows in args.rows.split(',')]
+        print(f"{'rows':>8} {'programs':>9} {'implementation':>15} {'ms':>9}  conflicts")
+        for row in benchmark_conflict_detection(row_counts, args.repeat):
+            print(f"{row['rows']:>8} {str(row['programs']):>9} {row['implementation']:>15} "
+                  f"{row['milliseconds']:>9}  {row['conflicts']}", flush=True)
+
+    elif args.command == "worker":
+        data = load_input(args)
+        data["options"] = dict(data.get("options", {}), maxTimeInSeconds=args.time_limit)
+        report = benchmark_worker(data, args.requests)
+        print(f"Worker ready in {report['worker_ready']}s, warm-up {report['worker_warmup']}s")
+        print(f"{'request':>8} {'cold (s)':>9} {'warm (s)':>9}")
+        for n, (cold, warm) in enumerate(zip(report["cold"], report["warm"]), 1):
+            print(f"{n:>8} {cold:>9} {warm:>9}")
+        print(f"{'median':>8} {sorted(report['cold'])[len(report['cold']) // 2]:>9} "
+              f"{sorted(report['warm'])[len(report['warm']) // 2]:>9}")
+
+    elif args.command == "decompose":
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'courses':>8} {'variant':>11} {'parts':>6} {'total (s)':>10} {'speedup':>8} {'status':>10} "
+              f"{'scheduled':>10} {'day imbal':>10} {'max load':>9} {'load^2':>8}")
+        for row in benchmark_decomposition(sizes, args.workers, args.time_limit):
+            print(f"{row['courses']:>8} {row['variant']:>11} {row['subproblems']:>6} {row['total_seconds']:>10} "
+                  f"{row['speedup']:>8} {row['status']:>10} {str(row['scheduled']):>10} {row['day_imbalance']:>10} "
+                  f"{row['max_load']:>9} {row['load_squares']:>8}", flush=True)
+
+    elif args.command == "scale":
+        ladder = [int(size) for size in args.ladder.split(',')]
+        print(f"{'instances':>9} {'variables':>10} {'constraints':>12} {'build (s)':>10} {'solve (s)':>10} "
+              f"{'status':>10} {'objective':>12} {'peak MB':>10}")
+        report = benchmark_scaling(ladder, args.seed, args.time_limit, args.availability)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Compiled, integer-indexed representation of the scheduler input
+
+Courses, course instances, professors and time slots are numbered densely
+(0..n-1, in input order) and their attributes are stored in NumPy arrays, so
+model building and solution extraction never need to parse string IDs. Time
+slot numbering and attributes live in the problem's TimeGrid.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from time_grid import TimeGrid, DEFAULT_TEACHING_DAYS
+
+# Number of compiled problems kept by compile_problem()
+CACHE_SIZE = 8
+
+_cache = OrderedDict()
+
+class CompiledProblem:
+    """Dense integer-indexed view of a scheduler input"""
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Compile the scheduler input
+
+        Args:
+            data: Scheduler input dictionary (courses, professors, timeSlots,
+                professorAvailability, professorCourses, and the teachingDays
+                and dayPatterns options)
+        """
+        options = data.get('options', {})
+
+        self._compile_courses(data['courses'])
+        self._compile_professors(data['professors'])
+        self.grid = TimeGrid(data['timeSlots'],
+                             options.get('teachingDays', DEFAULT_TEACHING_DAYS),
+                             options.get('dayPatterns'))
+        self._compile_availability(data['professorAvailability'])
+        self._compile_qualifications(data['courses'], data['professors'], data.get('professorCourses', []))
+
+        # Compiled problems are shared through the cache, so keep them read-only
+        for value in vars(self).values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+    def _compile_courses(self, courses: List[Dict[str, Any]]):
+        """Number courses and expand them into course instances."""
+        self.course_ids = [c['course_id'] for c in courses]
+        self.course_index = {course_id: c for c, course_id in enumerate(self.course_ids)}
+        self.num_courses = len(self.course_ids)
+
+        self.course_duration = np.array([c['duration_minutes'] for c in courses], dtype=np.int32)
+        self.course_is_core = np.array([bool(c.get('is_core', False)) for c in courses], dtype=bool)
+        self.course_num_classes = np.array([c.get('num_classes', 1) for c in courses], dtype=np.int32)
+
+        # Instances of course c are course_first_instance[c] .. course_first_instance[c + 1] - 1
+        self.course_first_instance = np.zeros(self.num_courses + 1, dtype=np.int32)
+        np.cumsum(self.course_num_classes, out=self.course_first_instance[1:])
+        self.num_instances = int(self.course_first_instance[-1])
+
+        self.instance_course = np.repeat(np.arange(self.num_courses, dtype=np.int32), self.course_num_classes)
+        self.instance_number = (
+            np.arange(self.num_instances, dtype=np.int32)
+            - self.course_first_instance[self.instance_course] + 1
+        )
+
+        # String IDs are only kept for variable names and output
+        self.instance_ids = [
+            f"{self.course_ids[c]}_{n}"
+            for c, n in zip(self.instance_course.tolist(), self.instance_number.tolist())
+        ]
+
+    def _compile_professors(self, professors: List[Dict[str, Any]]):
+        """Number professors."""
+        self.professor_ids = [p['professor_id'] for p in professors]
+        self.professor_index = {prof_id: p for p, prof_id in enumerate(self.professor_ids)}
+        self.num_professors = len(self.professor_ids)
+
+    def _compile_availability(self, professor_availability: Any):
+        """
+        Build the professor x slot availability bitmap.
+
+        Professors without availability data are available everywhere; a
+        professor with data is unavailable on any day that is not listed.
+        """
+        slot_index = self.grid.slot_index
+        self.available = np.ones((self.num_professors, self.grid.num_slots), dtype=bool)
+
+        if not isinstance(professor_availability, dict):
+            return
+
+        for prof_id, days in professor_availability.items():
+            p = self.professor_index.get(prof_id)
+            if p is None:
+                continue
+
+            row = np.zeros(self.grid.num_slots, dtype=bool)
+            for slot_ids in days.values():
+                for slot_id in slot_ids:
+                    s = slot_index.get(slot_id)
+                    if s is not None:
+                        row[s] = True
+            self.available[p] = row
+
+    def _compile_qualifications(self, courses: List[Dict[str, Any]], professors: List[Dict[str, Any]],
+                                professor_courses: List[Dict[str, Any]]):
+        """
+        Build the course x professor qualification matrix.
+
+        Professor-course assignments are authoritative when present; otherwise
+        professors can teach the courses of their own department.
+        """
+        self.qualified = np.zeros((self.num_courses, self.num_professors), dtype=bool)
+
+        if professor_courses:
+            for pc in professor_courses:
+                c = self.course_index.get(pc['course_id'])
+                p = self.professor_index.get(pc['professor_id'])
+                if c is not None and p is not None:
+                    self.qualified[c, p] = True
+            return
+
+        departments = {}
+        course_department = np.array(
+            [departments.setdefault(c.get('department_id'), len(departments)) for c in courses], dtype=np.int32
+        )
+        professor_department = np.array(
+            [departments.setdefault(p.get('department_id'), len(departments)) for p in professors], dtype=np.int32
+        )
+        self.qualified = course_department[:, None] == professor_department[None, :]
+
+    def instances_of(self, c: int) -> range:
+        """Instance indices of course c, in class order."""
+        return range(int(self.course_first_instance[c]), int(self.course_first_instance[c + 1]))
+
+def problem_fingerprint(data: Dict[str, Any]) -> str:
+    """
+    Fingerprint the parts of a scheduler input that affect compilation
+
+    Args:
+        data: Scheduler input dictionary
+
+    Returns:
+        Hex digest identifying the compiled problem
+    """
+    options = data.get('options', {})
+    relevant = {
+        key: data.get(key)
+        for key in ('courses', 'professors', 'timeSlots', 'professorAvailability', 'professorCourses')
+    }
+    relevant.update({key: options.get(key) for key in ('teachingDays', 'dayPatterns')})
+    encoded = json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+def compile_problem(data: Dict[str, Any], cache_key: Optional[str] = None) -> CompiledProblem:
+    """
+    Compile a scheduler input, reusing a cached result for a known key
+
+    Hashing the input costs about as much as compiling it, so results are only
+    cached under a key supplied by the caller (e.g. problem_fingerprint(data)
+    computed once by a long-lived process).
+
+    Args:
+        data: Scheduler input dictionary
+        cache_key: Key to look up and store the result under, or None to skip the cache
+
+    Returns:
+        Compiled problem (shared and read-only when cached)
+    """
+    if cache_key is None:
+        return CompiledProblem(data)
+
+    if cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+
+    problem = CompiledProblem(data)
+    _cache[cache_key] = problem
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return problem
+
+def clear_cache():
+    """Drop all cached compiled problems."""
+    _cache.clear()
+
+def cache_size() -> int:
+    """Number of compiled problems currently cached."""
+    return len(_cache)
@@ -8,16 +8,83 @@ except ImportError:
     sys.exit(1)
 import json
 import time
+import contextlib
+import io
 from typing import Dict, List, Any, Set, Tuple
 
+import numpy as np
+
+from compiled_problem import compile_problem
+from delta_resolve import map_schedule, find_neighbourhood
+from feasibility import FeasibilityCheck
+from infeasibility import explain_infeasibility, DEFAULT_EXPLAIN_TIME_LIMIT
+from lns import LnsDriver
+from greedy_scheduler import GreedyScheduler
+from profiler import PhaseProfiler
+from solver_profiles import resolve_profile, apply_profile
+from time_grid import MINUTES_PER_DAY
+
+# Supported formulations for the "no professor double-booking" constraint
+PROFESSOR_CONFLICT_MODELS = ("pairwise", "interval")
+
+# Supported decision variable layouts
+ASSIGNMENT_MODELS = ("separate", "triple")
+
+# Supported encodings of the per-slot load penalty
+SLOT_LOAD_PENALTIES = ("ladder", "table", "convex", "squared")
+
+# Supported ways of combining the objective tiers
+OBJECTIVE_MODES = ("weighted", "lexicographic")
+
+# Weight of each objective tier in the weighted objective
+OBJECTIVE_TIER_WEIGHTS = {"day_balance": 5, "slot_balance": 1, "core_preference": 1}
+
+class SolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Solution callback that records when the first solution was found."""
+
+    def __init__(self, on_solution=None):
+        """
+        Args:
+            on_solution: Optional function called with this callback for every
+                solution, while the solver's current solution can be read
+        """
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.on_solution = on_solution
+        self.first_solution_time = None
+        self.first_objective = None
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        if self.solution_count == 0:
+            self.first_solution_time = self.WallTime()
+            self.first_objective = self.ObjectiveValue()
+        self.solution_count += 1
+        if self.on_solution is not None:
+            self.on_solution(self)
+
 class CourseScheduler:
     """
     Redesigned scheduler class using Google OR-Tools CP-SAT solver to generate
     course schedules with 100% scheduling guarantee and balanced distribution.
+
+    Model building works on the integer indices of a CompiledProblem: course
+    instances, professors and time slots are referred to by position, and
+    string IDs are only used for variable names and output.
     """
-    
-    def __init__(self, data: Dict[str, Any]):
-        """Initialize the scheduler with necessary data."""
+
+    def __init__(self, data: Dict[str, Any], progress_listener=None, guard_constraints: bool = False):
+        """
+        Initialize the scheduler with necessary data.
+        
+        Args:
+            data: Scheduler input
+            progress_listener: Optional function called with a progress event
+                dictionary once the model is built and for every improving
+                solution (called from a solver thread)
+            guard_constraints: Guard the optional hard-constraint groups with
+                assumption literals; only for the model rebuilt by
+                _explain_infeasibility, which never solves it without them
+        """
         # Core data
         self.data = data
         self.schedule_id = data['scheduleId']
@@ -26,113 +93,160 @@ class CourseScheduler:
         self.time_slots = data['timeSlots']
         self.professor_availability = data['professorAvailability']
         self.professor_courses = data.get('professorCourses', [])
-        
-        # Dictionary lookups for performance
+        # Optional prior schedule (scheduled_courses of an earlier result) to warm start from
+        self.previous_schedule = data.get('previousSchedule', [])
+        
+        # Model-building switches
+        self.options = data.get('options', {})
+        self.professor_conflict_model = self.options.get('professorConflictModel', 'pairwise')
+        if self.professor_conflict_model not in PROFESSOR_CONFLICT_MODELS:
+            raise ValueError(f"Unknown professorConflictModel: {self.professor_conflict_model}")
+        self.assignment_model = self.options.get('assignmentModel', 'separate')
+        if self.assignment_model not in ASSIGNMENT_MODELS:
+            raise ValueError(f"Unknown assignmentModel: {self.assignment_model}")
+        self.slot_load_penalty = self.options.get('slotLoadPenalty', 'convex')
+        if self.slot_load_penalty not in SLOT_LOAD_PENALTIES:
+            raise ValueError(f"Unknown slotLoadPenalty: {self.slot_load_penalty}")
+        self.objective_mode = self.options.get('objectiveMode', 'weighted')
+        if self.objective_mode not in OBJECTIVE_MODES:
+            raise ValueError(f"Unknown objectiveMode: {self.objective_mode}")
+        # Adaptive large neighbourhood search around the weighted objective (see lns.py)
+        self.use_lns = self.options.get('lns', False)
+        if self.use_lns and self.objective_mode != 'weighted':
+            raise ValueError("lns requires the weighted objectiveMode")
+        self.lns = None
+        # Maximize the number of scheduled instances, core first, instead of
+        # requiring every instance to be scheduled
+        self.soft_completion = self.options.get('softCompletion', False)
+        if self.soft_completion and self.use_lns:
+            raise ValueError("softCompletion cannot be combined with lns")
+        # Remove provably unusable slots before creating variables
+        self.domain_prefilter = self.options.get('domainPrefilter', True)
+        # Minimum break a professor needs between two classes on the same day
+        self.min_break_minutes = self.options.get('minBreakMinutes', 30)
+        # Matching/flow pre-checks before the model is built (see feasibility.py)
+        self.feasibility_check = self.options.get('feasibilityCheck', True)
+        self.feasibility = None
+        # Assumption literal per hard-constraint group, keyed by (kind, index)
+        # (see infeasibility.py)
+        self.guard_constraints = guard_constraints
+        if self.guard_constraints and self.assignment_model != 'separate':
+            raise ValueError("Guarded constraints require the separate assignmentModel")
+        self.constraint_guards = {}
+        # Look for a minimal infeasible core when CP-SAT proves infeasibility
+        self.explain = self.options.get('explainInfeasibility', True) and not self.guard_constraints
+        
+        # Dictionary lookups for output payloads
         self.course_dict = {c['course_id']: c for c in self.courses}
         self.professor_dict = {p['professor_id']: p for p in self.professors}
         self.time_slot_dict = {t['timeslot_id']: t for t in self.time_slots}
         
+        # Integer-indexed problem (includes the course x professor qualification matrix)
+        self.problem = compile_problem(data, self.options.get('problemCacheKey'))
+        
+        # Teaching days, slots and slot relations shared by every phase
+        self.grid = self.problem.grid
+        
         # Organize data for efficient constraint creation
         self._prepare_course_data()
         self._organize_time_slots()
         self._analyze_constraints()
         
+        # Instances that keep their previous professor and slot in delta mode
+        self.frozen_assignments = {}
+        self.delta_summary = None
+        if self.options.get('deltaResolve', False):
+            if not self.previous_schedule:
+                raise ValueError("deltaResolve requires previousSchedule")
+            self.frozen_assignments, self.delta_summary = find_neighbourhood(
+                self.problem, self.previous_schedule, data.get('changes')
+            )
+            print(f"Delta re-solve: {self.delta_summary['free_instances']} instances free, "
+                  f"{self.delta_summary['frozen_instances']} frozen")
+        
+        # Instances that keep their previous professor (options.pinProfessors);
+        # only their slots are re-chosen
+        self.pinned_professors = {}
+        if self.options.get('pinProfessors', False):
+            assignments, _ = map_schedule(self.problem, self.previous_schedule)
+            self.pinned_professors = {
+                i: p for i, (p, _) in assignments.items()
+                if p is not None and self.problem.qualified[self.problem.instance_course[i], p]
+            }
+        
+        # Progress events; options.progressDiff adds the changed assignments
+        self.progress_listener = progress_listener
+        self.progress_diff = self.options.get('progressDiff', False)
+        self.stop_requested = False
+        
         # Initialize model
         self.model = cp_model.CpModel()
         self.solver = None
+        self.solver_profile = None
+        # Solver currently searching, if any (the current stage in lexicographic mode)
+        self.active_solver = None
         
-        # Decision variables
+        # Decision variables, keyed by instance index, then professor/slot index
         self.course_professor_vars = {}
         self.course_timeslot_vars = {}
         self.course_day_vars = {}
         self.course_scheduled_vars = {}
         
-        # Tracking variables for optimization
+        # (professor, slot) assignment literals per course instance
+        self.assignment_vars = {}
+        
+        # Shared (professor, slot) occupancy literals
+        self.professor_occupancy = {}
+        
+        # Tracking variables for optimization, keyed by slot and day index
         self.courses_per_timeslot = {}
+        self.max_courses_per_timeslot = {}
         self.courses_per_day = {}
         self.timeslot_imbalance = None
         self.day_imbalance = None
         self.similar_slot_imbalances = {}
         
+        # Slots removed by the domain pre-filter, per course
+        self.domain_pruning = {}
+    
     def _prepare_course_data(self):
         """Pre-process course data for scheduling."""
-        self.total_course_instances = 0
-        self.core_courses = []
-        self.elective_courses = []
-        self.multi_class_courses = {}
-        
-        for course in self.courses:
-            course_id = course['course_id']
-            num_classes = course.get('num_classes', 1)
-            self.total_course_instances += num_classes
-            
-            if course.get('is_core', False):
-                self.core_courses.append(course_id)
-            else:
-                self.elective_courses.append(course_id)
-                
-            if num_classes > 1:
-                self.multi_class_courses[course_id] = num_classes
+        problem = self.problem
+        self.total_course_instances = problem.num_instances
+        self.core_courses = [problem.course_ids[c] for c in np.flatnonzero(problem.course_is_core)]
+        self.elective_courses = [problem.course_ids[c] for c in np.flatnonzero(~problem.course_is_core)]
+        self.multi_class_courses = {
+            problem.course_ids[c]: int(problem.course_num_classes[c])
+            for c in np.flatnonzero(problem.course_num_classes > 1)
+        }
         
-        print(f"Total courses: {len(self.courses)}")
+        print(f"Total courses: {problem.num_courses}")
         print(f"Total course instances to schedule: {self.total_course_instances}")
         print(f"Core courses: {len(self.core_courses)}")
         print(f"Multi-class courses: {len(self.multi_class_courses)}")
     
     def _organize_time_slots(self):
-        """Organize time slots for efficient access."""
-        # Group by day
-        self.time_slots_by_day = defaultdict(list)
-        for slot in self.time_slots:
-            # Skip Friday slots
-            if slot['day_of_week'].lower() != 'friday':
-                self.time_slots_by_day[slot['day_of_week']].append(slot)
-        
-        # Group by duration
-        self.time_slots_by_duration = defaultdict(list)
-        for slot in self.time_slots:
-            if slot['day_of_week'].lower() != 'friday':
-                self.time_slots_by_duration[slot['duration_minutes']].append(slot)
-        
-        # Group by slot number (TS1, TS2, etc.)
-        self.time_slots_by_number = defaultdict(list)
-        for slot in self.time_slots:
-            if slot['day_of_week'].lower() != 'friday':
-                slot_number = slot['timeslot_id'].split('-')[0]
-                self.time_slots_by_number[slot_number].append(slot)
-                
-        # Count available slots
-        self.valid_time_slots = [s for s in self.time_slots 
-                                if s['day_of_week'].lower() != 'friday']
+        """Report the time grid (slots are grouped once when the grid is built)."""
+        grid = self.grid
         
-        print(f"Valid time slots: {len(self.valid_time_slots)}")
-        print(f"Time slots by duration: {', '.join(f'{d}min: {len(s)}' for d, s in self.time_slots_by_duration.items())}")
+        print(f"Teaching days: {', '.join(grid.day_names)}")
+        print(f"Valid time slots: {grid.num_slots}")
+        print(f"Time slots by duration: "
+              f"{', '.join(f'{d}min: {len(slots)}' for d, slots in grid.duration_buckets.items())}")
     
     def _analyze_constraints(self):
         """Analyze constraints to determine scheduling feasibility."""
-        # Calculate course duration demand
-        duration_demand = defaultdict(int)
-        for course in self.courses:
-            duration = course['duration_minutes']
-            num_classes = course.get('num_classes', 1)
-            duration_demand[duration] += num_classes
-        
-        # Calculate time slot supply by duration
-        duration_supply = defaultdict(int)
-        for slot in self.valid_time_slots:
-            duration = slot['duration_minutes']
-            duration_supply[duration] += 1
-            
+        grid = self.grid
+        
         # Calculate average courses per slot
-        self.avg_courses_per_slot = self.total_course_instances / max(1, len(self.valid_time_slots))
+        self.avg_courses_per_slot = self.total_course_instances / max(1, grid.num_slots)
         
         # Calculate expected max courses per slot for balancing
         # This will guide our soft constraints but NOT limit scheduling
         self.target_max_per_slot = max(2, math.ceil(self.avg_courses_per_slot * 1.5))
         
         # Calculate expected courses per day
-        valid_days = ["Monday", "Tuesday", "Wednesday", "Thursday"]
-        self.target_courses_per_day = self.total_course_instances / len(valid_days)
+        self.target_courses_per_day = self.total_course_instances / grid.num_days
         
         print(f"Average courses per slot: {self.avg_courses_per_slot:.2f}")
         print(f"Target maximum courses per slot: {self.target_max_per_slot}")
@@ -141,546 +255,1090 @@ class CourseScheduler:
     def solve(self):
         """Main method to solve the scheduling problem with pattern enforcement."""
         start_time = time.time()
+        profiler = PhaseProfiler(self.model, self.options.get('profileMemory', False))
+        
+        # Fail fast when a polynomial check proves the problem infeasible;
+        # otherwise the checks tighten the variable domains. With
+        # softCompletion the blocked courses are left unscheduled instead
+        # and the domains are not tightened.
+        if self.feasibility_check:
+            with profiler.phase("feasibility_check"):
+                self.feasibility = FeasibilityCheck(self.problem, self.min_break_minutes)
+                feasible = self.feasibility.run()
+            if not feasible and self.soft_completion:
+                for issue in self.feasibility.issues:
+                    print(f"WARNING ({issue['check']}): {issue['message']}")
+            elif not feasible:
+                for issue in self.feasibility.issues:
+                    print(f"INFEASIBLE ({issue['check']}): {issue['message']}")
+                result = self._report_infeasibility(cp_model.INFEASIBLE, time.time() - start_time)
+                result["profile"] = profiler.report()
+                return result
+        
+        self.build_model(profiler)
+        
+        # Warm start from the previous schedule, or from a greedy draft
+        # (options.greedyHint, on by default with softCompletion)
+        self.warm_start = None
+        if self.previous_schedule:
+            self.warm_start = self._add_warm_start_hints(self.previous_schedule)
+            self.warm_start["source"] = "previous_schedule"
+        elif self.options.get('greedyHint', self.soft_completion):
+            draft = GreedyScheduler(self.data, problem=self.problem).solve()
+            self.warm_start = self._add_warm_start_hints(draft["result"]["scheduled_courses"])
+            self.warm_start["source"] = "greedy"
+        if self.warm_start:
+            print(f"Warm start: {self.warm_start['full']} of {self.warm_start['entries']} "
+                  f"{self.warm_start['source']} assignments hinted")
+        
+        # Pick CP-SAT parameters for the size of this model
+        self.solver_profile = resolve_profile(self.options, self.total_course_instances,
+                                              self._count_candidate_assignments(), self.problem.num_professors)
+        if self.warm_start and self.options.get('repairHint', False):
+            self.solver_profile["parameters"]["repair_hint"] = True
+        print(f"Solver profile: {self.solver_profile['name']}"
+              f"{' (auto)' if self.solver_profile['auto'] else ''}")
+        
+        if self.progress_listener is not None:
+            self._start_progress(start_time)
         
+        # Solve the model
+        with profiler.phase("solve"):
+            if self.soft_completion:
+                status = self._solve_lexicographic(self._completion_stages())
+            elif self.objective_mode == 'lexicographic':
+                status = self._solve_lexicographic()
+            elif self.use_lns:
+                self.solution_timer = SolutionTimer(self._progress_callback("lns_initial"))
+                self.lns = LnsDriver(self, self.options)
+                status = self.lns.run(self.solver_profile, self.solution_timer,
+                                      lambda stage: SolutionTimer(self._progress_callback(stage)))
+            else:
+                self.solver = cp_model.CpSolver()
+                apply_profile(self.solver.parameters, self.solver_profile)
+                self.solution_timer = SolutionTimer(self._progress_callback("optimize"))
+                self.active_solver = self.solver
+                status = self.solver.Solve(self.model, self.solution_timer)
+                self.active_solver = None
+        
+        solve_time = time.time() - start_time
+        
+        # Process the solution
+        with profiler.phase("extract_solution"):
+            if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                result = self._extract_solution(status, solve_time)
+            elif self.soft_completion and status == cp_model.UNKNOWN:
+                result = self._greedy_completion(solve_time)
+            else:
+                result = self._report_infeasibility(status, solve_time)
+        
+        if result["success"]:
+            result["result"]["statistics"]["profile"] = profiler.report()
+        else:
+            result["profile"] = profiler.report()
+        
+        return result
+    
+    def build_model(self, profiler, with_objective=True):
+        """
+        Create the decision variables, the hard constraints and the objective.
+        
+        Args:
+            profiler: PhaseProfiler timing each phase
+            with_objective: Also add the distribution tracking and the
+                objective; without them only feasibility is modelled
+        """
         # Create decision variables
-        self._create_decision_variables()
+        with profiler.phase("create_decision_variables"):
+            self._create_decision_variables()
         
         # Add core constraints (must be satisfied)
-        self._add_core_constraints()
+        with profiler.phase("add_core_constraints"):
+            self._add_core_constraints()
         
         # Add multi-class pattern constraints - ABSOLUTE ENFORCEMENT
-        self._enforce_multi_class_constraints()
+        with profiler.phase("enforce_multi_class_constraints"):
+            self._enforce_multi_class_constraints()
+        
+        if not with_objective:
+            return
         
         # Add distribution tracking variables (for optimization, not constraints)
-        self._add_distribution_tracking()
+        with profiler.phase("add_distribution_tracking"):
+            self._add_distribution_tracking()
         
         # Add objective function that prioritizes 100% scheduling first,
         # then balanced distribution
-        self._add_objective_function()
+        with profiler.phase("add_objective_function"):
+            self._add_objective_function()
+    
+    def _solve_lexicographic(self, stages=None):
+        """
+        Optimize the objective tiers one at a time.
+        
+        By default a feasibility stage is followed by one stage per tier, in
+        priority order. Each stage gets an equal share of the remaining time limit
+        (or options.stageTimeLimits[stage]), starts from the
+        previous solution as a hint, and fixes its tier's value as a lower
+        bound for the later stages. Stage times and values are kept for the
+        statistics.
+        
+        Args:
+            stages: (name, expression) pairs to maximize in order instead of
+                the default stages; None as expression only looks for a
+                feasible solution
+        
+        Returns:
+            Solver status: OPTIMAL if every stage was solved to optimality,
+            FEASIBLE if some stage stopped early, otherwise the status of the
+            first stage
+        """
+        # Tiers without any terms (e.g. no core courses) are constant
+        if stages is None:
+            stages = [("feasibility", None)] + [
+                (name, tier) for name, tier in self.objective_tiers if not isinstance(tier, int)
+            ]
+        time_limits = self.options.get('stageTimeLimits', {})
+        remaining_time = self.solver_profile["parameters"]["max_time_in_seconds"]
         
-        # Solve the model
-        self.solver = cp_model.CpSolver()
-        self.solver.parameters.max_time_in_seconds = 300  # 5 minute timeout
-        status = self.solver.Solve(self.model)
+        self.stage_statistics = []
+        self.solver = None
+        self.solution_timer = None
+        overall_status = cp_model.OPTIMAL
         
-        solve_time = time.time() - start_time
+        for stage_number, (name, tier) in enumerate(stages):
+            if tier is None:
+                self.model.ClearObjective()
+            else:
+                self.model.Maximize(tier)
+            
+            solver = cp_model.CpSolver()
+            apply_profile(solver.parameters, self.solver_profile)
+            # Time left over by quick stages rolls over to the later ones
+            solver.parameters.max_time_in_seconds = time_limits.get(
+                name, max(0.0, remaining_time) / (len(stages) - stage_number)
+            )
+            timer = SolutionTimer(self._progress_callback(name))
+            stage_start = time.time()
+            self.active_solver = solver
+            status = solver.Solve(self.model, timer)
+            self.active_solver = None
+            remaining_time -= time.time() - stage_start
+            
+            found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            value = int(solver.Value(tier)) if found and tier is not None else None
+            self.stage_statistics.append({
+                "stage": name,
+                "status": self._get_status_string(status),
+                "wall_time": round(time.time() - stage_start, 4),
+                "value": value
+            })
+            print(f"Stage {name}: {self._get_status_string(status)}, value {value}")
+            
+            if not found:
+                if self.solver is None:
+                    # Nothing feasible: report the first stage as the outcome
+                    self.solver = solver
+                    self.solution_timer = timer
+                    return status
+                # Keep the previous stage's solution
+                overall_status = cp_model.FEASIBLE
+                break
+            
+            if status != cp_model.OPTIMAL:
+                overall_status = cp_model.FEASIBLE
+            if self.solver is None:
+                self.solution_timer = timer
+            self.solver = solver
+            
+            # Hint the next stage with this solution and keep this tier's value
+            solution = list(solver.ResponseProto().solution)
+            self.model.ClearHints()
+            hint = self.model.Proto().solution_hint
+            hint.vars.extend(range(len(solution)))
+            hint.values.extend(solution)
+            if tier is not None:
+                self.model.Add(tier >= value)
+            
+            if self.stop_requested:
+                overall_status = cp_model.FEASIBLE
+                break
         
-        # Process the solution
-        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            result = self._extract_solution(status, solve_time)
+        return overall_status
+    
+    def _completion_stages(self):
+        """
+        Solve stages of options.softCompletion.
+        
+        The first stage maximizes the number of scheduled instances, each core
+        instance weighing more than all elective instances together. Its
+        value is kept while the later stages optimize the weighted objective,
+        or each tier in lexicographic mode.
+        
+        Returns:
+            (name, expression) pairs for _solve_lexicographic
+        """
+        problem = self.problem
+        is_core = problem.course_is_core[problem.instance_course]
+        core_weight = int((~is_core).sum()) + 1
+        completion = sum(
+            scheduled_var * (core_weight if is_core[i] else 1)
+            for i, scheduled_var in self.course_scheduled_vars.items()
+        )
+        
+        stages = [("completion", completion)]
+        if self.objective_mode == 'lexicographic':
+            stages += [(name, tier) for name, tier in self.objective_tiers if not isinstance(tier, int)]
+        else:
+            stages.append(("objective", self.objective_expression))
+        return stages
+    
+    def stop_search(self):
+        """
+        Ask a running solve to stop and keep its best solution so far.
+        
+        Safe to call from a signal handler or another thread; in lexicographic
+        mode the remaining stages are skipped.
+        """
+        self.stop_requested = True
+        solver = self.active_solver
+        if solver is not None:
+            solver.StopSearch()
+    
+    def _start_progress(self, start_time):
+        """
+        Emit the model_built event and prepare the solution decoder for diffs.
+        
+        Args:
+            start_time: time.time() at the start of solve()
+        """
+        self.progress_start = start_time
+        self.progress_assignment = None
+        
+        if self.progress_diff:
+            # Proto indices of the professor and slot literals of every instance
+            prof_index, prof_instance, prof_value = [], [], []
+            slot_index, slot_instance, slot_value = [], [], []
+            for i in self.course_scheduled_vars:
+                for p, var in self.course_professor_vars.get(i, {}).items():
+                    prof_index.append(var.Index())
+                    prof_instance.append(i)
+                    prof_value.append(p)
+                for s, var in self.course_timeslot_vars.get(i, {}).items():
+                    slot_index.append(var.Index())
+                    slot_instance.append(i)
+                    slot_value.append(s)
+            self.progress_decoder = (
+                np.array(prof_index, dtype=np.int64), np.array(prof_instance, dtype=np.int64),
+                np.array(prof_value, dtype=np.int64),
+                np.array(slot_index, dtype=np.int64), np.array(slot_instance, dtype=np.int64),
+                np.array(slot_value, dtype=np.int64)
+            )
+        
+        proto = self.model.Proto()
+        self.progress_listener({
+            "event": "model_built",
+            "elapsed": round(time.time() - start_time, 4),
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "instances": self.total_course_instances,
+            "solver_profile": self.solver_profile["name"],
+            "objective_mode": self.objective_mode
+        })
+    
+    def _progress_callback(self, stage):
+        """
+        Solution handler for SolutionTimer that emits progress events.
+        
+        Args:
+            stage: Name of the solve stage reported with each event
+        
+        Returns:
+            Function for SolutionTimer's on_solution, or None without a listener
+        """
+        if self.progress_listener is None:
+            return None
+        
+        def on_solution(timer):
+            event = {
+                "event": "solution",
+                "stage": stage,
+                "solution": timer.solution_count,
+                "objective": timer.ObjectiveValue(),
+                "bound": timer.BestObjectiveBound(),
+                "elapsed": round(time.time() - self.progress_start, 4),
+                "solver_time": round(timer.WallTime(), 4)
+            }
+            if self.progress_diff:
+                event["changes"] = self._progress_changes(np.asarray(timer.Response().solution))
+            self.progress_listener(event)
+        
+        return on_solution
+    
+    def _progress_changes(self, solution):
+        """
+        Assignments that differ from the previous progress event.
+        
+        Args:
+            solution: Values of all model variables in the current solution
+        
+        Returns:
+            List of [course_id, class_instance, professor_id, timeslot_id]
+            entries; professor and slot are None for instances no longer
+            scheduled. The first solution lists every scheduled instance.
+        """
+        problem = self.problem
+        prof_index, prof_instance, prof_value, slot_index, slot_instance, slot_value = self.progress_decoder
+        
+        # Professor and slot of every instance, -1 when unassigned
+        assignment = np.full((problem.num_instances, 2), -1, dtype=np.int64)
+        chosen = solution[prof_index] == 1
+        assignment[prof_instance[chosen], 0] = prof_value[chosen]
+        chosen = solution[slot_index] == 1
+        assignment[slot_instance[chosen], 1] = slot_value[chosen]
+        assignment[(assignment < 0).any(axis=1)] = -1
+        
+        previous = self.progress_assignment
+        if previous is None:
+            changed = np.flatnonzero(assignment[:, 0] >= 0)
         else:
-            result = self._report_infeasibility(status, solve_time)
+            changed = np.flatnonzero((assignment != previous).any(axis=1))
+        self.progress_assignment = assignment
+        
+        changes = []
+        for i in changed.tolist():
+            p, s = assignment[i].tolist()
+            c = int(problem.instance_course[i])
+            changes.append([
+                problem.course_ids[c],
+                int(problem.instance_number[i]),
+                problem.professor_ids[p] if p >= 0 else None,
+                self.grid.slot_ids[s] if s >= 0 else None
+            ])
+        return changes
+    
+    def _add_warm_start_hints(self, previous_schedule):
+        """
+        Hint the solver with the assignments of a previous schedule.
+        
+        Entries have the shape emitted by _extract_solution (course_id,
+        class_instance, professor_id, timeslot_id). The slot and professor of
+        an instance are hinted independently, so an entry whose professor can
+        no longer teach the course still hints its slot. With softCompletion
+        the fully hinted instances are hinted as scheduled and all others as
+        unscheduled, so a partial schedule is a complete hint.
+        
+        Returns:
+            Hint survival counts for the statistics
+        """
+        problem = self.problem
+        assignments, unmapped = map_schedule(problem, previous_schedule)
+        survival = {
+            "entries": len(previous_schedule), "full": 0, "slot_only": 0, "professor_only": 0,
+            "dropped": sum(unmapped.values())
+        }
+        dropped_reasons = defaultdict(int, unmapped)
+        hinted = set()
         
-        return result
+        for i, (p, s) in assignments.items():
+            slot_vars = self.course_timeslot_vars.get(i, {})
+            prof_vars = self.course_professor_vars.get(i, {})
+            
+            slot_ok = s in slot_vars
+            prof_ok = p in prof_vars and not (slot_ok and not problem.available[p, s])
+            
+            if slot_ok:
+                for slot, slot_var in slot_vars.items():
+                    self.model.AddHint(slot_var, int(slot == s))
+            if prof_ok:
+                for prof, prof_var in prof_vars.items():
+                    self.model.AddHint(prof_var, int(prof == p))
+            if slot_ok and prof_ok and self.assignment_model == 'triple':
+                for key, triple_var in self.assignment_vars.get(i, {}).items():
+                    self.model.AddHint(triple_var, int(key == (p, s)))
+            
+            if slot_ok and prof_ok:
+                survival["full"] += 1
+                hinted.add(i)
+            elif slot_ok:
+                survival["slot_only"] += 1
+                dropped_reasons[self._dropped_professor_reason(i, p)] += 1
+            elif prof_ok:
+                survival["professor_only"] += 1
+                dropped_reasons["slot_not_in_domain"] += 1
+            else:
+                survival["dropped"] += 1
+                dropped_reasons["slot_not_in_domain"] += 1
+        
+        if self.soft_completion:
+            for i, scheduled_var in self.course_scheduled_vars.items():
+                self.model.AddHint(scheduled_var, int(i in hinted))
+                if i not in assignments:
+                    unassigned = list(self.course_timeslot_vars.get(i, {}).values())
+                    unassigned += list(self.course_professor_vars.get(i, {}).values())
+                    for var in unassigned:
+                        self.model.AddHint(var, 0)
+        
+        survival["survival_rate"] = round(survival["full"] / survival["entries"], 4) if survival["entries"] else 0
+        survival["reasons"] = dict(dropped_reasons)
+        return survival
+    
+    def _dropped_professor_reason(self, i, p):
+        """
+        Why the hinted professor p of instance i could not be hinted.
+        
+        A qualified professor missing from the instance's domain was removed
+        by the domain prefilter or the feasibility checks, not disqualified.
+        """
+        if p in self.course_professor_vars.get(i, {}):
+            return "professor_unavailable"
+        if self.problem.qualified[self.problem.instance_course[i], p]:
+            return "professor_pruned"
+        return "professor_unqualified"
+    
+    def _count_candidate_assignments(self):
+        """Number of candidate (instance, professor, slot) assignments in the model."""
+        if self.assignment_model == 'triple':
+            return sum(len(triples) for triples in self.assignment_vars.values())
+        return sum(
+            len(prof_vars) * len(self.course_timeslot_vars.get(i, {}))
+            for i, prof_vars in self.course_professor_vars.items()
+        )
     
     def _create_decision_variables(self):
         """Create all decision variables with balanced distribution in mind."""
+        problem = self.problem
+        grid = self.grid
+        
         # Prioritize slots for balanced distribution
         prioritized_slots = self._calculate_slot_priorities()
+        prioritized_durations = grid.slot_duration[prioritized_slots]
         
         # For each course and its instances
-        for course in self.courses:
-            course_id = course['course_id']
-            num_classes = course.get('num_classes', 1)
-            duration = course['duration_minutes']
+        for c in range(problem.num_courses):
+            course_id = problem.course_ids[c]
+            duration = problem.course_duration[c]
             
             # Find matching time slots with exact duration
-            matching_slots = [slot for slot in prioritized_slots 
-                            if slot['duration_minutes'] == duration]
+            matching_slots = prioritized_slots[prioritized_durations == duration]
             
             # If no exact matches, allow flexibility to ensure 100% scheduling
-            if not matching_slots:
+            if not len(matching_slots):
                 print(f"WARNING: No exact matching time slots for course {course_id} (duration: {duration})")
                 
                 # First try close matches (±5 minutes)
-                matching_slots = [slot for slot in prioritized_slots
-                                if abs(slot['duration_minutes'] - duration) <= 5]
+                matching_slots = prioritized_slots[np.abs(prioritized_durations - duration) <= 5]
                 
-                # If still no matches, use all non-Friday slots
-                if not matching_slots:
+                # If still no matches, use all teaching-day slots
+                if not len(matching_slots):
                     matching_slots = prioritized_slots
             
+            # Qualified professors in a stable order, resolved once per course
+            qualified_profs = np.flatnonzero(problem.qualified[c])
+            
+            # Candidate professors and slots of each instance
+            instances = problem.instances_of(c)
+            if instances[0] in self.frozen_assignments:
+                # Frozen in delta mode: only the previous professor and slot
+                frozen = [self.frozen_assignments[i] for i in instances]
+                prof_domains = [np.array([p]) for p, _ in frozen]
+                slot_domains = [np.array([s]) for _, s in frozen]
+            else:
+                prof_domains = [
+                    np.array([self.pinned_professors[i]]) if i in self.pinned_professors else qualified_profs
+                    for i in instances
+                ]
+                if self.domain_prefilter:
+                    slot_domains = self._prefilter_slot_domains(c, matching_slots, np.unique(np.concatenate(prof_domains)))
+                else:
+                    slot_domains = [matching_slots] * len(instances)
+                # The flow pruning assumes every instance is scheduled, so it
+                # would remove placements a partial (softCompletion) schedule needs
+                if self.feasibility is not None and not self.soft_completion:
+                    prof_domains, slot_domains = self.feasibility.tighten(instances, prof_domains, slot_domains)
+            
             # Create variables for each class instance
-            for instance in range(1, num_classes + 1):
-                instance_id = f"{course_id}_{instance}"
+            for i, instance_profs, instance_slots in zip(instances, prof_domains, slot_domains):
+                instance_id = problem.instance_ids[i]
                 
                 # Variable tracking if this course instance is scheduled
-                self.course_scheduled_vars[instance_id] = self.model.NewBoolVar(f"scheduled_{instance_id}")
-                
-                # Create professor assignment variables
-                self.course_professor_vars[instance_id] = {}
-                for professor in self.professors:
-                    prof_id = professor['professor_id']
-                    # Only create variable if professor can teach this course
-                    if self._can_professor_teach_course(prof_id, course_id):
-                        self.course_professor_vars[instance_id][prof_id] = self.model.NewBoolVar(
-                            f"course_{instance_id}_prof_{prof_id}"
-                        )
+                self.course_scheduled_vars[i] = self.model.NewBoolVar(f"scheduled_{instance_id}")
                 
-                # Create time slot assignment variables
-                self.course_timeslot_vars[instance_id] = {}
-                self.course_day_vars[instance_id] = {}
+                if self.assignment_model == 'triple':
+                    self._create_assignment_triples(i, instance_profs, instance_slots)
+                    continue
                 
-                # Process each matching time slot for this course
-                for time_slot in matching_slots:
-                    slot_id = time_slot['timeslot_id']
-                    day = time_slot['day_of_week']
-                    
-                    # Skip Friday slots
-                    if day.lower() == 'friday':
-                        continue
-                    
-                    # Create the time slot variable
-                    self.course_timeslot_vars[instance_id][slot_id] = self.model.NewBoolVar(
-                        f"course_{instance_id}_slot_{slot_id}"
+                # Create professor assignment variables
+                # (only for professors who can teach this course)
+                self.course_professor_vars[i] = {}
+                for p in instance_profs.tolist():
+                    self.course_professor_vars[i][p] = self.model.NewBoolVar(
+                        f"course_{instance_id}_prof_{problem.professor_ids[p]}"
                     )
-                    
-                    # Create day variables for convenience
-                    if day not in self.course_day_vars[instance_id]:
-                        self.course_day_vars[instance_id][day] = self.model.NewBoolVar(
-                            f"course_{instance_id}_day_{day}"
-                        )
+                
+                # Create time slot and day assignment variables
+                self._create_slot_variables(i, instance_slots)
+        
+        if self.domain_pruning:
+            pruned_total = sum(entry["pruned_slots"] for entry in self.domain_pruning.values())
+            print(f"Domain pre-filter removed {pruned_total} slot candidates across {len(self.domain_pruning)} courses")
     
-    def _calculate_slot_priorities(self):
-        """Calculate priorities for time slots to encourage balanced distribution."""
-        # Get all non-Friday time slots
-        slots = [slot for slot in self.time_slots 
-                if slot['day_of_week'].lower() != 'friday']
+    def _prefilter_slot_domains(self, c, matching_slots, qualified_profs):
+        """
+        Remove the slots an instance of course c can never use.
+        
+        A slot survives if some qualified professor is available in it and, for
+        multi-class courses, it lies on the instance's day of a day pattern in
+        which every instance has a usable slot with the same slot number. The
+        pruned count is recorded per course for the statistics.
+        
+        Returns:
+            Surviving slots of each instance, in the order of matching_slots
+        """
+        problem = self.problem
+        grid = self.grid
+        num_instances = len(problem.instances_of(c))
+        
+        # A slot needs at least one qualified professor who is available
+        # (courses without professors are left to the conflict report)
+        usable = matching_slots
+        if len(qualified_profs):
+            usable = usable[problem.available[np.ix_(qualified_profs, usable)].any(axis=0)]
+        
+        patterns = grid.day_patterns(num_instances) if num_instances > 1 else ()
+        if not patterns:
+            slot_domains = [usable] * num_instances
+        else:
+            # Which (day, slot number) combinations have a usable slot
+            usable_day_number = np.zeros((grid.num_days, len(grid.slot_number_names)), dtype=bool)
+            usable_day_number[grid.slot_day[usable], grid.slot_number[usable]] = True
+            
+            # Instance j may use (day, number) if some pattern puts it on that day
+            # and the number is usable on every day of the pattern
+            allowed = np.zeros((num_instances,) + usable_day_number.shape, dtype=bool)
+            for pattern in patterns:
+                numbers = usable_day_number[list(pattern)].all(axis=0)
+                for j, d in enumerate(pattern):
+                    allowed[j, d] |= numbers
+            
+            slot_domains = [
+                usable[allowed[j, grid.slot_day[usable], grid.slot_number[usable]]]
+                for j in range(num_instances)
+            ]
         
-        # Group slots by slot number (TS1, TS2, etc.)
-        slots_by_number = defaultdict(list)
-        for slot in slots:
-            slot_number = slot['timeslot_id'].split('-')[0]
-            slots_by_number[slot_number].append(slot)
+        # Without any feasible assignment, keep the full domain so the
+        # solver reports the course exactly as it would without pre-filtering
+        if not all(len(slots) for slots in slot_domains):
+            slot_domains = [matching_slots] * num_instances
+        
+        candidate_count = len(matching_slots) * num_instances
+        pruned_count = candidate_count - sum(len(slots) for slots in slot_domains)
+        if pruned_count:
+            self.domain_pruning[problem.course_ids[c]] = {
+                "candidate_slots": candidate_count,
+                "pruned_slots": pruned_count
+            }
         
-        # Create alternating day order for balanced distribution
-        day_order = {"Monday": 0, "Tuesday": 2, "Wednesday": 1, "Thursday": 3}
+        return slot_domains
+    
+    def _create_slot_variables(self, i, slots):
+        """Create plain time slot and day variables for instance i."""
+        problem = self.problem
+        grid = self.grid
+        instance_id = problem.instance_ids[i]
+        
+        self.course_timeslot_vars[i] = {}
+        self.course_day_vars[i] = {}
+        
+        for s in slots.tolist():
+            self.course_timeslot_vars[i][s] = self.model.NewBoolVar(
+                f"course_{instance_id}_slot_{grid.slot_ids[s]}"
+            )
+            
+            # Create day variables for convenience
+            d = int(grid.slot_day[s])
+            if d not in self.course_day_vars[i]:
+                self.course_day_vars[i][d] = self.model.NewBoolVar(
+                    f"course_{instance_id}_day_{grid.day_names[d]}"
+                )
+    
+    def _create_assignment_triples(self, i, qualified_profs, matching_slots):
+        """
+        Create one boolean per feasible (instance, professor, slot) triple.
+        
+        A triple is feasible when the professor is qualified, available in the
+        slot and the slot matches the course duration. Professor, slot and day
+        variables are derived views equal to the sum of their triples, so no
+        availability constraints or reified conjunctions are needed.
+        """
+        problem = self.problem
+        grid = self.grid
+        instance_id = problem.instance_ids[i]
+        
+        # Qualified professor x matching slot availability for this course
+        feasible = problem.available[np.ix_(qualified_profs, matching_slots)]
+        
+        triples = {}
+        for slot_pos, s in enumerate(matching_slots.tolist()):
+            for p in qualified_profs[feasible[:, slot_pos]].tolist():
+                triples[(p, s)] = self.model.NewBoolVar(
+                    f"course_{instance_id}_prof_{problem.professor_ids[p]}_slot_{grid.slot_ids[s]}"
+                )
         
-        # Sort slots within each group by day order
-        for slot_number, group_slots in slots_by_number.items():
-            group_slots.sort(key=lambda x: day_order[x['day_of_week']])
+        self.assignment_vars[i] = triples
         
-        # Create prioritized list with interleaved slot numbers
-        prioritized_slots = []
-        slot_groups = list(slots_by_number.items())
-        slot_groups.sort(key=lambda x: x[0])
+        # Without any feasible professor, keep plain slot variables as in the
+        # separate layout so the instance surfaces as an unscheduled conflict
+        # instead of making the pattern constraints infeasible
+        if not triples:
+            self.course_professor_vars[i] = {}
+            self._create_slot_variables(i, matching_slots)
+            return
         
-        # First add all slot groups in order
-        for _, group_slots in slot_groups:
-            prioritized_slots.extend(group_slots)
+        # Group triples by professor, slot and day
+        triples_by_prof = defaultdict(list)
+        triples_by_slot = defaultdict(list)
+        triples_by_day = defaultdict(list)
+        for (p, s), var in triples.items():
+            triples_by_prof[p].append(var)
+            triples_by_slot[s].append(var)
+            triples_by_day[int(grid.slot_day[s])].append(var)
+        
+        # Derived professor view
+        self.course_professor_vars[i] = {}
+        for p in qualified_profs.tolist():
+            if p in triples_by_prof:
+                prof_var = self.model.NewBoolVar(f"course_{instance_id}_prof_{problem.professor_ids[p]}")
+                self.model.Add(prof_var == sum(triples_by_prof[p]))
+                self.course_professor_vars[i][p] = prof_var
+        
+        # Derived time slot and day views
+        self.course_timeslot_vars[i] = {}
+        self.course_day_vars[i] = {}
+        for s in matching_slots.tolist():
+            d = int(grid.slot_day[s])
+            
+            if s in triples_by_slot:
+                slot_var = self.model.NewBoolVar(f"course_{instance_id}_slot_{grid.slot_ids[s]}")
+                self.model.Add(slot_var == sum(triples_by_slot[s]))
+                self.course_timeslot_vars[i][s] = slot_var
+            
+            if d in triples_by_day and d not in self.course_day_vars[i]:
+                day_var = self.model.NewBoolVar(f"course_{instance_id}_day_{grid.day_names[d]}")
+                self.model.Add(day_var == sum(triples_by_day[d]))
+                self.course_day_vars[i][d] = day_var
+    
+    def _assignment_literal(self, i, p, s):
+        """
+        Get the literal that is true when instance i is taught by professor p in slot s.
+        
+        In triple mode this is the triple variable itself. Otherwise the
+        conjunction of the professor and slot variables is reified once and
+        cached so every constraint shares it. Returns None if the assignment
+        is impossible.
+        """
+        assignments = self.assignment_vars.setdefault(i, {})
+        key = (p, s)
+        if key in assignments or self.assignment_model == 'triple':
+            return assignments.get(key)
+        
+        prof_var = self.course_professor_vars.get(i, {}).get(p)
+        slot_var = self.course_timeslot_vars.get(i, {}).get(s)
+        if prof_var is None or slot_var is None:
+            return None
+        
+        # This variable is 1 if the course is assigned to this professor and time slot
+        problem = self.problem
+        grid = self.grid
+        assignment_var = self.model.NewBoolVar(
+            f"prof_{problem.professor_ids[p]}_slot_{grid.slot_ids[s]}_course_{problem.instance_ids[i]}"
+        )
+        self.model.AddBoolAnd([prof_var, slot_var]).OnlyEnforceIf(assignment_var)
+        self.model.AddBoolOr([prof_var.Not(), slot_var.Not()]).OnlyEnforceIf(assignment_var.Not())
+        
+        assignments[key] = assignment_var
+        return assignment_var
+    
+    def _calculate_slot_priorities(self):
+        """Calculate priorities for time slots to encourage balanced distribution."""
+        grid = self.grid
         
-        return prioritized_slots
+        # Group slots by slot number (TS1, TS2, etc.) and sort each group by
+        # the grid's alternating day order for balanced distribution
+        return np.lexsort((grid.day_priority[grid.slot_day], grid.slot_number))
     
     def _add_core_constraints(self):
         """Add essential hard constraints that must be satisfied."""
-        # CONSTRAINT 1: Every course must be scheduled (100% scheduling)
-        for course_instance_id, scheduled_var in self.course_scheduled_vars.items():
-            self.model.Add(scheduled_var == 1)
+        problem = self.problem
+        
+        # CONSTRAINT 1: Every course must be scheduled (100% scheduling),
+        # unless options.softCompletion only maximizes the number scheduled
+        for i, scheduled_var in self.course_scheduled_vars.items():
+            if not self.soft_completion or i in self.frozen_assignments:
+                self.model.Add(scheduled_var == 1)
+        if self.soft_completion:
+            self._add_completion_constraints()
         
         # CONSTRAINT 2: Each scheduled course must have exactly one professor
-        for course_instance_id, prof_vars in self.course_professor_vars.items():
-            professor_sum = []
-            for prof_id, var in prof_vars.items():
-                professor_sum.append(var)
+        for i, prof_vars in self.course_professor_vars.items():
+            professor_sum = list(prof_vars.values())
             
             # If there are professors who can teach this course
             if professor_sum:
-                self.model.Add(sum(professor_sum) == 1)  # Must have exactly one professor
+                self.model.Add(sum(professor_sum) == self._scheduled_count(i))  # Must have exactly one professor
             else:
                 # If no qualified professors, add a warning but don't enforce
                 # This allows the model to remain feasible
-                print(f"WARNING: No qualified professors for {course_instance_id}")
+                print(f"WARNING: No qualified professors for {problem.instance_ids[i]}")
         
         # CONSTRAINT 3: Each scheduled course must have exactly one time slot
-        for course_instance_id, slot_vars in self.course_timeslot_vars.items():
-            time_slot_sum = []
-            for slot_id, var in slot_vars.items():
-                time_slot_sum.append(var)
+        for i, slot_vars in self.course_timeslot_vars.items():
+            time_slot_sum = list(slot_vars.values())
             
             if time_slot_sum:
-                self.model.Add(sum(time_slot_sum) == 1)  # Must have exactly one time slot
+                self.model.Add(sum(time_slot_sum) == self._scheduled_count(i))  # Must have exactly one time slot
             else:
                 # If no available time slots, add a warning but don't enforce
-                print(f"WARNING: No available time slots for {course_instance_id}")
+                print(f"WARNING: No available time slots for {problem.instance_ids[i]}")
         
         # CONSTRAINT 4: A professor cannot teach two courses at the same time
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday"]:
-            for time_slot in self.time_slots_by_day[day]:
-                slot_id = time_slot['timeslot_id']
-                
-                # For each professor
-                for prof_id in self.professor_dict:
-                    # Find all course instances that could be assigned to this professor at this time slot
-                    courses_at_slot = []
-                    for course_instance_id in self.course_scheduled_vars:
-                        if (prof_id in self.course_professor_vars.get(course_instance_id, {}) and 
-                            slot_id in self.course_timeslot_vars.get(course_instance_id, {})):
-                            prof_var = self.course_professor_vars[course_instance_id][prof_id]
-                            slot_var = self.course_timeslot_vars[course_instance_id][slot_id]
-                            
-                            # This variable is 1 if the course is assigned to this professor and time slot
-                            assignment_var = self.model.NewBoolVar(f"prof_{prof_id}_slot_{slot_id}_course_{course_instance_id}")
-                            self.model.AddBoolAnd([prof_var, slot_var]).OnlyEnforceIf(assignment_var)
-                            self.model.AddBoolOr([prof_var.Not(), slot_var.Not()]).OnlyEnforceIf(assignment_var.Not())
-                            
-                            courses_at_slot.append(assignment_var)
-                    
-                    # At most one course can be assigned to this professor at this time slot
-                    if len(courses_at_slot) > 1:
-                        self.model.Add(sum(courses_at_slot) <= 1)
-        
         # CONSTRAINT 5: Professors should not teach in consecutive time slots
-        self._add_consecutive_slot_constraints()
+        # The interval model covers both with break-padded intervals; the
+        # pairwise model uses occupancy literals, which are booleans, so the
+        # same slot is already covered
+        if self.professor_conflict_model == 'interval':
+            self._add_professor_interval_constraints()
+        else:
+            self._build_professor_occupancy()
+            self._add_consecutive_slot_constraints()
         
         # CONSTRAINT 6: Courses can only be scheduled when professors are available
-        self._add_professor_availability_constraints()
+        # (triple mode never creates variables for unavailable assignments)
+        if self.assignment_model != 'triple':
+            self._add_professor_availability_constraints()
+    
+    def _scheduled_count(self, i):
+        """Number of professors and slots instance i takes: 1, or its scheduled literal with softCompletion."""
+        return self.course_scheduled_vars[i] if self.soft_completion else 1
+    
+    def _add_completion_constraints(self):
+        """
+        Tie the scheduled literals together for options.softCompletion.
+        
+        A multi-class course is scheduled as a whole or not at all. Instances
+        without any professor, and courses the pre-checks proved impossible
+        to place, stay unscheduled.
+        """
+        problem = self.problem
+        blocked = self.feasibility.blocked if self.feasibility is not None else {}
+        
+        for c in range(problem.num_courses):
+            instances = list(problem.instances_of(c))
+            first = self.course_scheduled_vars[instances[0]]
+            for i in instances[1:]:
+                self.model.Add(self.course_scheduled_vars[i] == first)
+            if c in blocked or any(not self.course_professor_vars.get(i) for i in instances):
+                if instances[0] not in self.frozen_assignments:
+                    self.model.Add(first == 0)
+    
+    def _guard(self, constraint, kind, index):
+        """
+        Make a hard constraint conditional on its group's assumption literal.
+        
+        Only active in the model rebuilt to explain infeasibility; the
+        literal of each group is created on first use and kept in
+        constraint_guards.
+        
+        Args:
+            constraint: Constraint returned by model.Add
+            kind: Group kind, a key of infeasibility.CONSTRAINT_GROUPS
+            index: Course or professor index of the group
+        """
+        if not self.guard_constraints:
+            return
+        key = (kind, index)
+        if key not in self.constraint_guards:
+            self.constraint_guards[key] = self.model.NewBoolVar(f"guard_{kind}_{index}")
+        constraint.OnlyEnforceIf(self.constraint_guards[key])
+    
+    def _build_professor_occupancy(self):
+        """
+        Create one occupancy literal per (professor, slot), shared by all constraints.
+        
+        Slot indices are day-specific, so this is a (professor, day, slot) literal.
+        It is constrained to equal the number of courses the professor teaches
+        in the slot, which also means at most one course per professor and slot.
+        """
+        problem = self.problem
+        grid = self.grid
+        candidates = defaultdict(list)
+        
+        for i, prof_vars in self.course_professor_vars.items():
+            for p in prof_vars:
+                for s in self.course_timeslot_vars.get(i, {}):
+                    # Unavailable assignments are always false, so leave them out
+                    # (unless availability is guarded and may be switched off)
+                    if not problem.available[p, s] and not self.guard_constraints:
+                        continue
+                    
+                    assignment_var = self._assignment_literal(i, p, s)
+                    if assignment_var is not None:
+                        candidates[(p, s)].append(assignment_var)
+        
+        for (p, s), assignment_vars in candidates.items():
+            occupied = self.model.NewBoolVar(f"prof_{problem.professor_ids[p]}_occupies_{grid.slot_ids[s]}")
+            self.model.Add(occupied == sum(assignment_vars))
+            self.professor_occupancy[(p, s)] = occupied
+    
+    def _add_professor_interval_constraints(self):
+        """
+        Prevent double-booking and short breaks with one NoOverlap per professor.
+        
+        Each course instance gets start/end variables on a week-long minute axis,
+        derived from its slot variables and the real slot start/end times. The
+        end is padded by the minimum break, so two classes of a professor that
+        are closer than the break overlap, and days are spaced apart by the
+        same padding so a late class never blocks the next morning. Every
+        (professor, instance) pair then contributes one optional interval that
+        is present when the professor is assigned.
+        """
+        problem = self.problem
+        grid = self.grid
+        intervals_by_professor = defaultdict(list)
+        
+        # Gaps shorter than max(min_break, 1) are consecutive, as in TimeGrid.consecutive_pairs
+        padding = max(self.min_break_minutes, 1)
+        day_offset = grid.slot_day.astype(np.int64) * (MINUTES_PER_DAY + padding)
+        week_start = day_offset + grid.slot_start
+        week_end = day_offset + grid.slot_end + padding
+        
+        for i, prof_vars in self.course_professor_vars.items():
+            slot_vars = self.course_timeslot_vars.get(i, {})
+            if not prof_vars or not slot_vars:
+                continue
+            instance_id = problem.instance_ids[i]
+            
+            # Absolute start/end minute of every candidate slot for this instance
+            slots = list(slot_vars)
+            starts = week_start[slots].tolist()
+            ends = week_end[slots].tolist()
+            start_terms = [slot_vars[s] * start for s, start in zip(slots, starts)]
+            end_terms = [slot_vars[s] * end for s, end in zip(slots, ends)]
+            lengths = {end - start for start, end in zip(starts, ends)}
+            
+            # Interval expressions must be affine, so channel the sums into variables
+            start_var = self.model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(sorted(set(starts) | {0})), f"start_{instance_id}"
+            )
+            end_var = self.model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(sorted(set(ends) | {0})), f"end_{instance_id}"
+            )
+            size_var = self.model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(sorted(lengths | {0})), f"length_{instance_id}"
+            )
+            self.model.Add(start_var == sum(start_terms))
+            self.model.Add(end_var == sum(end_terms))
+            
+            for p, prof_var in prof_vars.items():
+                interval = self.model.NewOptionalIntervalVar(
+                    start_var, size_var, end_var, prof_var,
+                    f"interval_{instance_id}_prof_{problem.professor_ids[p]}"
+                )
+                intervals_by_professor[p].append(interval)
+        
+        # A professor's assigned intervals must not overlap
+        for p, intervals in intervals_by_professor.items():
+            if len(intervals) > 1:
+                self.model.AddNoOverlap(intervals)
     
     def _enforce_multi_class_constraints(self):
         """Add constraints for multi-class courses with absolute pattern enforcement."""
         print("\n=== ENFORCING MULTI-CLASS PATTERNS WITH ABSOLUTE CONSTRAINTS ===")
-        
-        # Group course instances by their base course_id
-        course_instances = {}
-        for course_instance_id in self.course_scheduled_vars:
-            course_id = course_instance_id.split('_')[0]
-            instance = int(course_instance_id.split('_')[1])
-            
-            if course_id not in course_instances:
-                course_instances[course_id] = []
-            course_instances[course_id].append((course_instance_id, instance))
+        problem = self.problem
         
         # Process each course with multiple instances
-        for course_id, instances in course_instances.items():
-            # Sort instances by number
-            instances.sort(key=lambda x: x[1])
+        for c in np.flatnonzero(problem.course_num_classes > 1).tolist():
+            course_id = problem.course_ids[c]
+            instances = list(problem.instances_of(c))
             num_classes = len(instances)
             
-            if num_classes <= 1:
-                continue  # Skip courses with only one instance
-                
             print(f"\nAbsolute pattern enforcement for {course_id} with {num_classes} classes")
             
             # 1. Ensure timeslot consistency (all instances use same timeslot number)
             self._enforce_absolute_timeslot_consistency(course_id, instances)
             
             # 2. Apply rigid day patterns based on number of classes
-            if num_classes == 2:
-                self._enforce_absolute_two_class_pattern(course_id, instances)
-            elif num_classes == 3:
-                self._enforce_absolute_three_class_pattern(course_id, instances)
-
+            self._enforce_absolute_day_pattern(course_id, instances)
+    
     def _enforce_absolute_timeslot_consistency(self, course_id, instances):
         """Ensure all instances of a course use the same time slot number."""
         print(f"  Enforcing absolute timeslot consistency for {course_id}")
-        
-        # Extract all instances
-        instance_ids = [instance_id for instance_id, _ in instances]
+        grid = self.grid
         
         # For each unique timeslot number (TS1, TS2, etc.)
         slot_numbers = set()
-        for instance_id in instance_ids:
-            for slot_id in self.course_timeslot_vars.get(instance_id, {}):
-                slot_number = slot_id.split('-')[0]
-                slot_numbers.add(slot_number)
+        for i in instances:
+            for s in self.course_timeslot_vars.get(i, {}):
+                slot_numbers.add(int(grid.slot_number[s]))
         
         # For each possible timeslot number, create a decision variable
         number_vars = {}
-        for slot_number in slot_numbers:
-            number_vars[slot_number] = self.model.NewBoolVar(f"{course_id}_uses_{slot_number}")
+        for n in sorted(slot_numbers):
+            number_vars[n] = self.model.NewBoolVar(f"{course_id}_uses_{grid.slot_number_names[n]}")
         
         # Exactly one timeslot number must be chosen
-        self.model.Add(sum(number_vars.values()) == 1)
+        self._guard(self.model.Add(sum(number_vars.values()) == self._scheduled_count(instances[0])),
+                    "slot_consistency", self.problem.course_index[course_id])
         
         # For each instance and each of its possible timeslots
-        for instance_id in instance_ids:
-            for slot_id, slot_var in self.course_timeslot_vars.get(instance_id, {}).items():
-                slot_number = slot_id.split('-')[0]
+        for i in instances:
+            for s, slot_var in self.course_timeslot_vars.get(i, {}).items():
+                n = int(grid.slot_number[s])
                 
                 # This timeslot can only be chosen if its number is chosen
-                if slot_number in number_vars:
-                    self.model.Add(slot_var <= number_vars[slot_number])
+                if n in number_vars:
+                    self.model.Add(slot_var <= number_vars[n])
                 else:
                     # If this slot number isn't a valid option, never choose it
                     self.model.Add(slot_var == 0)
-
-    def _enforce_absolute_two_class_pattern(self, course_id, instances):
-        """Force 2-class courses to follow either Mon+Wed or Tue+Thu pattern."""
-        if len(instances) != 2:
+    
+    def _enforce_absolute_day_pattern(self, course_id, instances):
+        """
+        Force multi-class courses onto one of the grid's day patterns.
+        
+        With the default teaching days, 2-class courses follow either
+        Monday+Wednesday or Tuesday+Thursday, and 3-class courses follow
+        Monday+Tuesday+Thursday. Pattern k puts instance j on day patterns[k][j].
+        """
+        problem = self.problem
+        grid = self.grid
+        patterns = grid.day_patterns(len(instances))
+        
+        print(f"  ABSOLUTE ENFORCEMENT: {len(instances)}-class pattern for {course_id}")
+        for idx, i in enumerate(instances):
+            print(f"    Instance {idx+1}: {problem.instance_ids[i]}")
+        
+        if not patterns:
+            print(f"    WARNING: No day pattern for {len(instances)} classes on the teaching days")
             return
         
-        instance1_id, instance2_id = instances[0][0], instances[1][0]
-        print(f"  ABSOLUTE ENFORCEMENT: 2-class pattern for {course_id}")
-        print(f"    Instance 1: {instance1_id}")
-        print(f"    Instance 2: {instance2_id}")
-        
-        # Create a pattern selector - determines which pattern to use
-        pattern_var = self.model.NewBoolVar(f"{course_id}_pattern")
-        
-        # Pattern 1 (pattern_var=0): Monday+Wednesday
-        # Pattern 2 (pattern_var=1): Tuesday+Thursday
-        
         # Track which slots are on which days for each instance
-        day_slots = {
-            instance1_id: {
-                "Monday": [], "Tuesday": [], "Wednesday": [], "Thursday": []
-            },
-            instance2_id: {
-                "Monday": [], "Tuesday": [], "Wednesday": [], "Thursday": []
-            }
-        }
-        
-        # Gather all slots by day
-        for instance_id in [instance1_id, instance2_id]:
-            for slot_id, slot_var in self.course_timeslot_vars.get(instance_id, {}).items():
-                day = self.time_slot_dict[slot_id]['day_of_week']
-                if day in day_slots[instance_id]:
-                    day_slots[instance_id][day].append((slot_id, slot_var))
+        day_slots = {i: [[] for _ in range(grid.num_days)] for i in instances}
+        for i in instances:
+            for s, slot_var in self.course_timeslot_vars.get(i, {}).items():
+                day_slots[i][grid.slot_day[s]].append(slot_var)
         
         # Print available slots for debugging
-        print(f"    Instance 1 available slots: Mon:{len(day_slots[instance1_id]['Monday'])}, " +
-            f"Tue:{len(day_slots[instance1_id]['Tuesday'])}, " +
-            f"Wed:{len(day_slots[instance1_id]['Wednesday'])}, " +
-            f"Thu:{len(day_slots[instance1_id]['Thursday'])}")
-        print(f"    Instance 2 available slots: Mon:{len(day_slots[instance2_id]['Monday'])}, " +
-            f"Tue:{len(day_slots[instance2_id]['Tuesday'])}, " +
-            f"Wed:{len(day_slots[instance2_id]['Wednesday'])}, " +
-            f"Thu:{len(day_slots[instance2_id]['Thursday'])}")
-        
-        # Now enforce pattern 1: Monday+Wednesday
-        # If pattern_var is FALSE (0):
-        #  - Instance 1 MUST be on Monday
-        #  - Instance 2 MUST be on Wednesday
-        
-        # Sum of all Monday slots for instance 1
-        if day_slots[instance1_id]["Monday"]:
-            monday_sum = sum(slot_var for _, slot_var in day_slots[instance1_id]["Monday"])
-            # When pattern_var=0, this sum must be 1
-            self.model.Add(monday_sum == 1).OnlyEnforceIf(pattern_var.Not())
-        else:
-            # If no Monday slots available, pattern 1 can't be used
-            self.model.Add(pattern_var == 1)
-        
-        # All non-Monday slots for instance 1 must be 0 when pattern_var=0
-        for day in ["Tuesday", "Wednesday", "Thursday"]:
-            for _, slot_var in day_slots[instance1_id][day]:
-                self.model.Add(slot_var == 0).OnlyEnforceIf(pattern_var.Not())
-        
-        # Sum of all Wednesday slots for instance 2
-        if day_slots[instance2_id]["Wednesday"]:
-            wednesday_sum = sum(slot_var for _, slot_var in day_slots[instance2_id]["Wednesday"])
-            # When pattern_var=0, this sum must be 1
-            self.model.Add(wednesday_sum == 1).OnlyEnforceIf(pattern_var.Not())
-        else:
-            # If no Wednesday slots available, pattern 1 can't be used
-            self.model.Add(pattern_var == 1)
-        
-        # All non-Wednesday slots for instance 2 must be 0 when pattern_var=0
-        for day in ["Monday", "Tuesday", "Thursday"]:
-            for _, slot_var in day_slots[instance2_id][day]:
-                self.model.Add(slot_var == 0).OnlyEnforceIf(pattern_var.Not())
-        
-        # Now enforce pattern 2: Tuesday+Thursday
-        # If pattern_var is TRUE (1):
-        #  - Instance 1 MUST be on Tuesday
-        #  - Instance 2 MUST be on Thursday
-        
-        # Sum of all Tuesday slots for instance 1
-        if day_slots[instance1_id]["Tuesday"]:
-            tuesday_sum = sum(slot_var for _, slot_var in day_slots[instance1_id]["Tuesday"])
-            # When pattern_var=1, this sum must be 1
-            self.model.Add(tuesday_sum == 1).OnlyEnforceIf(pattern_var)
-        else:
-            # If no Tuesday slots available, pattern 2 can't be used
-            self.model.Add(pattern_var == 0)
-        
-        # All non-Tuesday slots for instance 1 must be 0 when pattern_var=1
-        for day in ["Monday", "Wednesday", "Thursday"]:
-            for _, slot_var in day_slots[instance1_id][day]:
-                self.model.Add(slot_var == 0).OnlyEnforceIf(pattern_var)
-        
-        # Sum of all Thursday slots for instance 2
-        if day_slots[instance2_id]["Thursday"]:
-            thursday_sum = sum(slot_var for _, slot_var in day_slots[instance2_id]["Thursday"])
-            # When pattern_var=1, this sum must be 1
-            self.model.Add(thursday_sum == 1).OnlyEnforceIf(pattern_var)
-        else:
-            # If no Thursday slots available, pattern 2 can't be used
-            self.model.Add(pattern_var == 0)
-        
-        # All non-Thursday slots for instance 2 must be 0 when pattern_var=1
-        for day in ["Monday", "Tuesday", "Wednesday"]:
-            for _, slot_var in day_slots[instance2_id][day]:
-                self.model.Add(slot_var == 0).OnlyEnforceIf(pattern_var)
-
-    def _enforce_absolute_three_class_pattern(self, course_id, instances):
-        """Force 3-class courses to follow Monday+Tuesday+Thursday pattern."""
-        if len(instances) != 3:
-            return
-        
-        instance_ids = [instance_id for instance_id, _ in instances]
-        print(f"  ABSOLUTE ENFORCEMENT: 3-class pattern for {course_id}")
-        print(f"    Instance 1: {instance_ids[0]}")
-        print(f"    Instance 2: {instance_ids[1]}")
-        print(f"    Instance 3: {instance_ids[2]}")
-        
-        # Required pattern: Monday+Tuesday+Thursday
-        required_days = ["Monday", "Tuesday", "Thursday"]
-        
-        # For each instance, track slots by day
-        day_slots = {}
-        for idx, instance_id in enumerate(instance_ids):
-            day_slots[instance_id] = {day: [] for day in required_days + ["Wednesday"]}
-            
-            # Gather slots by day
-            for slot_id, slot_var in self.course_timeslot_vars.get(instance_id, {}).items():
-                day = self.time_slot_dict[slot_id]['day_of_week']
-                if day in day_slots[instance_id]:
-                    day_slots[instance_id][day].append((slot_id, slot_var))
-            
-            # Print available slots for debugging
-            target_day = required_days[idx]
-            print(f"    Instance {idx+1} available slots for target day {target_day}: " +
-                f"{len(day_slots[instance_id][target_day])}")
-        
-        # For each instance, enforce its required day and forbid other days
-        for idx, instance_id in enumerate(instance_ids):
-            target_day = required_days[idx]
-            other_days = [d for d in day_slots[instance_id].keys() if d != target_day]
-            
-            # Sum of all slots on target day must be 1
-            if day_slots[instance_id][target_day]:
-                target_sum = sum(slot_var for _, slot_var in day_slots[instance_id][target_day])
-                self.model.Add(target_sum == 1)
-            else:
-                print(f"    WARNING: Instance {idx+1} has no slots on required {target_day}")
-                # This is a hard constraint that cannot be satisfied
-                # We'll let the solver fail and report conflicts
-            
-            # All slots on other days must be 0
-            for day in other_days:
-                for _, slot_var in day_slots[instance_id][day]:
-                    self.model.Add(slot_var == 0)
-
+        for idx, i in enumerate(instances):
+            counts = ", ".join(f"{grid.day_names[d][:3]}:{len(day_slots[i][d])}" for d in range(grid.num_days))
+            print(f"    Instance {idx+1} available slots: {counts}")
+        
+        # Create a pattern selector per pattern - exactly one pattern is used
+        pattern_vars = []
+        for pattern in patterns:
+            pattern_name = "_".join(grid.day_names[d] for d in pattern)
+            pattern_vars.append(self.model.NewBoolVar(f"{course_id}_pattern_{pattern_name}"))
+        self._guard(self.model.Add(sum(pattern_vars) == self._scheduled_count(instances[0])),
+                    "day_pattern", problem.course_index[course_id])
+        
+        for pattern, pattern_var in zip(patterns, pattern_vars):
+            for idx, (i, target_day) in enumerate(zip(instances, pattern)):
+                # Sum of all slots on the target day must be 1 when this pattern is used
+                if day_slots[i][target_day]:
+                    self.model.Add(sum(day_slots[i][target_day]) == 1).OnlyEnforceIf(pattern_var)
+                else:
+                    # If the target day has no slots, this pattern can't be used
+                    print(f"    WARNING: Instance {idx+1} has no slots on {grid.day_names[target_day]}")
+                    self.model.Add(pattern_var == 0)
+                
+                # All slots on other days must be 0 when this pattern is used
+                for d in range(grid.num_days):
+                    if d != target_day:
+                        for slot_var in day_slots[i][d]:
+                            self.model.Add(slot_var == 0).OnlyEnforceIf(pattern_var)
+    
     def _add_consecutive_slot_constraints(self):
-        """Prevent professors from teaching in consecutive time slots."""
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday"]:
-            # Sort time slots by start time
-            day_slots = sorted(
-                self.time_slots_by_day[day],
-                key=lambda x: x['start_time']
-            )
+        """
+        Prevent professors from teaching in consecutive time slots.
+        
+        Two slots are consecutive when the second starts less than the minimum
+        break after the first ends (precomputed by the time grid). Each such
+        pair needs a single constraint per professor on the shared occupancy
+        literals.
+        """
+        occupancy_by_slot = defaultdict(dict)
+        for (p, s), occupied in self.professor_occupancy.items():
+            occupancy_by_slot[s][p] = occupied
+        
+        for s1, s2 in self.grid.consecutive_pairs(self.min_break_minutes).tolist():
+            occupied_at_slot1 = occupancy_by_slot.get(s1, {})
+            occupied_at_slot2 = occupancy_by_slot.get(s2, {})
             
-            # For each pair of consecutive time slots
-            for i in range(len(day_slots) - 1):
-                slot1 = day_slots[i]
-                slot2 = day_slots[i + 1]
-                slot1_id = slot1['timeslot_id']
-                slot2_id = slot2['timeslot_id']
-                
-                # For each professor
-                for prof_id in self.professor_dict:
-                    # Find course instances that could be assigned to this professor at these time slots
-                    courses_at_slot1 = []
-                    courses_at_slot2 = []
-                    
-                    for course_instance_id in self.course_scheduled_vars:
-                        # Check if this course instance could be assigned to this slot and professor
-                        prof_vars = self.course_professor_vars.get(course_instance_id, {})
-                        slot_vars = self.course_timeslot_vars.get(course_instance_id, {})
-                        
-                        if prof_id in prof_vars:
-                            prof_var = prof_vars[prof_id]
-                            
-                            if slot1_id in slot_vars:
-                                slot1_var = slot_vars[slot1_id]
-                                
-                                # Variable is 1 if course is assigned to professor and slot1
-                                assignment_var1 = self.model.NewBoolVar(
-                                    f"prof_{prof_id}_slot_{slot1_id}_course_{course_instance_id}"
-                                )
-                                self.model.AddBoolAnd([prof_var, slot1_var]).OnlyEnforceIf(assignment_var1)
-                                self.model.AddBoolOr([prof_var.Not(), slot1_var.Not()]).OnlyEnforceIf(assignment_var1.Not())
-                                
-                                courses_at_slot1.append(assignment_var1)
-                            
-                            if slot2_id in slot_vars:
-                                slot2_var = slot_vars[slot2_id]
-                                
-                                # Variable is 1 if course is assigned to professor and slot2
-                                assignment_var2 = self.model.NewBoolVar(
-                                    f"prof_{prof_id}_slot_{slot2_id}_course_{course_instance_id}"
-                                )
-                                self.model.AddBoolAnd([prof_var, slot2_var]).OnlyEnforceIf(assignment_var2)
-                                self.model.AddBoolOr([prof_var.Not(), slot2_var.Not()]).OnlyEnforceIf(assignment_var2.Not())
-                                
-                                courses_at_slot2.append(assignment_var2)
-                    
-                    # A professor cannot teach in consecutive time slots
-                    for var1 in courses_at_slot1:
-                        for var2 in courses_at_slot2:
-                            self.model.Add(var1 + var2 <= 1)
+            # A professor cannot teach in both slots
+            for p, occupied1 in occupied_at_slot1.items():
+                occupied2 = occupied_at_slot2.get(p)
+                if occupied2 is not None:
+                    self._guard(self.model.Add(occupied1 + occupied2 <= 1), "back_to_back", p)
     
     def _add_professor_availability_constraints(self):
         """Ensure courses are scheduled only when professors are available."""
-        for course_instance_id in self.course_scheduled_vars:
+        available = self.problem.available
+        
+        for i in self.course_scheduled_vars:
             # For each possible professor and time slot
-            for prof_id, prof_var in self.course_professor_vars.get(course_instance_id, {}).items():
-                for slot_id, slot_var in self.course_timeslot_vars.get(course_instance_id, {}).items():
-                    time_slot = self.time_slot_dict[slot_id]
-                    day = time_slot['day_of_week']
-                    
+            for p, prof_var in self.course_professor_vars.get(i, {}).items():
+                for s, slot_var in self.course_timeslot_vars.get(i, {}).items():
                     # If professor is not available, course can't use this professor and time slot
-                    is_available = self._is_professor_available(prof_id, slot_id, day)
-                    if not is_available:
-                        self.model.Add(prof_var + slot_var <= 1)
+                    if not available[p, s]:
+                        self._guard(self.model.Add(prof_var + slot_var <= 1), "availability", p)
+    
+    def _slot_key(self, s):
+        """Readable day/slot key for slot index s, used in variable names."""
+        grid = self.grid
+        return f"{grid.day_names[grid.slot_day[s]]}_{grid.slot_ids[s]}"
     
     def _add_distribution_tracking(self):
         """Add variables to track distribution metrics for optimization."""
-        valid_days = ["Monday", "Tuesday", "Wednesday", "Thursday"]
+        grid = self.grid
+        
+        # Collect the course variables that could be assigned to each time slot
+        slot_course_vars = defaultdict(list)
+        for i, slot_vars in self.course_timeslot_vars.items():
+            for s, slot_var in slot_vars.items():
+                slot_course_vars[s].append(slot_var)
         
         # 1. Track courses per time slot
-        for day in valid_days:
-            for time_slot in self.time_slots_by_day[day]:
-                slot_id = time_slot['timeslot_id']
-                slot_key = f"{day}_{slot_id}"
-                
-                # Get all course variables that could be assigned to this time slot
-                course_vars = []
-                for course_instance_id, slot_vars in self.course_timeslot_vars.items():
-                    if slot_id in slot_vars:
-                        course_vars.append(slot_vars[slot_id])
+        for day_slots in grid.slots_by_day:
+            for s in day_slots.tolist():
+                course_vars = slot_course_vars[s]
                 
                 # Variable to track how many courses are assigned to this slot
                 max_possible = len(course_vars)
-                self.courses_per_timeslot[slot_key] = self.model.NewIntVar(
-                    0, max_possible, f"courses_at_{slot_key}"
+                self.max_courses_per_timeslot[s] = max_possible
+                self.courses_per_timeslot[s] = self.model.NewIntVar(
+                    0, max_possible, f"courses_at_{self._slot_key(s)}"
                 )
                 
                 # Set this variable equal to the sum of course variables
-                self.model.Add(self.courses_per_timeslot[slot_key] == sum(course_vars))
+                self.model.Add(self.courses_per_timeslot[s] == sum(course_vars))
         
         # 2. Track courses per day
-        for day in valid_days:
-            day_course_vars = []
-            
-            for time_slot in self.time_slots_by_day[day]:
-                slot_id = time_slot['timeslot_id']
-                slot_key = f"{day}_{slot_id}"
-                day_course_vars.append(self.courses_per_timeslot[slot_key])
+        for d, day_slots in enumerate(grid.slots_by_day):
+            day_course_vars = [self.courses_per_timeslot[s] for s in day_slots.tolist()]
             
             # Variable to track how many courses are on this day
-            self.courses_per_day[day] = self.model.NewIntVar(
-                0, self.total_course_instances, f"courses_on_{day}"
+            self.courses_per_day[d] = self.model.NewIntVar(
+                0, self.total_course_instances, f"courses_on_{grid.day_names[d]}"
             )
             
             # Set this variable equal to the sum of courses on this day
-            self.model.Add(self.courses_per_day[day] == sum(day_course_vars))
+            self.model.Add(self.courses_per_day[d] == sum(day_course_vars))
         
         # 3. Track day imbalance (max - min)
         max_day_count = self.model.NewIntVar(0, self.total_course_instances, "max_day_count")
         min_day_count = self.model.NewIntVar(0, self.total_course_instances, "min_day_count")
         
-        for day, count_var in self.courses_per_day.items():
+        for d, count_var in self.courses_per_day.items():
             self.model.Add(max_day_count >= count_var)
             self.model.Add(min_day_count <= count_var)
         
@@ -692,28 +1350,14 @@ class CourseScheduler:
     
     def _add_similar_slot_tracking(self):
         """Track distribution across similar time slots."""
-        # Group time slots by their slot number (TS1, TS2, etc.)
-        slot_groups = {}
+        grid = self.grid
         
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday"]:
-            for time_slot in self.time_slots_by_day[day]:
-                slot_id = time_slot['timeslot_id']
-                slot_number = slot_id.split('-')[0]  # e.g., 'TS1'
-                
-                if slot_number not in slot_groups:
-                    slot_groups[slot_number] = {}
-                
-                slot_key = f"{day}_{slot_id}"
-                if slot_key in self.courses_per_timeslot:
-                    if day not in slot_groups[slot_number]:
-                        slot_groups[slot_number][day] = []
-                    slot_groups[slot_number][day].append(self.courses_per_timeslot[slot_key])
-        
-        # For each group of similar slots, track imbalance
+        # For each group of similar slots (TS1, TS2, etc.), track imbalance
         self.similar_slot_imbalances = {}
         
-        for slot_number, days in slot_groups.items():
-            if len(days) <= 1:
+        for n, number_slots in enumerate(grid.slots_by_number):
+            slot_number = grid.slot_number_names[n]
+            if len(np.unique(grid.slot_day[number_slots])) <= 1:
                 continue  # Skip if only on one day
             
             # Find the max and min for this slot group
@@ -721,9 +1365,7 @@ class CourseScheduler:
             group_min = self.model.NewIntVar(0, self.total_course_instances, f"min_{slot_number}")
             
             # Collect all count variables for this slot group
-            group_counts = []
-            for day_slots in days.values():
-                group_counts.extend(day_slots)
+            group_counts = [self.courses_per_timeslot[s] for s in number_slots.tolist()]
             
             # Set max and min variables
             for count_var in group_counts:
@@ -740,61 +1382,133 @@ class CourseScheduler:
             self.model.Add(imbalance == group_max - group_min)
             
             # Store for objective function
-            self.similar_slot_imbalances[slot_number] = imbalance
+            self.similar_slot_imbalances[n] = imbalance
     
     def _add_objective_function(self):
         """Define a comprehensive objective function for optimization."""
+        problem = self.problem
+        grid = self.grid
         objective_terms = []
         
         # HIGHEST PRIORITY: Multi-class course patterns
         if hasattr(self, 'pattern_reward'):
             pattern_reward_term = self.model.NewConstant(self.pattern_reward)
             objective_terms.append(pattern_reward_term)
-            
+        
         # Next highest: Timeslot consistency for multi-class courses
         if hasattr(self, 'slot_consistency_reward'):
             slot_reward_term = self.model.NewConstant(self.slot_consistency_reward)
             objective_terms.append(slot_reward_term)
-
+        
         # 1. Minimize day imbalance (with negative coefficient)
-        objective_terms.append(self.day_imbalance * -5)
+        day_balance_terms = [self.day_imbalance * -1]
         
         # 2. Penalize excessive courses in any time slot
-        for slot_key, count_var in self.courses_per_timeslot.items():
-            # Graduated penalty: The more courses in a slot, the higher the penalty
-            for i in range(1, self.target_max_per_slot * 2):
-                # Variable is 1 if slot has more than i courses
-                over_i = self.model.NewBoolVar(f"over_{i}_{slot_key}")
-                self.model.Add(count_var > i).OnlyEnforceIf(over_i)
-                self.model.Add(count_var <= i).OnlyEnforceIf(over_i.Not())
-                
-                # Increasing penalty for each additional course
-                penalty = -1 * (i ** 2)  # Quadratic penalty
-                objective_terms.append(over_i * penalty)
+        slot_balance_terms = []
+        for s, count_var in self.courses_per_timeslot.items():
+            slot_balance_terms.extend(self._slot_load_penalty_terms(s, count_var))
         
         # 3. Penalize imbalances in similar time slots
-        for slot_number, imbalance in self.similar_slot_imbalances.items():
+        for n, imbalance in self.similar_slot_imbalances.items():
             # Stronger penalty for popular time slots
-            weight = -10 if slot_number in ['TS1', 'TS2', 'TS3'] else -5
-            objective_terms.append(imbalance * weight)
+            weight = -10 if grid.slot_number_names[n] in ['TS1', 'TS2', 'TS3'] else -5
+            slot_balance_terms.append(imbalance * weight)
         
         # 4. Prefer assigning core courses to better time slots
-        for course_instance_id, slot_vars in self.course_timeslot_vars.items():
-            course_id = course_instance_id.split('_')[0]
-            course = self.course_dict[course_id]
-            
-            if course.get('is_core', False):
+        # Better slots (TS1, TS2) get higher weights
+        core_preference_terms = []
+        slot_pref_weight = np.where(
+            np.isin(np.array(grid.slot_number_names)[grid.slot_number], ['TS1', 'TS2']), 3, 1
+        )
+        for i, slot_vars in self.course_timeslot_vars.items():
+            if problem.course_is_core[problem.instance_course[i]]:
                 # Prioritize early slots for core courses
-                for slot_id, slot_var in slot_vars.items():
-                    slot_num = slot_id.split('-')[0]
-                    # Better slots (TS1, TS2) get higher weights
-                    pref_weight = 3 if slot_num in ['TS1', 'TS2'] else 1
-                    objective_terms.append(slot_var * pref_weight)
-        
-        self.model.Maximize(sum(objective_terms))
+                for s, slot_var in slot_vars.items():
+                    core_preference_terms.append(slot_var * int(slot_pref_weight[s]))
+        
+        # Objective tiers in priority order, each to be maximized
+        self.objective_tiers = [
+            ("day_balance", sum(day_balance_terms)),
+            ("slot_balance", sum(slot_balance_terms)),
+            ("core_preference", sum(core_preference_terms))
+        ]
+        for name, tier in self.objective_tiers:
+            objective_terms.append(tier * OBJECTIVE_TIER_WEIGHTS[name])
+        
+        self.objective_expression = sum(objective_terms)
+        self.model.Maximize(self.objective_expression)
+    
+    def _ladder_penalty_table(self, max_count):
+        """
+        Penalty of every possible slot load under the graduated ladder.
+        
+        A slot with count courses pays i^2 for every threshold i < count,
+        for thresholds 1 .. 2 * target_max_per_slot - 1.
+        """
+        thresholds = np.arange(1, self.target_max_per_slot * 2)
+        counts = np.arange(max_count + 1)
+        return ((thresholds[None, :] < counts[:, None]) * thresholds ** 2).sum(axis=1).tolist()
+    
+    def _slot_load_penalty_terms(self, s, count_var):
+        """
+        Objective terms penalizing the number of courses in slot s.
+        
+        'ladder' reifies one boolean per threshold (the original encoding),
+        'table' looks up the same ladder cost with a single element constraint,
+        'convex' bounds the ladder's i^2 steps from below with one linear cut
+        per step up to 2 * target_max_per_slot courses, the last cut
+        continuing linearly past that point, and 'squared' penalizes count^2
+        with a multiplication constraint.
+        
+        The ladder cost stops growing after 2 * target_max_per_slot courses,
+        so 'ladder' and 'table' can pile courses into one slot once it is past
+        that point. 'convex' has no such plateau and the tightest relaxation,
+        with at most 2 * target_max_per_slot - 1 cuts however many courses
+        could use the slot.
+        """
+        slot_key = self._slot_key(s)
+        max_count = self.max_courses_per_timeslot[s]
+        
+        if self.slot_load_penalty == 'convex':
+            # cost[c] = 1^2 + 2^2 + ... + (c - 1)^2 up to the ladder's last
+            # threshold, then growing by the last step per extra course
+            knee = min(max_count, self.target_max_per_slot * 2)
+            cost = np.concatenate(([0], np.cumsum(np.arange(knee) ** 2))).tolist()
+            top = cost[-1] + (knee - 1) ** 2 * (max_count - knee)
+            penalty = self.model.NewIntVar(0, max(top, 0), f"load_penalty_{slot_key}")
+            for c in range(1, knee):
+                # The cost is convex, so it lies above the line through each step
+                self.model.Add(penalty >= cost[c] + (cost[c + 1] - cost[c]) * (count_var - c))
+            return [penalty * -1]
+        
+        if self.slot_load_penalty == 'table':
+            table = self._ladder_penalty_table(max_count)
+            penalty = self.model.NewIntVar(0, table[-1], f"load_penalty_{slot_key}")
+            self.model.AddElement(count_var, table, penalty)
+            return [penalty * -1]
+        
+        if self.slot_load_penalty == 'squared':
+            squared = self.model.NewIntVar(0, max_count ** 2, f"load_squared_{slot_key}")
+            self.model.AddMultiplicationEquality(squared, [count_var, count_var])
+            return [squared * -1]
+        
+        terms = []
+        # Graduated penalty: The more courses in a slot, the higher the penalty
+        for i in range(1, self.target_max_per_slot * 2):
+            # Variable is 1 if slot has more than i courses
+            over_i = self.model.NewBoolVar(f"over_{i}_{slot_key}")
+            self.model.Add(count_var > i).OnlyEnforceIf(over_i)
+            self.model.Add(count_var <= i).OnlyEnforceIf(over_i.Not())
+            
+            # Increasing penalty for each additional course
+            penalty = -1 * (i ** 2)  # Quadratic penalty
+            terms.append(over_i * penalty)
+        return terms
     
     def _extract_solution(self, status, solve_time):
         """Extract the solution from the solved model."""
+        problem = self.problem
+        grid = self.grid
         result = {
             "success": True,
             "result": {
@@ -802,138 +1516,142 @@ class CourseScheduler:
                 "conflicts": [],  # Initialize conflicts array even if empty
                 "statistics": {
                     "solver_status": self._get_status_string(status),
-                    "solver_time": solve_time
+                    "solver_time": solve_time,
+                    "first_solution_time": self.solution_timer.first_solution_time,
+                    "solver_profile": self.solver_profile,
+                    "objective_mode": self.objective_mode,
+                    "warm_start": self.warm_start,
+                    "delta": self.delta_summary
                 }
             }
         }
         
-        # Dictionary to track courses by time slot
-        courses_by_timeslot = {}
-        professors_by_timeslot = {}
+        # Assigned day index, and (professor, slot), per scheduled instance
+        instance_days = {}
+        assignments = {}
         
         # Extract scheduled courses
         scheduled_count = 0
         core_scheduled = 0
-        core_total = 0
-        scheduled_course_ids = set()  # Keep track of scheduled courses
         
         # Count total core courses
-        for course in self.courses:
-            if course.get('is_core', False):
-                core_total += course.get('num_classes', 1)
+        core_total = int(problem.course_num_classes[problem.course_is_core].sum())
         
         # Process all scheduled course instances
-        for course_instance_id, scheduled_var in self.course_scheduled_vars.items():
-            course_id = course_instance_id.split('_')[0]
-            instance_num = int(course_instance_id.split('_')[1])
+        for i, scheduled_var in self.course_scheduled_vars.items():
+            if self.solver.Value(scheduled_var) != 1:
+                continue
             
-            if self.solver.Value(scheduled_var) == 1:
-                course = self.course_dict[course_id]
-                
-                # Find assigned professor
-                assigned_prof_id = None
-                for prof_id, prof_var in self.course_professor_vars[course_instance_id].items():
-                    if self.solver.Value(prof_var) == 1:
-                        assigned_prof_id = prof_id
-                        break
-                
-                # Find assigned time slot
-                assigned_slot_id = None
-                assigned_day = None
-                
-                for slot_id, slot_var in self.course_timeslot_vars[course_instance_id].items():
-                    if self.solver.Value(slot_var) == 1:
-                        assigned_slot_id = slot_id
-                        assigned_day = self.time_slot_dict[slot_id]['day_of_week']
-                        break
-                
-                # Only process if we have both professor and time slot assigned
-                if assigned_prof_id and assigned_slot_id:
-                    scheduled_count += 1
-                    scheduled_course_ids.add(course_instance_id)
-                    
-                    if course.get('is_core', False):
-                        core_scheduled += 1
-                    
-                    # Track courses by time slot for analysis
-                    slot_key = f"{assigned_day}_{assigned_slot_id}"
-                    if slot_key not in courses_by_timeslot:
-                        courses_by_timeslot[slot_key] = []
-                    
-                    courses_by_timeslot[slot_key].append({
-                        "course_id": course_id,
-                        "course_instance_id": course_instance_id,
-                        "is_core": course.get('is_core', False)
-                    })
-                    
-                    # Track professors by time slot
-                    if slot_key not in professors_by_timeslot:
-                        professors_by_timeslot[slot_key] = {}
-                    
-                    if assigned_prof_id not in professors_by_timeslot[slot_key]:
-                        professors_by_timeslot[slot_key][assigned_prof_id] = []
-                    
-                    professors_by_timeslot[slot_key][assigned_prof_id].append(course_instance_id)
-                    
-                    # Add to scheduled courses
-                    result["result"]["scheduled_courses"].append({
-                        "scheduled_course_id": f"SC-{course_instance_id}",
-                        "schedule_id": self.schedule_id,
-                        "course_id": course_id,
-                        "professor_id": assigned_prof_id,
-                        "timeslot_id": assigned_slot_id,
-                        "day_of_week": assigned_day,
-                        "is_override": False,
-                        "class_instance": instance_num,
-                        "num_classes": course.get('num_classes', 1),
-                        "course_data": course,
-                        "professor_data": self.professor_dict.get(assigned_prof_id, {}),
-                        "time_slot_data": self.time_slot_dict.get(assigned_slot_id, {})
-                    })
+            c = int(problem.instance_course[i])
+            course_id = problem.course_ids[c]
+            course = self.course_dict[course_id]
+            
+            # Find assigned professor
+            assigned_prof = None
+            for p, prof_var in self.course_professor_vars[i].items():
+                if self.solver.Value(prof_var) == 1:
+                    assigned_prof = p
+                    break
+            
+            # Find assigned time slot
+            assigned_slot = None
+            for s, slot_var in self.course_timeslot_vars[i].items():
+                if self.solver.Value(slot_var) == 1:
+                    assigned_slot = s
+                    break
+            
+            # Only process if we have both professor and time slot assigned
+            if assigned_prof is None or assigned_slot is None:
+                continue
+            
+            scheduled_count += 1
+            if problem.course_is_core[c]:
+                core_scheduled += 1
+            
+            instance_days[i] = int(grid.slot_day[assigned_slot])
+            assignments[i] = (assigned_prof, assigned_slot)
+            
+            prof_id = problem.professor_ids[assigned_prof]
+            slot_id = grid.slot_ids[assigned_slot]
+            
+            # Add to scheduled courses
+            result["result"]["scheduled_courses"].append({
+                "scheduled_course_id": f"SC-{problem.instance_ids[i]}",
+                "schedule_id": self.schedule_id,
+                "course_id": course_id,
+                "professor_id": prof_id,
+                "timeslot_id": slot_id,
+                "day_of_week": grid.day_names[instance_days[i]],
+                "is_override": False,
+                "class_instance": int(problem.instance_number[i]),
+                "num_classes": course.get('num_classes', 1),
+                "course_data": course,
+                "professor_data": self.professor_dict.get(prof_id, {}),
+                "time_slot_data": self.time_slot_dict.get(slot_id, {})
+            })
         
         # Find unscheduled courses and add them as conflicts
-        for course_instance_id, scheduled_var in self.course_scheduled_vars.items():
-            course_id = course_instance_id.split('_')[0]
-            instance_num = int(course_instance_id.split('_')[1])
+        blocking_reasons = self._blocking_reasons(assignments)
+        for i in self.course_scheduled_vars:
+            if i in instance_days:
+                continue
             
-            if course_instance_id not in scheduled_course_ids:
-                course = self.course_dict[course_id]
-                
-                # Determine best professor (if any)
-                best_prof_id = None
-                for prof_id in self.course_professor_vars[course_instance_id]:
-                    if self._can_professor_teach_course(prof_id, course_id):
-                        best_prof_id = prof_id
-                        break
-                
-                # Add conflict with the structure expected by Node.js
-                result["result"]["conflicts"].append({
-                    "conflict": {
-                        "conflict_id": f"CONF-{course_instance_id}",
-                        "schedule_id": self.schedule_id,
-                        "timeslot_id": None,  # No time slot assigned
-                        "day_of_week": None,  # No day assigned
-                        "conflict_type": "NO_AVAILABLE_SLOT",
-                        "description": f"Could not schedule course {course_id} (instance {instance_num})",
-                        "is_resolved": False,
-                        "resolution_notes": None
-                    },
-                    "scheduled_course": {
-                        "course_id": course_id,
-                        "professor_id": best_prof_id,
-                        "class_instance": instance_num,
-                        "num_classes": course.get('num_classes', 1)
-                    },
-                    "conflict_course": {
-                        "scheduled_course_id": f"SC-{course_instance_id}"
-                    }
-                })
-        
-        # Calculate day counts from courses_by_timeslot
+            c = int(problem.instance_course[i])
+            course_id = problem.course_ids[c]
+            course = self.course_dict[course_id]
+            instance_id = problem.instance_ids[i]
+            instance_num = int(problem.instance_number[i])
+            
+            # Determine best professor (if any)
+            best_prof_id = None
+            for p in self.course_professor_vars[i]:
+                if problem.qualified[c, p]:
+                    best_prof_id = problem.professor_ids[p]
+                    break
+            
+            # Add conflict with the structure expected by Node.js
+            result["result"]["conflicts"].append({
+                "conflict": {
+                    "conflict_id": f"CONF-{instance_id}",
+                    "schedule_id": self.schedule_id,
+                    "timeslot_id": None,  # No time slot assigned
+                    "day_of_week": None,  # No day assigned
+                    "conflict_type": "NO_AVAILABLE_SLOT",
+                    "description": f"Could not schedule course {course_id} (instance {instance_num}): "
+                                   f"{blocking_reasons[i]}",
+                    "is_resolved": False,
+                    "resolution_notes": None
+                },
+                "scheduled_course": {
+                    "course_id": course_id,
+                    "professor_id": best_prof_id,
+                    "class_instance": instance_num,
+                    "num_classes": course.get('num_classes', 1)
+                },
+                "conflict_course": {
+                    "scheduled_course_id": f"SC-{instance_id}"
+                },
+                "blocking_reason": blocking_reasons[i]
+            })
+        
+        # Calculate day counts
         day_counts = {}
-        for slot_key, courses in courses_by_timeslot.items():
-            day = slot_key.split('_')[0]
-            day_counts[day] = day_counts.get(day, 0) + len(courses)
+        for d in instance_days.values():
+            day = grid.day_names[d]
+            day_counts[day] = day_counts.get(day, 0) + 1
+        
+        if self.objective_mode == 'lexicographic' or self.soft_completion:
+            result["result"]["statistics"]["stages"] = self.stage_statistics
+        if self.soft_completion:
+            unscheduled_core = [i for i in self.course_scheduled_vars
+                                if i not in instance_days and problem.course_is_core[problem.instance_course[i]]]
+            result["result"]["statistics"]["completion"] = {
+                "scheduled": scheduled_count,
+                "unscheduled": self.total_course_instances - scheduled_count,
+                "core_unscheduled": len(unscheduled_core)
+            }
+        if self.lns is not None:
+            result["result"]["statistics"]["lns"] = self.lns.report()
         
         # Update statistics
         result["result"]["statistics"].update({
@@ -944,19 +1662,133 @@ class CourseScheduler:
             "core_courses_scheduled": core_scheduled,
             "core_percentage": round((core_scheduled / core_total) * 100, 2) if core_total > 0 else 100,
             "unresolved_conflicts": len(result["result"]["conflicts"]),
-            "courses_by_day": day_counts
+            "courses_by_day": day_counts,
+            "domain_pruning": self.domain_pruning,
+            "feasibility": self.feasibility.report() if self.feasibility else None
         })
         
         # For debugging: print a detailed breakdown of the schedule
-        self._print_schedule_analysis(courses_by_timeslot, day_counts)
+        self._print_schedule_analysis(instance_days)
         
         return result
     
+    def _greedy_completion(self, solve_time):
+        """
+        Greedy draft as the softCompletion result when CP-SAT found no solution in time.
+        
+        The draft respects every hard rule, so it is a valid partial schedule;
+        its unplaced instances get blocking reasons like the solver's.
+        """
+        problem = self.problem
+        print("No solution within the time limit, returning the greedy draft")
+        result = GreedyScheduler(self.data, problem=self.problem).solve()
+        assignments, _ = map_schedule(problem, result["result"]["scheduled_courses"])
+        reasons = self._blocking_reasons(assignments)
+        
+        for conflict in result["result"]["conflicts"]:
+            entry = conflict["scheduled_course"]
+            i = int(problem.course_first_instance[problem.course_index[entry["course_id"]]]) + entry["class_instance"] - 1
+            conflict["conflict"]["description"] += f": {reasons[i]}"
+            conflict["blocking_reason"] = reasons[i]
+        
+        statistics = result["result"]["statistics"]
+        unscheduled_core = sum(1 for i in reasons if problem.course_is_core[problem.instance_course[i]])
+        statistics.update({
+            "solver_time": solve_time,
+            "solver_profile": self.solver_profile,
+            "stages": self.stage_statistics,
+            "completion": {
+                "scheduled": len(assignments),
+                "unscheduled": len(reasons),
+                "core_unscheduled": unscheduled_core
+            },
+            "feasibility": self.feasibility.report() if self.feasibility else None
+        })
+        return result
+    
+    def _blocking_reasons(self, assignments):
+        """
+        Why each unscheduled instance could not be placed.
+        
+        Reasons are checked from the most to the least definite: no qualified
+        professor, a pre-check proving the course impossible, no qualified
+        professor available in a usable slot, every such slot taken by the
+        professors' other classes or breaks in the final schedule, no day
+        pattern left with one free slot number on every day, and otherwise
+        a free placement the solver did not reach within its time limit.
+        
+        Args:
+            assignments: {instance: (professor, slot)} of the scheduled instances
+        
+        Returns:
+            {instance: reason} for every unscheduled instance
+        """
+        problem = self.problem
+        grid = self.grid
+        blocked = self.feasibility.blocked if self.feasibility is not None else {}
+        
+        # Slots a professor can no longer take after teaching in slot s
+        blocks = np.eye(grid.num_slots, dtype=bool)
+        pairs = grid.consecutive_pairs(self.min_break_minutes)
+        blocks[pairs[:, 0], pairs[:, 1]] = True
+        blocks[pairs[:, 1], pairs[:, 0]] = True
+        free = problem.available.copy()
+        for p, s in assignments.values():
+            free[p, blocks[s]] = False
+        
+        reasons = {}
+        for i in self.course_scheduled_vars:
+            if i in assignments:
+                continue
+            c = int(problem.instance_course[i])
+            qualified = np.flatnonzero(problem.qualified[c])
+            slots = np.array(sorted(self.course_timeslot_vars.get(i, {})), dtype=np.int64)
+            duration = int(problem.course_duration[c])
+            
+            if not len(qualified):
+                reasons[i] = "no qualified professor"
+            elif c in blocked:
+                reasons[i] = blocked[c]
+            elif not len(slots) or not problem.available[np.ix_(qualified, slots)].any():
+                reasons[i] = f"no qualified professor is available in any {duration}-minute slot"
+            elif not free[np.ix_(qualified, slots)].any():
+                names = ", ".join(problem.professor_ids[p] for p in qualified[:5].tolist())
+                more = f" and {len(qualified) - 5} more" if len(qualified) > 5 else ""
+                reasons[i] = (f"every qualified professor ({names}{more}) is unavailable, teaching "
+                              f"or on a break in each {duration}-minute slot")
+            elif problem.course_num_classes[c] > 1 and not self._free_pattern_exists(c, free):
+                reasons[i] = "no day pattern has a free qualified professor with the same slot number on every day"
+            else:
+                reasons[i] = "a free placement exists but was not reached within the time limit"
+        return reasons
+    
+    def _free_pattern_exists(self, c, free):
+        """Whether every class of multi-class course c still fits one day pattern and slot number."""
+        problem = self.problem
+        grid = self.grid
+        instances = list(problem.instances_of(c))
+        qualified = np.flatnonzero(problem.qualified[c])
+        
+        # Free (day, slot number) cells of each class
+        cells = np.zeros((len(instances), grid.num_days, len(grid.slot_number_names)), dtype=bool)
+        for j, i in enumerate(instances):
+            slots = np.array(sorted(self.course_timeslot_vars.get(i, {})), dtype=np.int64)
+            if len(slots):
+                slots = slots[free[np.ix_(qualified, slots)].any(axis=0)]
+                cells[j, grid.slot_day[slots], grid.slot_number[slots]] = True
+        
+        patterns = grid.day_patterns(len(instances))
+        if patterns:
+            return any(
+                np.logical_and.reduce([cells[j, d] for j, d in enumerate(pattern)]).any()
+                for pattern in patterns
+            )
+        return bool(cells.any(axis=1).all(axis=0).any())
+    
     def _calculate_distribution_quality(self, timeslot_counts, day_counts):
         """Calculate a score for distribution quality."""
         # Day balance score (0-100)
-        valid_days = ["Monday", "Tuesday", "Wednesday", "Thursday"]
-        day_values = [day_counts.get(day, 0) for day in valid_days]
+        day_values = [day_counts.get(day, 0) for day in self.grid.day_names]
         max_day = max(day_values) if day_values else 0
         min_day = min(day_values) if day_values else 0
         day_range = max_day - min_day
@@ -979,93 +1811,108 @@ class CourseScheduler:
             "day_imbalance": day_range
         }
     
-    def _print_schedule_analysis(self, courses_by_timeslot, day_counts):
+    def _print_schedule_analysis(self, instance_days):
         # Add new validation code:
         print("\nMulti-Class Course Pattern Validation:")
-        multi_classes = {k: v for k, v in self.multi_class_courses.items() if v > 1}
+        problem = self.problem
+        grid = self.grid
         
-        for course_id, num_classes in multi_classes.items():
-            instances = []
-            for i in range(1, num_classes + 1):
-                instance_id = f"{course_id}_{i}"
-                day = "Unknown"
-                
-                # Find this instance in the schedule
-                for slot_key, courses in courses_by_timeslot.items():
-                    for c in courses:
-                        if c['course_instance_id'] == instance_id:
-                            day = slot_key.split('_')[0]
-                            break
-                
-                instances.append((i, day))
+        for c in np.flatnonzero(problem.course_num_classes > 1).tolist():
+            course_id = problem.course_ids[c]
+            num_classes = int(problem.course_num_classes[c])
+            
+            # Day of each instance in the schedule
+            instance_day_list = tuple(instance_days.get(i) for i in problem.instances_of(c))
+            days = [grid.day_names[d] if d is not None else "Unknown" for d in instance_day_list]
             
             # Verify pattern compliance
-            days = [day for _, day in instances]
-            pattern_ok = False
+            pattern_ok = instance_day_list in grid.day_patterns(num_classes)
             
-            if num_classes == 2:
-                pattern_ok = (days == ["Monday", "Wednesday"] or days == ["Tuesday", "Thursday"])
-            elif num_classes == 3:
-                pattern_ok = (days == ["Monday", "Tuesday", "Thursday"])
-                
             print(f"  {course_id} ({num_classes} classes): {'CORRECT' if pattern_ok else 'INCORRECT'}")
             print(f"    Days: {', '.join(days)}")
     
     def _report_infeasibility(self, status, solve_time):
         """Report why the model is infeasible."""
+        problem = self.problem
+        grid = self.grid
+        
         # Analyze potential issues
         issues = []
         
         # Check if there are courses with no available time slots
         courses_without_slots = []
-        for course in self.courses:
-            course_id = course['course_id']
-            course_duration = course['duration_minutes']
-            matching_slots = [
-                slot for slot in self.valid_time_slots 
-                if slot['duration_minutes'] == course_duration
-            ]
-            if not matching_slots:
-                courses_without_slots.append({
-                    "course_id": course_id,
-                    "duration": course_duration,
-                    "available_durations": list(set(slot['duration_minutes'] for slot in self.valid_time_slots))
-                })
+        available_durations = list(grid.duration_buckets)
+        for c in np.flatnonzero(~np.isin(problem.course_duration, available_durations)).tolist():
+            courses_without_slots.append({
+                "course_id": problem.course_ids[c],
+                "duration": int(problem.course_duration[c]),
+                "available_durations": available_durations
+            })
         
         if courses_without_slots:
             issues.append(f"Found {len(courses_without_slots)} courses with no matching time slot durations")
         
         # Check if there are courses with no qualified professors
         courses_without_professors = []
-        for course in self.courses:
-            course_id = course['course_id']
-            qualified_profs = [
-                p['professor_id'] for p in self.professors
-                if self._can_professor_teach_course(p['professor_id'], course_id)
-            ]
-            if not qualified_profs:
-                courses_without_professors.append({
-                    "course_id": course_id,
-                    "department_id": course.get('department_id')
-                })
+        for c in np.flatnonzero(~problem.qualified.any(axis=1)).tolist():
+            course_id = problem.course_ids[c]
+            courses_without_professors.append({
+                "course_id": course_id,
+                "department_id": self.course_dict[course_id].get('department_id')
+            })
         
         if courses_without_professors:
             issues.append(f"Found {len(courses_without_professors)} courses with no qualified professors")
         
         # Check if there are enough time slots
-        if len(self.valid_time_slots) < self.total_course_instances:
-            issues.append(f"Not enough time slots: have {len(self.valid_time_slots)}, need at least {self.total_course_instances}")
+        if grid.num_slots < self.total_course_instances:
+            issues.append(f"Not enough time slots: have {grid.num_slots}, need at least {self.total_course_instances}")
+        
+        # Precise reasons found by the pre-solve checks
+        if self.feasibility is not None:
+            issues.extend(issue["message"] for issue in self.feasibility.issues)
+        
+        # Otherwise, the rules CP-SAT found contradictory
+        infeasible_core = None
+        if status == cp_model.INFEASIBLE and self.explain and not (self.feasibility and self.feasibility.issues):
+            infeasible_core = self._explain_infeasibility()
+            if infeasible_core["core"]:
+                issues.append("Conflicting rules: " + "; ".join(entry["description"] for entry in infeasible_core["core"]))
         
         return {
             "success": False,
             "error": f"The scheduling problem is infeasible or could not be solved within the time limit",
             "status": self._get_status_string(status),
             "solver_time": solve_time,
+            "solver_profile": self.solver_profile,
+            "stages": getattr(self, 'stage_statistics', []),
             "issues": issues,
             "courses_without_slots": courses_without_slots[:10] if courses_without_slots else [],
-            "courses_without_professors": courses_without_professors[:10] if courses_without_professors else []
+            "courses_without_professors": courses_without_professors[:10] if courses_without_professors else [],
+            "feasibility": self.feasibility.report() if self.feasibility else None,
+            "infeasible_core": infeasible_core
         }
-        
+    
+    def _explain_infeasibility(self):
+        """
+        Rebuild the model with guarded constraint groups and find a minimal infeasible core.
+        
+        The rebuild uses plain domains, so availability is a constraint that
+        can be blamed rather than a domain filter, and the pairwise conflict
+        model, which enforces the same rules with guardable constraints.
+        options.explainTimeLimit bounds the time spent.
+        """
+        options = dict(self.options, assignmentModel='separate', professorConflictModel='pairwise',
+                       domainPrefilter=False, feasibilityCheck=False, lns=False)
+        print("Looking for a minimal set of conflicting rules...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            explainer = CourseScheduler(dict(self.data, options=options), guard_constraints=True)
+            explainer.build_model(PhaseProfiler(explainer.model), with_objective=False)
+        explanation = explain_infeasibility(explainer, self.options.get('explainTimeLimit', DEFAULT_EXPLAIN_TIME_LIMIT))
+        print(f"Infeasible core of {len(explanation['core'])} of {explanation['guarded_groups']} rule groups "
+              f"({'minimal' if explanation['minimal'] else 'not minimal'}) in {explanation['seconds']}s")
+        return explanation
+    
     def _get_status_string(self, status):
         """Convert solver status to string representation."""
         if status == cp_model.OPTIMAL:
@@ -1079,33 +1926,3 @@ class CourseScheduler:
         elif status == cp_model.UNKNOWN:
             return "UNKNOWN"
         return "UNDEFINED"
-    
-    def _can_professor_teach_course(self, professor_id, course_id):
-        """Check if a professor can teach a course based on qualifications."""
-        # If we have professor-course assignments, use them
-        if self.professor_courses:
-            for pc in self.professor_courses:
-                if pc['professor_id'] == professor_id and pc['course_id'] == course_id:
-                    return True
-            return False
-        
-        # Otherwise, assume professors can teach courses in their department
-        course = self.course_dict.get(course_id)
-        professor = self.professor_dict.get(professor_id)
-        
-        if not course or not professor:
-            return False
-        
-        # If department IDs match, professor can teach the course
-        return course.get('department_id') == professor.get('department_id')
-    
-    def _is_professor_available(self, professor_id, timeslot_id, day):
-        """Check if a professor is available at a given time slot."""
-        # If we have availability data, use it
-        if professor_id in self.professor_availability:
-            if day in self.professor_availability[professor_id]:
-                return timeslot_id in self.professor_availability[professor_id][day]
-            return False
-        
-        # Otherwise, assume professors are available at all times
-        return True
\ No newline at end of file
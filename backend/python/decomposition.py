@@ -0,0 +1,332 @@
+"""
+Connected-component decomposition of a scheduling problem
+
+Courses and professors form a bipartite qualification graph. Hard constraints
+only link courses through shared professors, so every connected component can
+be solved on its own; only the day and slot balance terms of the objective
+couple components. DecomposedScheduler solves the components in a process
+pool, then runs a short global balancing pass over the combined schedule.
+The pass only re-chooses the slots of the courses sitting in overloaded
+slots, where the loads of independently solved components pile up; every
+instance keeps its professor and all other classes stay where their
+subproblem put them, counting only towards the slot and day loads.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from compiled_problem import CompiledProblem, compile_problem
+from course_scheduler import CourseScheduler
+
+# Components are packed into subproblems of at least this many instances,
+# so tiny components do not each pay for a model build and a process round trip
+DEFAULT_MIN_SUBPROBLEM_INSTANCES = 40
+
+# Time limit of the global balancing pass unless options.balanceTimeLimit is set
+DEFAULT_BALANCE_TIME_LIMIT = 60
+
+# The global pass rebalances the combined schedule, so subproblems only
+# need a feasible professor and slot assignment
+DEFAULT_SUBPROBLEM_PROFILE = "draft"
+
+def find_components(problem: CompiledProblem) -> List[np.ndarray]:
+    """
+    Connected components of the course/professor qualification graph
+
+    Args:
+        problem: Compiled problem
+
+    Returns:
+        Course indices of each component, largest component first. Courses
+        without any qualified professor form one component each.
+    """
+    # Union-find over courses and professors (professor p is node num_courses + p)
+    parent = list(range(problem.num_courses + problem.num_professors))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for c, p in np.argwhere(problem.qualified).tolist():
+        root_c, root_p = find(c), find(problem.num_courses + p)
+        if root_c != root_p:
+            parent[root_p] = root_c
+
+    roots = np.array([find(c) for c in range(problem.num_courses)], dtype=np.int64)
+    components = [np.flatnonzero(roots == root) for root in np.unique(roots)]
+    sizes = [int(problem.course_num_classes[courses].sum()) for courses in components]
+    order = sorted(range(len(components)), key=lambda k: -sizes[k])
+    return [components[k] for k in order]
+
+def pack_components(problem: CompiledProblem, components: List[np.ndarray],
+                    min_instances: int) -> List[np.ndarray]:
+    """
+    Merge small components into subproblems of at least min_instances instances
+
+    A union of components is still closed under qualification, so merged
+    subproblems stay independent of each other.
+
+    Args:
+        problem: Compiled problem
+        components: Course indices of each component, largest first
+        min_instances: Minimum number of instances per subproblem
+
+    Returns:
+        Course indices of each subproblem
+    """
+    subproblems = []
+    pending = []
+    pending_instances = 0
+    for courses in components:
+        pending.append(courses)
+        pending_instances += int(problem.course_num_classes[courses].sum())
+        if pending_instances >= min_instances:
+            subproblems.append(np.sort(np.concatenate(pending)))
+            pending, pending_instances = [], 0
+
+    if pending:
+        if subproblems:
+            subproblems[-1] = np.sort(np.concatenate([subproblems[-1]] + pending))
+        else:
+            subproblems.append(np.sort(np.concatenate(pending)))
+    return subproblems
+
+def overloaded_courses(problem: CompiledProblem, scheduled_courses: List[Dict[str, Any]]) -> List[str]:
+    """
+    Courses with a class in a slot holding more than the average slot load
+
+    Args:
+        problem: Compiled problem
+        scheduled_courses: Combined schedule (result.scheduled_courses)
+
+    Returns:
+        Course IDs, sorted
+    """
+    loads = {}
+    for entry in scheduled_courses:
+        loads[entry['timeslot_id']] = loads.get(entry['timeslot_id'], 0) + 1
+    average = len(scheduled_courses) / max(1, problem.grid.num_slots)
+    return sorted({entry['course_id'] for entry in scheduled_courses if loads[entry['timeslot_id']] > average})
+
+def subproblem_data(data: Dict[str, Any], problem: CompiledProblem, courses: np.ndarray,
+                    number: int) -> Dict[str, Any]:
+    """
+    Scheduler input restricted to some courses and the professors qualified for them
+
+    Args:
+        data: Full scheduler input
+        problem: Compiled full problem
+        courses: Course indices of the subproblem
+        number: Subproblem number, used in the schedule ID
+
+    Returns:
+        Scheduler input dictionary
+    """
+    course_ids = {problem.course_ids[c] for c in courses.tolist()}
+    professor_ids = {problem.professor_ids[p] for p in np.flatnonzero(problem.qualified[courses].any(axis=0)).tolist()}
+
+    options = dict(data.get('options', {}))
+    for key in ('decompose', 'streamProgress', 'problemCacheKey'):
+        options.pop(key, None)
+    options['solverProfile'] = options.pop('subproblemProfile', DEFAULT_SUBPROBLEM_PROFILE)
+
+    sub = {
+        "scheduleId": f"{data['scheduleId']}-part{number}",
+        "courses": [course for course in data['courses'] if course['course_id'] in course_ids],
+        # Without professors the department fallback cannot qualify anyone
+        "professors": [prof for prof in data['professors'] if prof['professor_id'] in professor_ids],
+        "timeSlots": data['timeSlots'],
+        "professorAvailability": {
+            prof_id: days for prof_id, days in data['professorAvailability'].items() if prof_id in professor_ids
+        },
+        "professorCourses": [
+            pc for pc in data.get('professorCourses', [])
+            if pc['course_id'] in course_ids and pc['professor_id'] in professor_ids
+        ],
+        "options": options
+    }
+    if data.get('previousSchedule'):
+        sub["previousSchedule"] = [e for e in data['previousSchedule'] if e.get('course_id') in course_ids]
+    if data.get('changes'):
+        sub["changes"] = data['changes']
+    return sub
+
+def solve_subproblem(sub: Dict[str, Any]) -> Dict[str, Any]:
+    """Solve one subproblem in a worker process; log messages go to stderr."""
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.time()
+        result = CourseScheduler(sub).solve()
+        result["wall_time"] = time.time() - start
+        return result
+
+class DecomposedScheduler:
+    """
+    Solves independent components in parallel, then balances the combined schedule
+
+    Has the same solve()/stop_search() interface as CourseScheduler.
+    Options (in data['options']):
+        decompositionWorkers: Process pool size (default: CPU count)
+        minSubproblemInstances: Components are packed into subproblems of at
+            least this many instances
+        subproblemProfile: Solver profile of the subproblems (default
+            "draft"); solverProfile applies to the balancing pass
+        balanceTimeLimit: Time limit of the global balancing pass in seconds;
+            0 skips the pass. The pass frees only the courses in overloaded
+            slots (see overloaded_courses) and freezes every other class
+    """
+
+    def __init__(self, data: Dict[str, Any], progress_listener=None):
+        """
+        Initialize the scheduler and split the problem
+
+        Args:
+            data: Scheduler input
+            progress_listener: Optional progress event function, passed on to
+                the balancing pass
+        """
+        self.data = data
+        self.options = data.get('options', {})
+        self.progress_listener = progress_listener
+        self.problem = compile_problem(data, self.options.get('problemCacheKey'))
+
+        self.components = find_components(self.problem)
+        self.subproblems = pack_components(
+            self.problem, self.components,
+            self.options.get('minSubproblemInstances', DEFAULT_MIN_SUBPROBLEM_INSTANCES)
+        )
+        self.workers = max(1, min(self.options.get('decompositionWorkers', os.cpu_count() or 1),
+                                  len(self.subproblems)))
+
+        self.stop_requested = False
+        self.balance_scheduler = None
+        print(f"Decomposition: {len(self.components)} components in {len(self.subproblems)} subproblems, "
+              f"{self.workers} workers")
+
+    def stop_search(self):
+        """
+        Stop early: the balancing pass is stopped or skipped
+
+        Subproblems already being solved run to completion.
+        """
+        self.stop_requested = True
+        if self.balance_scheduler is not None:
+            self.balance_scheduler.stop_search()
+
+    def solve(self) -> Dict[str, Any]:
+        """
+        Solve every subproblem, then balance the combined schedule
+
+        Returns:
+            Result dictionary in the CourseScheduler format, with a
+            decomposition section in the statistics
+        """
+        start_time = time.time()
+
+        if len(self.subproblems) == 1:
+            # Nothing to split: solve as a whole
+            self.balance_scheduler = CourseScheduler(self.data, self.progress_listener)
+            result = self.balance_scheduler.solve()
+            self._add_statistics(result, [], 0.0, None, None)
+            return result
+
+        subs = [subproblem_data(self.data, self.problem, courses, n)
+                for n, courses in enumerate(self.subproblems)]
+        if self.workers == 1:
+            part_results = [solve_subproblem(sub) for sub in subs]
+        else:
+            # Spawned workers: the caller may be running solver threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                part_results = list(pool.map(solve_subproblem, subs))
+        component_time = time.time() - start_time
+
+        failed = [n for n, part in enumerate(part_results) if not part.get("success")]
+        if failed:
+            # A component without a solution means the whole problem has none
+            result = part_results[failed[0]]
+            result["solver_time"] = time.time() - start_time
+            self._add_statistics(result, part_results, component_time, None, None)
+            return result
+
+        scheduled = [entry for part in part_results for entry in part["result"]["scheduled_courses"]]
+        merged = self._merge_results(part_results, scheduled, time.time() - start_time)
+
+        balance_limit = self.options.get('balanceTimeLimit', DEFAULT_BALANCE_TIME_LIMIT)
+        if self.stop_requested or not balance_limit:
+            self._add_statistics(merged, part_results, component_time, None, None)
+            return merged
+
+        # Global balancing: keep every professor and re-choose the slots of
+        # the courses in overloaded slots only; the delta re-solve freezes
+        # every other class, so the pass stays small
+        free_courses = overloaded_courses(self.problem, scheduled)
+        balance_data = dict(self.data, previousSchedule=scheduled, changes={"courses": free_courses})
+        balance_data["options"] = dict(self.options, pinProfessors=True, deltaResolve=True,
+                                       maxTimeInSeconds=balance_limit)
+        self.balance_scheduler = CourseScheduler(balance_data, self.progress_listener)
+        if self.stop_requested:
+            self.balance_scheduler.stop_search()
+        result = self.balance_scheduler.solve()
+
+        balance_status = result.get("result", {}).get("statistics", {}).get("solver_status", result.get("status"))
+        if not result.get("success"):
+            # The merged schedule is feasible, so keep it
+            result = merged
+        else:
+            result["result"]["statistics"]["solver_time"] = time.time() - start_time
+        self._add_statistics(result, part_results, component_time, balance_status, len(free_courses))
+        return result
+
+    def _merge_results(self, part_results: List[Dict[str, Any]], scheduled: List[Dict[str, Any]],
+                       solve_time: float) -> Dict[str, Any]:
+        """Combine subproblem results into one result without a balancing pass."""
+        statuses = {part["result"]["statistics"]["solver_status"] for part in part_results}
+        scheduled_count = len(scheduled)
+        return {
+            "success": True,
+            "result": {
+                "scheduled_courses": scheduled,
+                "conflicts": [c for part in part_results for c in part["result"]["conflicts"]],
+                "statistics": {
+                    "solver_status": "OPTIMAL" if statuses == {"OPTIMAL"} else "FEASIBLE",
+                    "solver_time": solve_time,
+                    "total_courses": self.problem.num_instances,
+                    "scheduled_courses": scheduled_count,
+                    "scheduling_percentage": round(scheduled_count / max(1, self.problem.num_instances) * 100, 2),
+                    "unresolved_conflicts": sum(len(part["result"]["conflicts"]) for part in part_results)
+                }
+            }
+        }
+
+    def _add_statistics(self, result: Dict[str, Any], part_results: List[Dict[str, Any]],
+                        component_time: float, balance_status: Optional[str],
+                        balance_courses: Optional[int]):
+        """Attach the decomposition section to the result statistics."""
+        section = {
+            "components": len(self.components),
+            "subproblems": [
+                {
+                    "courses": len(courses),
+                    "instances": int(self.problem.course_num_classes[courses].sum()),
+                    "status": (part.get("result", {}).get("statistics", {}).get("solver_status")
+                               if part else None),
+                    "wall_time": round(part.get("wall_time", 0), 4) if part else None
+                }
+                for courses, part in zip(self.subproblems, part_results or [None] * len(self.subproblems))
+            ],
+            "workers": self.workers,
+            "component_time": round(component_time, 4),
+            "balance_status": balance_status,
+            "balance_courses": balance_courses
+        }
+        target = result["result"]["statistics"] if result.get("success") else result
+        target["decomposition"] = section
@@ -0,0 +1,128 @@
+"""
+Incremental re-solve support: map a previous schedule onto a compiled problem
+and find the neighbourhood affected by a change set
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from compiled_problem import CompiledProblem
+
+def map_schedule(problem: CompiledProblem,
+                 scheduled_courses: List[Dict[str, Any]]) -> Tuple[Dict[int, Tuple[Optional[int], Optional[int]]], Dict[str, int]]:
+    """
+    Map scheduled course entries onto instance, professor and slot indices
+
+    Args:
+        problem: Compiled problem
+        scheduled_courses: Entries shaped like result.scheduled_courses
+            (course_id, class_instance, professor_id, timeslot_id)
+
+    Returns:
+        Tuple of ({instance: (professor or None, slot or None)}, {reason: count})
+        for entries that could not be mapped to an instance
+    """
+    assignments = {}
+    dropped = defaultdict(int)
+
+    for entry in scheduled_courses:
+        c = problem.course_index.get(entry.get('course_id'))
+        instance_num = entry.get('class_instance', 1)
+        if c is None:
+            dropped["unknown_course"] += 1
+            continue
+        if not 1 <= instance_num <= problem.course_num_classes[c]:
+            dropped["unknown_instance"] += 1
+            continue
+
+        i = int(problem.course_first_instance[c]) + instance_num - 1
+        if i in assignments:
+            dropped["duplicate"] += 1
+            continue
+
+        assignments[i] = (
+            problem.professor_index.get(entry.get('professor_id')),
+            problem.grid.slot_index.get(entry.get('timeslot_id'))
+        )
+
+    return assignments, dict(dropped)
+
+def find_neighbourhood(problem: CompiledProblem, scheduled_courses: List[Dict[str, Any]],
+                       changes: Optional[Dict[str, List[str]]] = None) -> Tuple[Dict[int, Tuple[int, int]], Dict[str, Any]]:
+    """
+    Split the course instances into a frozen part and a part to re-solve
+
+    The neighbourhood starts from the courses and professors touched by the
+    change set, plus every course whose previous assignments no longer fit:
+    new courses, courses whose number of classes changed, and assignments
+    whose professor is no longer qualified or available, or whose slot is
+    gone. It then grows to every course the affected professors could teach.
+    Courses are freed as a whole so their day patterns can change together;
+    every other instance keeps its previous professor and slot.
+
+    Args:
+        problem: Compiled problem of the changed input
+        scheduled_courses: Previous schedule (result.scheduled_courses)
+        changes: Optional {"professors": [...], "courses": [...]} naming
+            professors and courses known to have changed
+
+    Returns:
+        Tuple of ({frozen instance: (professor, slot)}, summary statistics)
+    """
+    changes = changes or {}
+    grid = problem.grid
+    assignments, dropped = map_schedule(problem, scheduled_courses)
+
+    seed_courses = {problem.course_index[c] for c in changes.get('courses', []) if c in problem.course_index}
+    seed_professors = {problem.professor_index[p] for p in changes.get('professors', []) if p in problem.professor_index}
+
+    # Professors of entries for removed courses or instances are freed up
+    for entry in scheduled_courses:
+        c = problem.course_index.get(entry.get('course_id'))
+        if c is None or entry.get('class_instance', 1) > problem.course_num_classes[c]:
+            p = problem.professor_index.get(entry.get('professor_id'))
+            if p is not None:
+                seed_professors.add(p)
+
+    # Courses whose previous assignments no longer fit
+    for c in range(problem.num_courses):
+        for i in problem.instances_of(c):
+            p, s = assignments.get(i, (None, None))
+            valid = (
+                p is not None and s is not None
+                and problem.qualified[c, p]
+                and problem.available[p, s]
+                and grid.slot_duration[s] == problem.course_duration[c]
+            )
+            if not valid:
+                seed_courses.add(c)
+                if p is not None:
+                    seed_professors.add(p)
+
+    # Grow to every course the affected professors could teach
+    neighbourhood = np.zeros(problem.num_courses, dtype=bool)
+    neighbourhood[list(seed_courses)] = True
+    if seed_professors:
+        neighbourhood |= problem.qualified[:, sorted(seed_professors)].any(axis=1)
+
+    # Courses taught by an affected professor in the previous schedule
+    for i, (p, s) in assignments.items():
+        if p in seed_professors:
+            neighbourhood[problem.instance_course[i]] = True
+
+    frozen = {}
+    for c in np.flatnonzero(~neighbourhood).tolist():
+        for i in problem.instances_of(c):
+            frozen[i] = assignments[i]
+
+    summary = {
+        "seed_courses": len(seed_courses),
+        "seed_professors": len(seed_professors),
+        "neighbourhood_courses": int(neighbourhood.sum()),
+        "free_instances": problem.num_instances - len(frozen),
+        "frozen_instances": len(frozen),
+        "unmapped_entries": dropped
+    }
+    return frozen, summary
@@ -0,0 +1,525 @@
+"""
+Polynomial-time feasibility checks run before the CP-SAT model is built
+
+Every check is a relaxation of the model's hard constraints, so a failed check
+proves the model infeasible:
+- every course has a slot of its duration in which a qualified professor is
+  available, and a multi-class course can follow one of its day patterns with
+  one slot number
+- for every slot duration, the qualified professors can teach at least as
+  many classes of that duration as there are
+- a maximum flow from course instances to (professor, day) pairs, each pair
+  limited to the number of classes the professor can teach that day without
+  double-booking or back-to-back slots, covers every instance
+
+When every check passes, the residual graph of the flow shows which
+(instance, professor, day) combinations no feasible assignment can use, and
+those are removed from the variable domains.
+"""
+
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from compiled_problem import CompiledProblem
+
+# At most this many course and professor IDs are named per issue
+MAX_NAMED_ENTITIES = 10
+
+class MaxFlow:
+    """Dinic maximum flow on an adjacency-list residual graph"""
+
+    def __init__(self, num_nodes: int = 0):
+        """
+        Initialize an empty graph
+
+        Args:
+            num_nodes: Number of nodes to start with
+        """
+        self.adjacency = [[] for _ in range(num_nodes)]
+        # Edge e goes to head[e]; its reverse edge is e ^ 1
+        self.head = []
+        self.capacity = []
+
+    def add_node(self) -> int:
+        """Add a node and return its index."""
+        self.adjacency.append([])
+        return len(self.adjacency) - 1
+
+    def add_edge(self, u: int, v: int, capacity: int) -> int:
+        """Add an edge u -> v with its reverse residual edge and return its index."""
+        e = len(self.head)
+        self.adjacency[u].append(e)
+        self.head.append(v)
+        self.capacity.append(capacity)
+        self.adjacency[v].append(e + 1)
+        self.head.append(u)
+        self.capacity.append(0)
+        return e
+
+    def flow(self, e: int) -> int:
+        """Flow on edge e."""
+        return self.capacity[e ^ 1]
+
+    def max_flow(self, source: int, sink: int) -> int:
+        """
+        Push a maximum flow from source to sink
+
+        Returns:
+            Flow value
+        """
+        total = 0
+        while True:
+            level = self._levels(source)
+            if level[sink] < 0:
+                return total
+            pointer = [0] * len(self.adjacency)
+            while True:
+                pushed = self._augment(source, sink, level, pointer)
+                if not pushed:
+                    break
+                total += pushed
+
+    def _levels(self, source: int) -> List[int]:
+        """Breadth-first distances from source in the residual graph, -1 if unreachable."""
+        level = [-1] * len(self.adjacency)
+        level[source] = 0
+        queue = [source]
+        for u in queue:
+            for e in self.adjacency[u]:
+                v = self.head[e]
+                if self.capacity[e] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def _augment(self, source: int, sink: int, level: List[int], pointer: List[int]) -> int:
+        """Push flow along one shortest augmenting path, or return 0 if the level graph is blocked."""
+        head = self.head
+        capacity = self.capacity
+        path = []
+        u = source
+        while u != sink:
+            edges = self.adjacency[u]
+            while pointer[u] < len(edges):
+                e = edges[pointer[u]]
+                if capacity[e] > 0 and level[head[e]] == level[u] + 1:
+                    break
+                pointer[u] += 1
+            else:
+                # Dead end: retreat and skip the edge that led here
+                if not path:
+                    return 0
+                e = path.pop()
+                u = head[e ^ 1]
+                pointer[u] += 1
+                continue
+            path.append(e)
+            u = head[e]
+
+        pushed = min(capacity[e] for e in path)
+        for e in path:
+            capacity[e] -= pushed
+            capacity[e ^ 1] += pushed
+        return pushed
+
+    def reachable(self, source: int) -> List[bool]:
+        """Nodes reachable from source in the residual graph (the source side of a minimum cut)."""
+        return [level >= 0 for level in self._levels(source)]
+
+    def components(self) -> List[int]:
+        """Strongly connected component of every node in the residual graph (iterative Tarjan)."""
+        num_nodes = len(self.adjacency)
+        index = [-1] * num_nodes
+        lowlink = [0] * num_nodes
+        component = [-1] * num_nodes
+        on_stack = [False] * num_nodes
+        stack = []
+        counter = 0
+        num_components = 0
+
+        for root in range(num_nodes):
+            if index[root] >= 0:
+                continue
+            work = [(root, 0)]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                u, k = work[-1]
+                edges = self.adjacency[u]
+                if k < len(edges):
+                    work[-1] = (u, k + 1)
+                    e = edges[k]
+                    if self.capacity[e] <= 0:
+                        continue
+                    v = self.head[e]
+                    if index[v] < 0:
+                        index[v] = lowlink[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = True
+                        work.append((v, 0))
+                    elif on_stack[v]:
+                        lowlink[u] = min(lowlink[u], index[v])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[u])
+                if lowlink[u] == index[u]:
+                    while True:
+                        v = stack.pop()
+                        on_stack[v] = False
+                        component[v] = num_components
+                        if v == u:
+                            break
+                    num_components += 1
+
+        return component
+
+def candidate_slots(grid, duration: int) -> np.ndarray:
+    """
+    Slots a course of the given duration may use
+
+    Mirrors CourseScheduler: exact duration matches, else matches within five
+    minutes, else every slot.
+    """
+    for tolerance in (0, 5):
+        slots = np.flatnonzero(np.abs(grid.slot_duration - duration) <= tolerance)
+        if len(slots):
+            return slots
+    return np.arange(grid.num_slots)
+
+def day_capacity(grid, slots: np.ndarray, min_break_minutes: int) -> int:
+    """
+    Most classes a professor can teach in some slots of one day
+
+    Both conflict models forbid teaching in the same or overlapping slots and
+    in slots closer than the minimum break, so the slots form an interval
+    scheduling problem that the earliest-finish greedy solves exactly.
+
+    Args:
+        grid: Time grid
+        slots: Slot indices, all on one day
+        min_break_minutes: Minimum break between two classes
+
+    Returns:
+        Upper bound on the number of classes
+    """
+    gap = max(min_break_minutes, 1)
+    count = 0
+    free_from = None
+    for s in sorted(slots.tolist(), key=lambda s: grid.slot_end[s]):
+        if free_from is None or grid.slot_start[s] >= free_from:
+            count += 1
+            free_from = grid.slot_end[s] + gap
+    return count
+
+class FeasibilityCheck:
+    """Runs the pre-solve checks on a compiled problem and keeps the domain bounds they imply"""
+
+    def __init__(self, problem: CompiledProblem, min_break_minutes: int = 30):
+        """
+        Initialize the checks
+
+        Args:
+            problem: Compiled problem
+            min_break_minutes: Minimum break a professor needs between classes
+        """
+        self.problem = problem
+        self.grid = problem.grid
+        self.min_break_minutes = min_break_minutes
+
+        self.issues = []
+        self.warnings = []
+        self.checks = {}
+        self.demand = 0
+        self.matched = None
+        self.allowed = {}
+        # Message of each course that no assignment can place at all
+        self.blocked = {}
+        self.pruned = {"edges": 0, "professors": 0, "slots": 0}
+        self.seconds = 0.0
+
+    def run(self) -> bool:
+        """
+        Run every check
+
+        Returns:
+            False if some check proves the problem infeasible
+        """
+        start = time.perf_counter()
+        if self.grid.num_slots:
+            self._check_courses()
+            self._build_capacities()
+            self._check_duration_supply()
+            # The flow needs a usable slot for every instance
+            if not self.issues:
+                self._check_professor_capacity()
+        self.seconds = time.perf_counter() - start
+        return not self.issues
+
+    def _issue(self, check: str, message: str, courses: List[int] = (), professors: List[int] = ()):
+        """Record an issue naming the courses and professors involved."""
+        self.issues.append({
+            "check": check,
+            "message": message,
+            "courses": [self.problem.course_ids[c] for c in list(courses)[:MAX_NAMED_ENTITIES]],
+            "professors": [self.problem.professor_ids[p] for p in list(professors)[:MAX_NAMED_ENTITIES]]
+        })
+
+    def _check_courses(self):
+        """
+        Find the slots each instance can use; report courses with none
+
+        An instance can use a slot of its duration in which some qualified
+        professor is available. Instances of a multi-class course with day
+        patterns are limited to their pattern day and to slot numbers usable
+        on every day of the pattern, as in the model.
+        """
+        problem = self.problem
+        grid = self.grid
+        self.instance_slots = {}
+        self.slots_by_duration = {}
+        started = time.perf_counter()
+
+        for c in range(problem.num_courses):
+            duration = int(problem.course_duration[c])
+            if duration not in self.slots_by_duration:
+                self.slots_by_duration[duration] = candidate_slots(grid, duration)
+            slots = self.slots_by_duration[duration]
+            course_id = problem.course_ids[c]
+            qualified = np.flatnonzero(problem.qualified[c])
+            num_classes = int(problem.course_num_classes[c])
+
+            if len(qualified):
+                usable = slots[problem.available[np.ix_(qualified, slots)].any(axis=0)]
+            else:
+                # The model schedules such courses without a professor
+                self.warnings.append(f"Course {course_id} has no qualified professors")
+                usable = slots
+
+            if not len(usable):
+                self.blocked[c] = (f"Course {course_id}: none of its {len(qualified)} qualified professors is "
+                                   f"available in any {duration}-minute slot")
+                self._issue("course_slots", self.blocked[c], [c], qualified)
+                continue
+
+            patterns = grid.day_patterns(num_classes) if num_classes > 1 else ()
+            if not patterns:
+                instance_slots = [usable] * num_classes
+            else:
+                usable_day_number = np.zeros((grid.num_days, len(grid.slot_number_names)), dtype=bool)
+                usable_day_number[grid.slot_day[usable], grid.slot_number[usable]] = True
+                allowed = np.zeros((num_classes,) + usable_day_number.shape, dtype=bool)
+                for pattern in patterns:
+                    numbers = usable_day_number[list(pattern)].all(axis=0)
+                    for j, d in enumerate(pattern):
+                        allowed[j, d] |= numbers
+                instance_slots = [
+                    usable[allowed[j, grid.slot_day[usable], grid.slot_number[usable]]]
+                    for j in range(num_classes)
+                ]
+                if not all(len(s) for s in instance_slots):
+                    pattern_names = ", ".join("/".join(grid.day_names[d][:3] for d in pattern) for pattern in patterns)
+                    self.blocked[c] = (f"Course {course_id}: no slot number is usable on every day of any "
+                                       f"{num_classes}-class day pattern ({pattern_names})")
+                    self._issue("day_patterns", self.blocked[c], [c], qualified)
+                    continue
+
+            if len(qualified):
+                for i, s in zip(problem.instances_of(c), instance_slots):
+                    self.instance_slots[i] = s
+
+        self.checks["course_slots"] = round(time.perf_counter() - started, 6)
+
+    def _build_capacities(self):
+        """Slots each professor can use for some qualified course."""
+        problem = self.problem
+        grid = self.grid
+        self.professor_slots = np.zeros((problem.num_professors, grid.num_slots), dtype=bool)
+        for duration, slots in self.slots_by_duration.items():
+            teaches = problem.qualified[problem.course_duration == duration].any(axis=0)
+            self.professor_slots[np.ix_(teaches, slots)] = True
+        self.professor_slots &= problem.available
+
+        self.day_matrix = (grid.slot_day[:, None] == np.arange(grid.num_days)[None, :]).astype(np.int32)
+        self._capacity_cache = {}
+
+    def _capacities(self, professors: np.ndarray, slot_mask: np.ndarray) -> np.ndarray:
+        """
+        Capacity of each professor per day over its usable slots in slot_mask
+
+        Returns:
+            Array of shape (len(professors), num_days)
+        """
+        usable = self.professor_slots[professors] & slot_mask
+        capacities = np.zeros((len(professors), self.grid.num_days), dtype=np.int32)
+        for k, row in enumerate(usable):
+            key = row.tobytes()
+            if key not in self._capacity_cache:
+                self._capacity_cache[key] = [
+                    day_capacity(self.grid, np.flatnonzero(row & (self.grid.slot_day == d)), self.min_break_minutes)
+                    for d in range(self.grid.num_days)
+                ]
+            capacities[k] = self._capacity_cache[key]
+        return capacities
+
+    def _check_duration_supply(self):
+        """Compare the classes of each slot duration with what their professors can teach in such slots."""
+        problem = self.problem
+        grid = self.grid
+        started = time.perf_counter()
+        has_professors = problem.qualified.any(axis=1)
+
+        for duration in np.unique(problem.course_duration[has_professors]).tolist():
+            courses = np.flatnonzero(has_professors & (problem.course_duration == duration))
+            demand = int(problem.course_num_classes[courses].sum())
+            professors = np.flatnonzero(problem.qualified[courses].any(axis=0))
+            slot_mask = np.zeros(grid.num_slots, dtype=bool)
+            slot_mask[self.slots_by_duration[duration]] = True
+            supply = int(self._capacities(professors, slot_mask).sum())
+            if demand > supply:
+                self._issue("duration_supply",
+                            f"{demand} classes of {duration} minutes, but their {len(professors)} qualified "
+                            f"professors can teach at most {supply} classes in slots of that length",
+                            courses, professors)
+
+        self.checks["duration_supply"] = round(time.perf_counter() - started, 6)
+
+    def _check_professor_capacity(self):
+        """
+        Match instances to (professor, day) capacity with a maximum flow
+
+        Instance i links to (p, d) if p is qualified and available in one of
+        i's usable slots on day d. A flow short of the number of instances
+        proves infeasibility; the source side of the minimum cut names the
+        courses and professors involved. Otherwise the combinations on no
+        residual cycle are recorded as unusable.
+        """
+        problem = self.problem
+        grid = self.grid
+        started = time.perf_counter()
+
+        graph = MaxFlow(2)
+        source, sink = 0, 1
+        instance_node = {}
+        pair_node = {}
+        instance_edges = defaultdict(list)
+
+        # (professor, day) pairs of each instance; instances of a course without
+        # day patterns share their slots, so their pairs are computed once
+        pairs_by_slots = {}
+        for i, slots in self.instance_slots.items():
+            c = int(problem.instance_course[i])
+            key = (c, slots.tobytes())
+            if key not in pairs_by_slots:
+                qualified = np.flatnonzero(problem.qualified[c])
+                hits = problem.available[np.ix_(qualified, slots)].astype(np.int32) @ self.day_matrix[slots]
+                pairs_by_slots[key] = [(int(qualified[k]), d) for k, d in np.argwhere(hits > 0).tolist()]
+
+            node = instance_node[i] = graph.add_node()
+            graph.add_edge(source, node, 1)
+            for pair in pairs_by_slots[key]:
+                if pair not in pair_node:
+                    pair_node[pair] = graph.add_node()
+                instance_edges[i].append((pair, graph.add_edge(node, pair_node[pair], 1)))
+
+        capacities = self._capacities(np.arange(problem.num_professors), np.ones(grid.num_slots, dtype=bool))
+        pair_capacity = {}
+        for (p, d), node in pair_node.items():
+            pair_capacity[(p, d)] = int(capacities[p, d])
+            graph.add_edge(node, sink, pair_capacity[(p, d)])
+
+        self.demand = len(instance_node)
+        self.matched = graph.max_flow(source, sink)
+
+        if self.matched < self.demand:
+            side = graph.reachable(source)
+            instances = [i for i, node in instance_node.items() if side[node]]
+            pairs = [pair for pair, node in pair_node.items() if side[node]]
+            courses = np.unique(problem.instance_course[instances]).tolist()
+            professors = sorted({p for p, _ in pairs})
+            capacity = sum(pair_capacity[pair] for pair in pairs)
+            self._issue("professor_capacity",
+                        f"{len(instances)} classes of {len(courses)} courses can only be taught by "
+                        f"{len(professors)} professors who have room for at most {capacity} of them "
+                        f"({self.demand - self.matched} classes short overall)",
+                        courses, professors)
+        else:
+            component = graph.components()
+            for i, edges in instance_edges.items():
+                node = instance_node[i]
+                allowed = {
+                    pair for pair, e in edges
+                    if graph.flow(e) or component[node] == component[pair_node[pair]]
+                }
+                self.pruned["edges"] += len(edges) - len(allowed)
+                self.allowed[i] = allowed
+
+        self.checks["professor_capacity"] = round(time.perf_counter() - started, 6)
+
+    def tighten(self, instances, prof_domains: List[np.ndarray],
+                slot_domains: List[np.ndarray]) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Remove professors and slots no feasible assignment can use
+
+        A professor stays if some (professor, day) combination of the instance
+        survived; a slot stays if a surviving professor is available in it on
+        a surviving day. Domains that would become empty are kept unchanged,
+        so the solver still reports them.
+
+        Args:
+            instances: Instance indices of one course
+            prof_domains: Candidate professors of each instance
+            slot_domains: Candidate slots of each instance
+
+        Returns:
+            Tightened (prof_domains, slot_domains)
+        """
+        available = self.problem.available
+        slot_day = self.grid.slot_day
+        tightened_profs, tightened_slots = [], []
+
+        for i, profs, slots in zip(instances, prof_domains, slot_domains):
+            allowed = self.allowed.get(i)
+            if allowed is None:
+                tightened_profs.append(profs)
+                tightened_slots.append(slots)
+                continue
+
+            kept_profs = np.array([p for p in profs.tolist() if any((p, d) in allowed for d in range(self.grid.num_days))],
+                                  dtype=profs.dtype)
+            usable = np.zeros(len(slots), dtype=bool)
+            for p in kept_profs.tolist():
+                days = np.array([(p, d) in allowed for d in range(self.grid.num_days)])
+                usable |= available[p, slots] & days[slot_day[slots]]
+            kept_slots = slots[usable]
+
+            if not len(kept_profs) or not len(kept_slots):
+                kept_profs, kept_slots = profs, slots
+            self.pruned["professors"] += len(profs) - len(kept_profs)
+            self.pruned["slots"] += len(slots) - len(kept_slots)
+            tightened_profs.append(kept_profs)
+            tightened_slots.append(kept_slots)
+
+        return tightened_profs, tightened_slots
+
+    def report(self) -> Dict[str, Any]:
+        """Feasibility section for the result statistics."""
+        return {
+            "passed": not self.issues,
+            "seconds": round(self.seconds, 4),
+            "checks": self.checks,
+            "issues": self.issues,
+            "warnings": len(self.warnings),
+            "demand": self.demand,
+            "matched": self.matched,
+            "pruned": dict(self.pruned)
+        }
@@ -0,0 +1,301 @@
+"""
+Greedy constructive scheduler for instant drafts and CP-SAT hints
+
+Courses are placed one at a time, most constrained first, and never moved
+again. Every placement respects the hard rules of the CP-SAT model:
+- professor qualification and availability
+- no double-booking, including overlapping slots
+- no back-to-back teaching within the minimum break
+- the grid's day patterns for multi-class courses
+- one slot number for all classes of a course
+Among the feasible placements the least loaded slots and days win, and core
+courses prefer the TS1/TS2 slots. Courses that cannot be placed are reported
+as NO_AVAILABLE_SLOT conflicts, exactly like unscheduled CP-SAT instances.
+"""
+
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from compiled_problem import CompiledProblem, compile_problem
+
+# Slot numbers core courses prefer, as in the CP-SAT objective
+PREFERRED_CORE_SLOT_NUMBERS = ("TS1", "TS2")
+
+class GreedyScheduler:
+    """
+    Builds a schedule in one pass without a solver
+
+    Has the same solve()/stop_search() interface and result format as
+    CourseScheduler.
+    """
+
+    def __init__(self, data: Dict[str, Any], progress_listener=None,
+                 problem: Optional[CompiledProblem] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            data: Scheduler input
+            progress_listener: Accepted for interface compatibility; the greedy
+                pass emits no intermediate events
+            problem: Compiled problem to reuse instead of compiling data
+        """
+        self.data = data
+        self.options = data.get('options', {})
+        self.schedule_id = data['scheduleId']
+        self.course_dict = {c['course_id']: c for c in data['courses']}
+        self.professor_dict = {p['professor_id']: p for p in data['professors']}
+        self.time_slot_dict = {t['timeslot_id']: t for t in data['timeSlots']}
+        self.min_break_minutes = self.options.get('minBreakMinutes', 30)
+
+        self.problem = problem or compile_problem(data, self.options.get('problemCacheKey'))
+        self.grid = self.problem.grid
+
+    def stop_search(self):
+        """Nothing to stop: the greedy pass is not interruptible and finishes quickly."""
+
+    def solve(self) -> Dict[str, Any]:
+        """
+        Build the schedule
+
+        Returns:
+            Result dictionary in the CourseScheduler format
+        """
+        start = time.time()
+        assignments = self.construct()
+        return self._build_result(assignments, time.time() - start)
+
+    def construct(self) -> Dict[int, Tuple[int, int]]:
+        """
+        Place every course, most constrained first
+
+        Returns:
+            {instance: (professor, slot)} for the placed instances
+        """
+        problem = self.problem
+        grid = self.grid
+
+        # Slots a professor can no longer take after teaching in slot s:
+        # s itself, overlapping slots and slots within the minimum break
+        blocks = grid.overlaps.copy()
+        np.fill_diagonal(blocks, True)
+        pairs = grid.consecutive_pairs(self.min_break_minutes)
+        blocks[pairs[:, 0], pairs[:, 1]] = True
+        blocks[pairs[:, 1], pairs[:, 0]] = True
+
+        self.free = problem.available.copy()
+        self.slot_load = np.zeros(grid.num_slots, dtype=np.int64)
+        self.day_load = np.zeros(grid.num_days, dtype=np.int64)
+        self.professor_load = np.zeros(problem.num_professors, dtype=np.int64)
+        preferred = np.isin(np.array(grid.slot_number_names)[grid.slot_number], PREFERRED_CORE_SLOT_NUMBERS)
+        self.core_penalty = np.where(preferred, 0, 1)
+
+        # Fewest candidate (professor, slot) pairs per class first; then
+        # multi-class courses, then core courses
+        candidate_slots = [self._matching_slots(c) for c in range(problem.num_courses)]
+        flexibility = [
+            problem.available[np.ix_(problem.qualified[c], slots)].sum() / problem.course_num_classes[c]
+            for c, slots in enumerate(candidate_slots)
+        ]
+        order = sorted(
+            range(problem.num_courses),
+            key=lambda c: (flexibility[c], -int(problem.course_num_classes[c]), not problem.course_is_core[c], c)
+        )
+
+        assignments = {}
+        for c in order:
+            placement = self._place_course(c, candidate_slots[c])
+            if placement is None:
+                continue
+            for i, (p, s) in zip(problem.instances_of(c), placement):
+                assignments[i] = (p, s)
+                self.free[p, blocks[s]] = False
+                self.slot_load[s] += 1
+                self.day_load[grid.slot_day[s]] += 1
+                self.professor_load[p] += 1
+
+        return assignments
+
+    def _matching_slots(self, c: int) -> np.ndarray:
+        """Slots of the course's duration, with the CP-SAT model's fallbacks."""
+        grid = self.grid
+        duration = self.problem.course_duration[c]
+        for tolerance in (0, 5):
+            slots = np.flatnonzero(np.abs(grid.slot_duration - duration) <= tolerance)
+            if len(slots):
+                return slots
+        return np.arange(grid.num_slots)
+
+    def _slot_score(self, s: int, core: bool) -> Tuple[int, int, int]:
+        """Sort key of a slot: emptier slot, then emptier day, then core preference."""
+        return (int(self.slot_load[s]), int(self.day_load[self.grid.slot_day[s]]),
+                int(self.core_penalty[s]) if core else 0)
+
+    def _pick_professor(self, qualified: np.ndarray, slots: List[int]) -> Optional[List[int]]:
+        """
+        Professors for a set of slots, one per slot
+
+        A single professor free in every slot is preferred; otherwise each slot
+        gets its own least loaded free professor.
+
+        Returns:
+            Professor per slot, or None if some slot has no free professor
+        """
+        free = self.free[np.ix_(qualified, slots)]
+        everywhere = qualified[free.all(axis=1)]
+        if len(everywhere):
+            p = int(everywhere[np.argmin(self.professor_load[everywhere])])
+            return [p] * len(slots)
+
+        professors = []
+        for k in range(len(slots)):
+            candidates = qualified[free[:, k]]
+            if not len(candidates):
+                return None
+            professors.append(int(candidates[np.argmin(self.professor_load[candidates])]))
+        return professors
+
+    def _place_course(self, c: int, slots: np.ndarray) -> Optional[List[Tuple[int, int]]]:
+        """
+        Best feasible placement of all classes of course c
+
+        Returns:
+            (professor, slot) per class in class order, or None if the course
+            cannot be placed
+        """
+        problem = self.problem
+        grid = self.grid
+        num_classes = int(problem.course_num_classes[c])
+        core = bool(problem.course_is_core[c])
+        qualified = np.flatnonzero(problem.qualified[c])
+        if not len(qualified):
+            return None
+
+        # Slots with at least one qualified professor still free
+        usable = slots[self.free[np.ix_(qualified, slots)].any(axis=0)]
+        if not len(usable):
+            return None
+
+        if num_classes == 1:
+            s = min(usable.tolist(), key=lambda s: self._slot_score(s, core))
+            return [(self._pick_professor(qualified, [s])[0], s)]
+
+        # One slot number for every class; a day pattern when the grid has one
+        patterns = grid.day_patterns(num_classes)
+        best = None
+        best_score = None
+        for n in np.unique(grid.slot_number[usable]).tolist():
+            number_slots = usable[grid.slot_number[usable] == n]
+            by_day = {}
+            for s in sorted(number_slots.tolist(), key=lambda s: self._slot_score(s, core)):
+                by_day.setdefault(int(grid.slot_day[s]), s)
+
+            if patterns:
+                candidates = [[by_day.get(d) for d in pattern] for pattern in patterns]
+            elif len(by_day) >= num_classes:
+                # No pattern for this many classes: the least loaded distinct days
+                days = sorted(by_day, key=lambda d: self._slot_score(by_day[d], core))[:num_classes]
+                candidates = [[by_day[d] for d in sorted(days)]]
+            else:
+                candidates = []
+
+            for chosen in candidates:
+                if None in chosen:
+                    continue
+                professors = self._pick_professor(qualified, chosen)
+                if professors is None:
+                    continue
+                score = max(self._slot_score(s, core) for s in chosen)
+                if best_score is None or score < best_score:
+                    best, best_score = list(zip(professors, chosen)), score
+
+        return best
+
+    def _build_result(self, assignments: Dict[int, Tuple[int, int]], solve_time: float) -> Dict[str, Any]:
+        """Result dictionary in the CourseScheduler format."""
+        problem = self.problem
+        grid = self.grid
+        scheduled_courses = []
+        conflicts = []
+        day_counts = {}
+        core_scheduled = 0
+
+        for i in range(problem.num_instances):
+            c = int(problem.instance_course[i])
+            course_id = problem.course_ids[c]
+            course = self.course_dict[course_id]
+            instance_id = problem.instance_ids[i]
+            instance_num = int(problem.instance_number[i])
+
+            if i not in assignments:
+                qualified = np.flatnonzero(problem.qualified[c])
+                conflicts.append({
+                    "conflict": {
+                        "conflict_id": f"CONF-{instance_id}",
+                        "schedule_id": self.schedule_id,
+                        "timeslot_id": None,
+                        "day_of_week": None,
+                        "conflict_type": "NO_AVAILABLE_SLOT",
+                        "description": f"Could not schedule course {course_id} (instance {instance_num})",
+                        "is_resolved": False,
+                        "resolution_notes": None
+                    },
+                    "scheduled_course": {
+                        "course_id": course_id,
+                        "professor_id": problem.professor_ids[qualified[0]] if len(qualified) else None,
+                        "class_instance": instance_num,
+                        "num_classes": course.get('num_classes', 1)
+                    },
+                    "conflict_course": {
+                        "scheduled_course_id": f"SC-{instance_id}"
+                    }
+                })
+                continue
+
+            p, s = assignments[i]
+            prof_id = problem.professor_ids[p]
+            slot_id = grid.slot_ids[s]
+            day = grid.day_names[grid.slot_day[s]]
+            day_counts[day] = day_counts.get(day, 0) + 1
+            if problem.course_is_core[c]:
+                core_scheduled += 1
+
+            scheduled_courses.append({
+                "scheduled_course_id": f"SC-{instance_id}",
+                "schedule_id": self.schedule_id,
+                "course_id": course_id,
+                "professor_id": prof_id,
+                "timeslot_id": slot_id,
+                "day_of_week": day,
+                "is_override": False,
+                "class_instance": instance_num,
+                "num_classes": course.get('num_classes', 1),
+                "course_data": course,
+                "professor_data": self.professor_dict.get(prof_id, {}),
+                "time_slot_data": self.time_slot_dict.get(slot_id, {})
+            })
+
+        total = problem.num_instances
+        core_total = int(problem.course_num_classes[problem.course_is_core].sum())
+        return {
+            "success": True,
+            "result": {
+                "scheduled_courses": scheduled_courses,
+                "conflicts": conflicts,
+                "statistics": {
+                    "solver_status": "FEASIBLE",
+                    "solver_time": solve_time,
+                    "engine": "greedy",
+                    "total_courses": total,
+                    "scheduled_courses": len(scheduled_courses),
+                    "scheduling_percentage": round(len(scheduled_courses) / total * 100, 2) if total else 100,
+                    "core_courses": core_total,
+                    "core_courses_scheduled": core_scheduled,
+                    "core_percentage": round(core_scheduled / core_total * 100, 2) if core_total > 0 else 100,
+                    "unresolved_conflicts": len(conflicts),
+                    "courses_by_day": day_counts
+                }
+            }
+        }
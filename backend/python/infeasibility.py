@@ -0,0 +1,118 @@
+"""
+Explain an infeasible scheduling problem with a small set of conflicting rules
+
+The model is rebuilt with every optional hard-constraint group (a course's
+day pattern and slot consistency, a professor's availability and back-to-back
+rule) guarded by an assumption literal. CP-SAT then proves the model
+infeasible under the assumptions and returns a sufficient subset of them,
+which is shrunk further by dropping one group at a time while the rest stays
+infeasible. What remains names the courses and professors whose rules
+contradict each other.
+"""
+
+import time
+from typing import Dict, List, Any, Tuple
+
+from ortools.sat.python import cp_model
+
+# Hard-constraint groups guarded by CourseScheduler(guard_constraints=True), and what each
+# group's index refers to
+CONSTRAINT_GROUPS = {
+    "day_pattern": "course",
+    "slot_consistency": "course",
+    "availability": "professor",
+    "back_to_back": "professor"
+}
+
+# What a group requires, by kind
+GROUP_DESCRIPTIONS = {
+    "day_pattern": "course {course} must follow one of its day patterns",
+    "slot_consistency": "all classes of course {course} must use one slot number",
+    "availability": "professor {professor} only teaches when available",
+    "back_to_back": "professor {professor} needs a break between classes"
+}
+
+# Time limit of the whole explanation unless options.explainTimeLimit is set
+DEFAULT_EXPLAIN_TIME_LIMIT = 60
+
+def _solve(model: cp_model.CpModel, assumptions: List[Any], time_limit: float) -> Tuple[int, List[int]]:
+    """
+    Solve for feasibility under some assumption literals
+
+    Returns:
+        Tuple of (status, variable indices of a sufficient infeasible subset
+        of the assumptions, empty unless the status is INFEASIBLE)
+    """
+    model.ClearAssumptions()
+    model.AddAssumptions(assumptions)
+    solver = cp_model.CpSolver()
+    # Assumption cores are only reported by a single search worker
+    solver.parameters.num_workers = 1
+    solver.parameters.max_time_in_seconds = max(0.0, time_limit)
+    status = solver.Solve(model)
+    core = solver.SufficientAssumptionsForInfeasibility() if status == cp_model.INFEASIBLE else []
+    return status, list(core)
+
+def explain_infeasibility(scheduler, time_limit: float = DEFAULT_EXPLAIN_TIME_LIMIT) -> Dict[str, Any]:
+    """
+    Find a small set of hard-constraint groups that cannot hold together
+
+    Args:
+        scheduler: CourseScheduler built with guard_constraints=True and
+            without an objective
+        time_limit: Seconds for the whole explanation
+
+    Returns:
+        Dictionary with the status of the guarded model, whether the core
+        was shrunk to a minimal one, and the core's groups, each naming its
+        kind, course or professor and what it requires. An empty core means
+        the problem is infeasible without any guarded group, i.e. from
+        qualifications, double-booking and multi-class slot rules alone.
+    """
+    start = time.time()
+    deadline = start + time_limit
+    model = scheduler.model
+    problem = scheduler.problem
+
+    guards = scheduler.constraint_guards
+    group_of = {literal.Index(): key for key, literal in guards.items()}
+    literal_of = {literal.Index(): literal for literal in guards.values()}
+
+    status, core = _solve(model, list(guards.values()), time_limit)
+    minimal = status == cp_model.INFEASIBLE
+
+    # Deletion pass: drop each group whose removal keeps the rest infeasible
+    for index in list(core):
+        if index not in core:
+            continue
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            minimal = False
+            break
+        sub_status, sub_core = _solve(model, [literal_of[i] for i in core if i != index], remaining)
+        if sub_status == cp_model.INFEASIBLE:
+            core = sub_core
+        elif sub_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            # Undecided in the time left: keep the group
+            minimal = False
+
+    entries = []
+    for index in sorted(core, key=lambda i: group_of[i]):
+        kind, entity = group_of[index]
+        entry = {"constraint": kind}
+        if CONSTRAINT_GROUPS[kind] == "course":
+            entry["course_id"] = problem.course_ids[entity]
+        else:
+            entry["professor_id"] = problem.professor_ids[entity]
+        entry["description"] = GROUP_DESCRIPTIONS[kind].format(
+            course=entry.get("course_id"), professor=entry.get("professor_id")
+        )
+        entries.append(entry)
+
+    return {
+        "status": scheduler._get_status_string(status),
+        "guarded_groups": len(guards),
+        "minimal": minimal,
+        "core": entries,
+        "seconds": round(time.time() - start, 3)
+    }
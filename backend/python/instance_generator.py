@@ -0,0 +1,171 @@
+"""
+Deterministic generator of synthetic scheduler inputs
+
+Usage:
+    python instance_generator.py --courses 200 [--seed 0] [--availability 0.8] > input.json
+"""
+
+import argparse
+import json
+import math
+import random
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday"]
+DAY_CODES = {"Monday": "MON", "Tuesday": "TUE", "Wednesday": "WED", "Thursday": "THU", "Friday": "FRI"}
+
+# Start, end and duration of each slot number; mirrors the real grid,
+# including the overlapping TS4/TS5 and TS6/TS7 pairs
+SLOT_TIMES = [
+    ("09:10:00", "10:05:00", 55),
+    ("10:20:00", "11:15:00", 55),
+    ("11:30:00", "12:25:00", 55),
+    ("12:45:00", "14:05:00", 80),
+    ("13:30:00", "14:50:00", 80),
+    ("17:30:00", "20:30:00", 180),
+    ("18:00:00", "21:00:00", 180),
+]
+
+# Relative frequency of courses with 1, 2 and 3 classes per week
+DEFAULT_MULTI_CLASS_MIX = (3, 1, 1)
+
+def generate_time_slots(slot_times: Sequence[Tuple[str, str, int]] = SLOT_TIMES,
+                        days: Sequence[str] = DAYS) -> List[Dict[str, Any]]:
+    """
+    Build the time slot grid: every slot number on every day
+
+    Args:
+        slot_times: (start, end, duration) of each slot number
+        days: Days the grid covers
+
+    Returns:
+        List of time slot dictionaries
+    """
+    time_slots = []
+    for number, (start, end, duration) in enumerate(slot_times, 1):
+        for day in days:
+            time_slots.append({
+                "timeslot_id": f"TS{number}-{DAY_CODES.get(day, day[:3].upper())}",
+                "name": f"Time Slot {number}",
+                "start_time": start,
+                "end_time": end,
+                "duration_minutes": duration,
+                "day_of_week": day
+            })
+    return time_slots
+
+def generate_instance(num_courses: int, seed: int = 0, num_professors: Optional[int] = None,
+                      num_departments: Optional[int] = None,
+                      multi_class_mix: Sequence[float] = DEFAULT_MULTI_CLASS_MIX,
+                      availability_density: float = 1.0, professors_per_course: int = 3,
+                      core_fraction: float = 0.5,
+                      slot_times: Sequence[Tuple[str, str, int]] = SLOT_TIMES,
+                      days: Sequence[str] = DAYS) -> Dict[str, Any]:
+    """
+    Generate a synthetic scheduler input
+
+    The same arguments always produce the same input.
+
+    Args:
+        num_courses: Number of courses in the catalogue
+        seed: Random seed
+        num_professors: Number of professors (default: half the courses)
+        num_departments: Number of departments (default: one per 20 courses)
+        multi_class_mix: Relative frequency of 1, 2 and 3 classes per week
+        availability_density: Probability that a professor is available in a
+            given slot (1.0 leaves availability empty, i.e. always available)
+        professors_per_course: Qualified professors per course, drawn from the
+            course's department
+        core_fraction: Probability that a course is core
+        slot_times: (start, end, duration) of each slot number
+        days: Days covered by the slot grid
+
+    Returns:
+        Scheduler input dictionary
+    """
+    rng = random.Random(seed)
+    num_departments = num_departments or max(1, num_courses // 20)
+    num_professors = num_professors or max(2, num_courses // 2)
+
+    time_slots = generate_time_slots(slot_times, days)
+    durations = [duration for _, _, duration in slot_times]
+
+    professors = [{
+        "professor_id": f"PROF-{i}",
+        "department_id": f"DEPT-{i % num_departments}",
+        "first_name": "Prof",
+        "last_name": str(i)
+    } for i in range(num_professors)]
+
+    professors_by_department = {}
+    for professor in professors:
+        professors_by_department.setdefault(professor["department_id"], []).append(professor["professor_id"])
+
+    courses = []
+    professor_courses = []
+    for i in range(num_courses):
+        department_id = f"DEPT-{i % num_departments}"
+        courses.append({
+            "course_id": f"C{i}",
+            "department_id": department_id,
+            "course_name": f"Course {i}",
+            "duration_minutes": rng.choice(durations),
+            "is_core": rng.random() < core_fraction,
+            "program_ids": [f"PROG-{i % num_departments}"],
+            "num_classes": rng.choices([1, 2, 3], weights=multi_class_mix)[0]
+        })
+
+        department_profs = professors_by_department.get(department_id, [])
+        for professor_id in rng.sample(department_profs, min(professors_per_course, len(department_profs))):
+            professor_courses.append({
+                "professor_id": professor_id,
+                "course_id": f"C{i}"
+            })
+
+    # Professors missing from the availability map are available everywhere
+    professor_availability = {}
+    if availability_density < 1.0:
+        for professor in professors:
+            days_available = {}
+            for slot in time_slots:
+                if rng.random() < availability_density:
+                    days_available.setdefault(slot["day_of_week"], []).append(slot["timeslot_id"])
+            professor_availability[professor["professor_id"]] = days_available
+
+    return {
+        "scheduleId": f"SCH-GEN-{num_courses}-{seed}",
+        "courses": courses,
+        "professors": professors,
+        "timeSlots": time_slots,
+        "professorAvailability": professor_availability,
+        "professorCourses": professor_courses
+    }
+
+def courses_for_instances(num_instances: int, multi_class_mix: Sequence[float] = DEFAULT_MULTI_CLASS_MIX) -> int:
+    """
+    Number of courses that yields about num_instances course instances
+
+    Args:
+        num_instances: Target number of course instances
+        multi_class_mix: Relative frequency of 1, 2 and 3 classes per week
+
+    Returns:
+        Number of courses to generate
+    """
+    mean_classes = sum(n * weight for n, weight in zip([1, 2, 3], multi_class_mix)) / sum(multi_class_mix)
+    return max(1, math.ceil(num_instances / mean_classes))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic scheduler input")
+    parser.add_argument("--courses", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--professors", type=int)
+    parser.add_argument("--departments", type=int)
+    parser.add_argument("--availability", type=float, default=1.0, help="Availability density (0-1)")
+    args = parser.parse_args()
+
+    print(json.dumps(generate_instance(args.courses, args.seed, args.professors, args.departments,
+                                       availability_density=args.availability), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Adaptive large neighbourhood search over the CourseScheduler model
+
+After a short initial solve, each iteration relaxes one neighbourhood of the
+incumbent schedule, fixes every other course instance to its incumbent
+professor and slot, and re-solves the model with a short time limit. The
+neighbourhood kinds are chosen with adaptive weights that follow the gains
+each kind produced, and the neighbourhood size grows while sub-solves are
+proven optimal without gain and shrinks while they time out.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Any
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from solver_profiles import apply_profile
+
+# Neighbourhood kinds, all tried with equal weight at first
+NEIGHBOURHOODS = ("day", "slot_number", "professor_cluster", "overloaded_slots")
+
+# Default LNS settings, overridable with the lns* options
+DEFAULT_INITIAL_FRACTION = 0.2
+DEFAULT_SUBSOLVE_TIME = 5.0
+DEFAULT_STAGNATION = 20
+DEFAULT_NEIGHBOURHOOD_FRACTION = 0.2
+
+# Weight update: weight = DECAY * weight + (1 - DECAY) * reward
+WEIGHT_DECAY = 0.8
+MIN_WEIGHT = 0.05
+
+class LnsDriver:
+    """Runs adaptive LNS on a CourseScheduler whose model has been built"""
+
+    def __init__(self, scheduler, options: Dict[str, Any]):
+        """
+        Initialize the driver
+
+        Args:
+            scheduler: CourseScheduler after the objective was added
+            options: Scheduler options; lnsInitialFraction (share of the time
+                limit for the initial solve), lnsSubsolveTime (seconds per
+                sub-solve), lnsStagnation (iterations without gain before
+                stopping), lnsNeighbourhoodFraction (initial share of the
+                courses to relax) and lnsSeed
+        """
+        self.scheduler = scheduler
+        self.problem = scheduler.problem
+        self.grid = scheduler.grid
+        self.initial_fraction = options.get('lnsInitialFraction', DEFAULT_INITIAL_FRACTION)
+        self.subsolve_time = options.get('lnsSubsolveTime', DEFAULT_SUBSOLVE_TIME)
+        self.stagnation = options.get('lnsStagnation', DEFAULT_STAGNATION)
+        self.fraction = options.get('lnsNeighbourhoodFraction', DEFAULT_NEIGHBOURHOOD_FRACTION)
+        self.rng = random.Random(options.get('lnsSeed', 0))
+
+        self.weights = {kind: 1.0 for kind in NEIGHBOURHOODS}
+        self.kind_statistics = {kind: {"tried": 0, "improved": 0, "gain": 0.0} for kind in NEIGHBOURHOODS}
+        self.trajectory = []
+        self._index_decision_variables()
+
+    def _index_decision_variables(self):
+        """Proto indices of each instance's decision literals and of its slot literals."""
+        s = self.scheduler
+        self.instance_vars = {}
+        slot_index, slot_instance, slot_value = [], [], []
+
+        for i, scheduled_var in s.course_scheduled_vars.items():
+            indices = [scheduled_var.Index()]
+            indices += [var.Index() for var in s.course_professor_vars.get(i, {}).values()]
+            indices += [var.Index() for var in s.course_day_vars.get(i, {}).values()]
+            indices += [var.Index() for var in s.assignment_vars.get(i, {}).values()]
+            for slot, var in s.course_timeslot_vars.get(i, {}).items():
+                indices.append(var.Index())
+                slot_index.append(var.Index())
+                slot_instance.append(i)
+                slot_value.append(slot)
+            self.instance_vars[i] = np.array(indices, dtype=np.int64)
+
+        self.slot_index = np.array(slot_index, dtype=np.int64)
+        self.slot_instance = np.array(slot_instance, dtype=np.int64)
+        self.slot_value = np.array(slot_value, dtype=np.int64)
+
+    def _incumbent_slots(self, solution: np.ndarray) -> np.ndarray:
+        """Slot of every instance in a solution, -1 when unassigned."""
+        slots = np.full(self.problem.num_instances, -1, dtype=np.int64)
+        chosen = solution[self.slot_index] == 1
+        slots[self.slot_instance[chosen]] = self.slot_value[chosen]
+        return slots
+
+    def _choose_kind(self) -> str:
+        """Roulette-wheel choice of a neighbourhood kind by adaptive weight."""
+        kinds = list(self.weights)
+        return self.rng.choices(kinds, weights=[self.weights[kind] for kind in kinds])[0]
+
+    def _neighbourhood(self, kind: str, slots: np.ndarray) -> List[int]:
+        """
+        Courses to relax for one neighbourhood kind
+
+        Courses are relaxed as a whole so their day patterns can change together.
+
+        Args:
+            kind: Neighbourhood kind
+            slots: Incumbent slot of every instance
+
+        Returns:
+            Course indices
+        """
+        problem = self.problem
+        grid = self.grid
+        placed = slots >= 0
+
+        if kind == "day":
+            d = self.rng.randrange(grid.num_days)
+            instances = np.flatnonzero(placed & (grid.slot_day[np.maximum(slots, 0)] == d))
+        elif kind == "slot_number":
+            n = self.rng.randrange(len(grid.slot_number_names))
+            instances = np.flatnonzero(placed & (grid.slot_number[np.maximum(slots, 0)] == n))
+        elif kind == "professor_cluster":
+            # A professor and every course they could teach
+            p = self.rng.randrange(problem.num_professors)
+            return np.flatnonzero(problem.qualified[:, p]).tolist()
+        else:
+            # Courses in the most loaded slots
+            loads = np.bincount(slots[placed], minlength=grid.num_slots)
+            busiest = np.argsort(-loads, kind='stable')[:self.rng.randint(2, 4)]
+            instances = np.flatnonzero(placed & np.isin(slots, busiest))
+
+        return np.unique(problem.instance_course[instances]).tolist()
+
+    def _fixed_model(self, relaxed_courses: set, solution: np.ndarray):
+        """Copy of the model with every instance outside relaxed_courses fixed to the solution."""
+        model = self.scheduler.model.clone()
+        proto = model.Proto()
+        for i, indices in self.instance_vars.items():
+            if int(self.problem.instance_course[i]) in relaxed_courses:
+                continue
+            for index in indices.tolist():
+                domain = proto.variables[index].domain
+                domain[0] = domain[1] = int(solution[index])
+
+        model.ClearHints()
+        hint = model.Proto().solution_hint
+        hint.vars.extend(range(len(solution)))
+        hint.values.extend(solution.tolist())
+        return model
+
+    def run(self, profile: Dict[str, Any], solution_timer, timer_factory) -> int:
+        """
+        Run the initial solve and the LNS iterations
+
+        Args:
+            profile: Resolved solver profile; its max_time_in_seconds is the
+                total time limit
+            solution_timer: Solution callback of the initial solve
+            timer_factory: Function returning a solution callback for a
+                sub-solve, given the stage name
+
+        Returns:
+            Solver status: the initial solve's status if it found no solution
+            or proved optimality, otherwise FEASIBLE. scheduler.solver is left
+            holding the best solution.
+        """
+        s = self.scheduler
+        start = time.time()
+        time_limit = profile["parameters"]["max_time_in_seconds"]
+
+        # The initial solve runs until its share of the time limit is spent
+        # and it has a solution, whichever comes later
+        solver = self._new_solver(profile, time_limit)
+        budget_spent = threading.Event()
+        progress = solution_timer.on_solution
+
+        def on_solution(timer):
+            if progress is not None:
+                progress(timer)
+            if budget_spent.is_set():
+                timer.StopSearch()
+        solution_timer.on_solution = on_solution
+
+        def on_budget():
+            budget_spent.set()
+            if solution_timer.solution_count:
+                solver.StopSearch()
+        budget_timer = threading.Timer(time_limit * self.initial_fraction, on_budget)
+
+        s.active_solver = solver
+        budget_timer.start()
+        status = solver.Solve(s.model, solution_timer)
+        budget_timer.cancel()
+        s.active_solver = None
+        s.solver = solver
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return status
+
+        best_objective = solver.ObjectiveValue()
+        best_bound = solver.BestObjectiveBound()
+        solution = np.array(solver.ResponseProto().solution, dtype=np.int64)
+        self._record(0, "initial", 0, best_objective, start, True)
+        if status == cp_model.OPTIMAL:
+            return status
+
+        target_courses = max(1, int(self.fraction * self.problem.num_courses))
+        iteration = 0
+        since_gain = 0
+        while since_gain < self.stagnation and not s.stop_requested:
+            remaining = time_limit - (time.time() - start)
+            if remaining <= 0 or best_objective >= best_bound:
+                break
+            iteration += 1
+
+            kind = self._choose_kind()
+            courses = self._neighbourhood(kind, self._incumbent_slots(solution))
+            if len(courses) > target_courses:
+                courses = self.rng.sample(courses, target_courses)
+            if not courses:
+                since_gain += 1
+                continue
+
+            sub_solver = self._new_solver(profile, min(self.subsolve_time, remaining))
+            s.active_solver = sub_solver
+            sub_status = sub_solver.Solve(self._fixed_model(set(courses), solution), timer_factory("lns"))
+            s.active_solver = None
+
+            found = sub_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            gain = sub_solver.ObjectiveValue() - best_objective if found else 0.0
+            statistics = self.kind_statistics[kind]
+            statistics["tried"] += 1
+
+            if gain > 0:
+                best_objective = sub_solver.ObjectiveValue()
+                solution = np.array(sub_solver.ResponseProto().solution, dtype=np.int64)
+                s.solver = sub_solver
+                statistics["improved"] += 1
+                statistics["gain"] += gain
+                since_gain = 0
+            else:
+                since_gain += 1
+                # Proven optimal without gain: look wider; timed out: look narrower
+                if sub_status == cp_model.OPTIMAL:
+                    target_courses = min(self.problem.num_courses, int(target_courses * 1.2) + 1)
+                elif sub_status in (cp_model.FEASIBLE, cp_model.UNKNOWN):
+                    target_courses = max(1, int(target_courses * 0.8))
+
+            reward = 1.0 if gain > 0 else 0.0
+            self.weights[kind] = max(MIN_WEIGHT, WEIGHT_DECAY * self.weights[kind] + (1 - WEIGHT_DECAY) * reward)
+            self._record(iteration, kind, len(courses), best_objective, start, gain > 0)
+
+        self.iterations = iteration
+        return cp_model.FEASIBLE
+
+    def _new_solver(self, profile: Dict[str, Any], time_limit: float) -> cp_model.CpSolver:
+        """CpSolver with the profile parameters and the given time limit."""
+        solver = cp_model.CpSolver()
+        apply_profile(solver.parameters, profile)
+        solver.parameters.max_time_in_seconds = max(0.0, time_limit)
+        # The driver decides when to stop; the first solution of a sub-solve is its hint
+        solver.parameters.stop_after_first_solution = False
+        return solver
+
+    def _record(self, iteration: int, kind: str, size: int, objective: float, start: float, improved: bool):
+        """Keep the trajectory entry of an improving iteration."""
+        if improved:
+            self.trajectory.append({
+                "iteration": iteration,
+                "neighbourhood": kind,
+                "courses_relaxed": size,
+                "objective": objective,
+                "elapsed": round(time.time() - start, 4)
+            })
+
+    def report(self) -> Dict[str, Any]:
+        """LNS section for the result statistics."""
+        return {
+            "iterations": getattr(self, 'iterations', 0),
+            "trajectory": self.trajectory,
+            "neighbourhoods": {
+                kind: dict(statistics, gain=round(statistics["gain"], 2), weight=round(self.weights[kind], 3))
+                for kind, statistics in self.kind_statistics.items()
+            }
+        }
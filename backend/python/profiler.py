@@ -0,0 +1,109 @@
+"""
+Per-phase profiler for scheduler model building and solving
+"""
+
+import contextlib
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+class PhaseProfiler:
+    """Collects wall time, memory use and model growth for each scheduling phase"""
+
+    def __init__(self, model, trace_memory: bool = False):
+        """
+        Initialize the profiler
+
+        Args:
+            model: CP-SAT model whose variables and constraints are counted
+            trace_memory: Whether to record the peak Python allocation of each
+                phase with tracemalloc (slows model building noticeably)
+        """
+        self.model = model
+        self.trace_memory = trace_memory
+        self.phases = {}
+
+    def _model_size(self):
+        """Current number of variables and constraints in the model proto."""
+        proto = self.model.Proto()
+        return len(proto.variables), len(proto.constraints)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Profile the enclosed block as one phase
+
+        Args:
+            name: Phase name used as the key in the report
+        """
+        variables_before, constraints_before = self._model_size()
+        rss_before = peak_rss_mb()
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            variables_after, constraints_after = self._model_size()
+
+            rss_after = peak_rss_mb()
+
+            # ru_maxrss never decreases, so a phase is charged only for the
+            # amount it raised the process peak by
+            entry = {
+                "wall_time": round(wall_time, 4),
+                "variables_added": variables_after - variables_before,
+                "constraints_added": constraints_after - constraints_before,
+                "peak_rss_growth_mb": None if rss_after is None else round(rss_after - rss_before, 1),
+                "process_peak_rss_mb": rss_after
+            }
+
+            if self.trace_memory:
+                entry["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.phases[name] = entry
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the profile section for the result statistics
+
+        Returns:
+            Dictionary with the phases in execution order and model totals
+        """
+        variables, constraints = self._model_size()
+        return {
+            "phases": self.phases,
+            "total_time": round(sum(entry["wall_time"] for entry in self.phases.values()), 4),
+            "variables": variables,
+            "constraints": constraints
+        }
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of the process since it started, in megabytes
+
+    Includes memory allocated by the CP-SAT solver, which tracemalloc does not
+    see. Returns None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
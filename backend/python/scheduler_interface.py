@@ -5,10 +5,42 @@ This script:
 1. Reads JSON input from stdin
 2. Runs the CourseScheduler with the input data
 3. Returns the schedule or error as JSON to stdout
+
+Streaming mode (--stream argument or options.streamProgress) writes
+newline-delimited JSON events to stdout instead, one object per line:
+    {"event": "model_built", ...}    model size and build time
+    {"event": "solution", ...}       each improving solution: objective, bound,
+                                     elapsed time and, with options.progressDiff,
+                                     the assignments changed since the last event
+    {"event": "result", "result": {...}}  the final result document
+    {"event": "error", ...}          on failure
+Log messages go to stderr. SIGTERM or SIGINT stops the search early; the best
+solution found so far is still sent as the result event.
+
+options.decompose solves independent course/professor components in parallel
+(see decomposition.py); options.engine = "greedy" builds an instant draft
+without the solver (see greedy_scheduler.py).
+
+An input with "action": "validate" is not solved: its scheduledCourses rows
+are checked against the hard rules (see validator.py) and the report is
+returned as {"success": true, "result": {...}}.
+
+Worker mode (--worker, optionally with --socket PATH) keeps one process
+running: framed JSON requests with correlation IDs are read from stdin or a
+Unix socket, and Python, OR-Tools and the compiled problem cache stay loaded
+between requests (see Worker).
 """
 
+import io
+import os
 import sys
 import json
+import time
+import queue
+import signal
+import threading
+import contextlib
+import socketserver
 import traceback
 # Redirect library loading messages to stderr
 class StderrRedirector:
@@ -27,19 +59,375 @@ class StderrRedirector:
 # Replace standard output temporarily
 sys.stdout = StderrRedirector(sys.stderr)
 
+import ortools
+
+import compiled_problem
 from course_scheduler import CourseScheduler
+from decomposition import DecomposedScheduler
+from greedy_scheduler import GreedyScheduler
+from validator import validate_schedule
+from instance_generator import generate_instance
+
+# Scheduling engines selectable with options.engine
+ENGINES = ("cp-sat", "greedy")
+
+# Size and time limit of the generated input solved by a worker warm-up
+WARMUP_COURSES = 20
+WARMUP_TIME_LIMIT = 5
+
+def create_scheduler(data, progress_listener=None):
+    """Create the scheduler selected by the input options."""
+    options = data.get('options', {})
+    engine = options.get('engine', 'cp-sat')
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    if engine == 'greedy':
+        return GreedyScheduler(data, progress_listener)
+    if options.get('decompose', False):
+        return DecomposedScheduler(data, progress_listener)
+    return CourseScheduler(data, progress_listener)
+
+class EventWriter:
+    """Writes one JSON event per line to stdout, safe to call from solver threads"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+    
+    def __call__(self, event):
+        line = json.dumps(event)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def run_streaming(data):
+    """
+    Solve with progress events written to stdout as NDJSON
+    
+    The solve runs in a worker thread so that the main thread can handle
+    SIGTERM/SIGINT by stopping the search.
+    """
+    emit = EventWriter(sys.__stdout__)
+    
+    try:
+        # Scheduler log messages would corrupt the event stream
+        with contextlib.redirect_stdout(sys.stderr):
+            scheduler = create_scheduler(data, progress_listener=emit)
+            
+            outcome = {}
+            def solve():
+                try:
+                    outcome["result"] = scheduler.solve()
+                except Exception as e:
+                    outcome["error"] = e
+                    outcome["traceback"] = traceback.format_exc()
+            
+            worker = threading.Thread(target=solve, daemon=True)
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *args: scheduler.stop_search())
+            worker.start()
+            while worker.is_alive():
+                worker.join(0.1)
+        
+        if "error" in outcome:
+            emit({"event": "error", "error": str(outcome["error"]), "traceback": outcome["traceback"]})
+        else:
+            emit({"event": "result", "result": outcome["result"]})
+    
+    except Exception as e:
+        emit({"event": "error", "error": str(e), "traceback": traceback.format_exc()})
+
+class Worker:
+    """
+    Long-lived scheduler process answering framed JSON requests
+    
+    Requests and responses are single-line JSON objects (NDJSON). Every
+    response carries the "id" of its request:
+        {"id": ..., "type": "solve", "data": {...}}     -> {"type": "result", "result": {...}}
+        {"id": ..., "type": "validate", "data": {...}}  -> {"type": "result", "result": {...}}
+        {"id": ..., "type": "health"}                   -> {"type": "health", ...}
+        {"id": ..., "type": "warmup", "data": {...}}    -> {"type": "warmup", ...}
+        {"id": ..., "type": "cancel", "target": ...}    -> {"type": "cancelled", ...}
+        {"id": ..., "type": "shutdown"}                 -> {"type": "shutdown"}, after
+                                                           which queued requests finish
+    Failures are answered with {"type": "error", "error": ..., "traceback": ...}.
+    With options.streamProgress, a solve also sends {"type": "event",
+    "event": {...}} lines before its result.
+    
+    Solves and warm-ups run one at a time on a solver thread, in arrival
+    order; health, cancel and validate requests are answered at once, even
+    while a solve is running. Compiled problems are cached between requests
+    (see compiled_problem.compile_problem) under the caller's
+    options.problemCacheKey or the input's "problemVersion"; hashing the
+    input costs about as much as compiling it, so it is only fingerprinted
+    when neither is given.
+    """
+    
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.started = time.time()
+        self.requests = 0
+        self.warm = False
+        # (request id, scheduler) of the solve or warm-up being run; the
+        # scheduler is None until it is built
+        self.active = None
+        self.cancelled = set()
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def handle(self, line, emit):
+        """
+        Answer or queue one request line
+        
+        Args:
+            line: One framed JSON request
+            emit: Function sending a response object to the requester
+        """
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            emit({"id": None, "type": "error", "error": f"Invalid request: {e}"})
+            return
+        
+        request_id = message.get('id')
+        kind = message.get('type', 'solve')
+        self.requests += 1
+        
+        if kind == 'health':
+            emit(self.health(request_id))
+        elif kind == 'cancel':
+            emit(self.cancel(request_id, message.get('target')))
+        elif kind == 'validate':
+            self._answer(request_id, emit, lambda: {
+                "id": request_id, "type": "result", "result": validate_schedule(message.get('data', {}))
+            })
+        elif kind in ('solve', 'warmup'):
+            self.queue.put((message, emit, time.time()))
+        elif kind == 'shutdown':
+            # Requests already queued are still answered
+            self.stopping.set()
+            emit({"id": request_id, "type": "shutdown"})
+        else:
+            emit({"id": request_id, "type": "error", "error": f"Unknown request type: {kind}"})
+    
+    def health(self, request_id):
+        """Health response: process, queue and cache state."""
+        return {
+            "id": request_id,
+            "type": "health",
+            "status": "stopping" if self.stopping.is_set() else "ok",
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "busy": self.active[0] if self.active else None,
+            "queued": self.queue.qsize(),
+            "warm": self.warm,
+            "cached_problems": compiled_problem.cache_size()
+        }
+    
+    def cancel(self, request_id, target):
+        """Stop the running solve with id target, or drop it from the queue."""
+        with self.lock:
+            if self.active is not None and self.active[0] == target:
+                if self.active[1] is not None:
+                    self.active[1].stop_search()
+                else:
+                    # Still being built: solve() checks this before it starts
+                    self.cancelled.add(target)
+                state = "stopping"
+            else:
+                self.cancelled.add(target)
+                state = "dropped"
+        return {"id": request_id, "type": "cancelled", "target": target, "state": state}
+    
+    def _answer(self, request_id, emit, build):
+        """Send build()'s response, or an error response if it raises."""
+        try:
+            response = build()
+        except Exception as e:
+            response = {"id": request_id, "type": "error", "error": str(e), "traceback": traceback.format_exc()}
+        try:
+            emit(response)
+        except OSError:
+            # The requester disconnected; the worker carries on
+            pass
+    
+    def _run(self):
+        """Solver thread: run queued solves and warm-ups in order."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            message, emit, queued_at = item
+            request_id = message.get('id')
+            with self.lock:
+                cancelled = request_id is not None and request_id in self.cancelled
+                if cancelled:
+                    self.cancelled.discard(request_id)
+                else:
+                    self.active = (request_id, None)
+            if cancelled:
+                self._answer(request_id, emit, lambda: self._cancelled_error(request_id))
+                continue
+            
+            try:
+                if message.get('type') == 'warmup':
+                    self._answer(request_id, emit, lambda: dict(self.warmup(message.get('data')), id=request_id))
+                else:
+                    self._answer(request_id, emit,
+                                 lambda: self.solve(request_id, message.get('data', {}), emit, queued_at))
+            finally:
+                with self.lock:
+                    self.active = None
+    
+    def _cancelled_error(self, request_id):
+        """Error response of a solve cancelled before its search started."""
+        return {"id": request_id, "type": "error", "error": "Cancelled before it started"}
+    
+    def solve(self, request_id, data, emit, queued_at):
+        """Solve one input like a one-shot run, keeping its compiled problem cached."""
+        start = time.time()
+        # The cache key goes into a copy so the request payload is left as sent
+        data = dict(data, options=dict(data.get('options', {}), problemCacheKey=self.cache_key(data)))
+        
+        listener = None
+        if data['options'].get('streamProgress', False):
+            listener = lambda event: emit({"id": request_id, "type": "event", "event": event})
+        scheduler = create_scheduler(data, progress_listener=listener)
+        # A cancel that arrived while the scheduler was being built is
+        # honoured here, before the search starts
+        with self.lock:
+            cancelled = request_id is not None and request_id in self.cancelled
+            self.cancelled.discard(request_id)
+            self.active = (request_id, scheduler)
+        if cancelled:
+            scheduler.stop_search()
+            return self._cancelled_error(request_id)
+        result = scheduler.solve()
+        
+        return {
+            "id": request_id,
+            "type": "result",
+            "result": result,
+            "queued_seconds": round(start - queued_at, 4),
+            "seconds": round(time.time() - start, 4)
+        }
+    
+    def cache_key(self, data):
+        """
+        Compiled problem cache key of an input
+        
+        Args:
+            data: Scheduler input dictionary
+        
+        Returns:
+            options.problemCacheKey if given, else "version:" and the input's
+            problemVersion if given, else the input's fingerprint
+        """
+        key = data.get('options', {}).get('problemCacheKey')
+        if key is not None:
+            return key
+        if data.get('problemVersion') is not None:
+            return f"version:{data['problemVersion']}"
+        return compiled_problem.problem_fingerprint(data)
+    
+    def warmup(self, data=None):
+        """
+        Load the solver and fill the caches before the first real request
+        
+        A small generated input is solved so every OR-Tools library is
+        loaded; data, if given, is also compiled into the problem cache.
+        """
+        start = time.time()
+        sample = generate_instance(WARMUP_COURSES)
+        sample["options"] = {"maxTimeInSeconds": WARMUP_TIME_LIMIT}
+        status = CourseScheduler(sample).solve().get("result", {}).get("statistics", {}).get("solver_status")
+        
+        cached = None
+        if data:
+            cached = self.cache_key(data)
+            compiled_problem.compile_problem(data, cached)
+        self.warm = True
+        return {"type": "warmup", "status": status, "cached": cached, "seconds": round(time.time() - start, 4)}
+    
+    def wait(self):
+        """Wait for the queued requests to finish, then stop the solver thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+def run_worker(socket_path=None):
+    """
+    Serve framed JSON requests until shutdown or end of input
+    
+    Args:
+        socket_path: Unix socket to listen on; None reads requests from
+            stdin and writes responses to stdout
+    """
+    # Scheduler log messages would corrupt the response stream
+    sys.stdout = sys.stderr
+    worker = Worker()
+    ready = {"id": None, "type": "ready", "pid": os.getpid(), "ortools": ortools.__version__}
+    
+    if socket_path is None:
+        emit = EventWriter(sys.__stdout__)
+        emit(ready)
+        for line in sys.stdin:
+            if line.strip():
+                worker.handle(line, emit)
+            if worker.stopping.is_set():
+                break
+        worker.wait()
+        return
+    
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            emit = EventWriter(io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True))
+            for line in self.rfile:
+                if line.strip():
+                    worker.handle(line.decode('utf-8'), emit)
+                if worker.stopping.is_set():
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                    return
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as server:
+        server.daemon_threads = True
+        print(json.dumps(ready), file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+    worker.wait()
 
 def main():
     try:
         # Reset stdout for normal output
         sys.stdout = sys.__stdout__
         
+        if '--worker' in sys.argv[1:]:
+            socket_path = None
+            if '--socket' in sys.argv[1:]:
+                socket_path = sys.argv[sys.argv.index('--socket') + 1]
+            run_worker(socket_path)
+            return
+        
         # Read JSON input from stdin
         input_json = sys.stdin.read()
         data = json.loads(input_json)
         
+        if data.get('action') == 'validate':
+            print(json.dumps({"success": True, "result": validate_schedule(data)}))
+            return
+        
+        if '--stream' in sys.argv[1:] or data.get('options', {}).get('streamProgress', False):
+            run_streaming(data)
+            return
+        
         # Initialize and run the scheduler
-        scheduler = CourseScheduler(data)
+        scheduler = create_scheduler(data)
         result = scheduler.solve()
         
         # Return JSON result to stdout
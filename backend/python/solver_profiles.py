@@ -0,0 +1,118 @@
+"""
+Named CP-SAT parameter profiles and size-aware profile selection
+"""
+
+import os
+from typing import Dict, Any
+
+# CP-SAT parameters of each named profile
+SOLVER_PROFILES = {
+    # Quickest usable schedule: stop at the first feasible solution
+    "draft": {
+        "max_time_in_seconds": 30,
+        "num_workers": 8,
+        "relative_gap_limit": 0.1,
+        "stop_after_first_solution": True,
+        "random_seed": 0
+    },
+    # Small terms: near-optimal within half a minute
+    "quick": {
+        "max_time_in_seconds": 30,
+        "num_workers": 8,
+        "relative_gap_limit": 0.01,
+        "stop_after_first_solution": False,
+        "random_seed": 0
+    },
+    # Good balance in a couple of minutes
+    "balanced": {
+        "max_time_in_seconds": 120,
+        "num_workers": 8,
+        "relative_gap_limit": 0.01,
+        "stop_after_first_solution": False,
+        "random_seed": 0
+    },
+    # Search until optimal or the time limit; never picked by auto selection
+    "thorough": {
+        "max_time_in_seconds": 600,
+        "num_workers": 16,
+        "relative_gap_limit": 0.0,
+        "stop_after_first_solution": False,
+        "random_seed": 0
+    }
+}
+
+# Size limits for auto selection: small terms get the quick profile, since
+# they solve (or get within the gap) in seconds; mid-size terms get the
+# balanced profile; larger terms stop at the first feasible schedule. Every
+# auto choice stays within the former fixed 300s limit, so thorough must be
+# requested by name
+QUICK_MAX_CANDIDATES = 50000
+QUICK_MAX_PROFESSORS = 200
+BALANCED_MAX_CANDIDATES = 500000
+BALANCED_MAX_INSTANCES = 2000
+
+def select_profile(num_instances: int, num_candidates: int, num_professors: int) -> str:
+    """
+    Pick a profile name from the instance size
+
+    Args:
+        num_instances: Number of course instances
+        num_candidates: Number of candidate (instance, professor, slot) triples
+        num_professors: Number of professors
+
+    Returns:
+        Profile name
+    """
+    if num_candidates <= QUICK_MAX_CANDIDATES and num_professors <= QUICK_MAX_PROFESSORS:
+        return "quick"
+    if num_candidates <= BALANCED_MAX_CANDIDATES and num_instances <= BALANCED_MAX_INSTANCES:
+        return "balanced"
+    return "draft"
+
+def resolve_profile(options: Dict[str, Any], num_instances: int, num_candidates: int,
+                    num_professors: int) -> Dict[str, Any]:
+    """
+    Resolve the solver profile requested by the scheduler options
+
+    options.solverProfile names a profile or "auto" (the default).
+    options.maxTimeInSeconds and options.solverParameters (CP-SAT parameter
+    names) override the profile's values.
+
+    Args:
+        options: Scheduler options
+        num_instances: Number of course instances
+        num_candidates: Number of candidate (instance, professor, slot) triples
+        num_professors: Number of professors
+
+    Returns:
+        Dictionary with the profile name, whether it was auto-selected and
+        the CP-SAT parameters to apply
+    """
+    requested = options.get('solverProfile', 'auto')
+    auto = requested == 'auto'
+    name = select_profile(num_instances, num_candidates, num_professors) if auto else requested
+    if name not in SOLVER_PROFILES:
+        raise ValueError(f"Unknown solverProfile: {requested}")
+
+    parameters = dict(SOLVER_PROFILES[name])
+    parameters["num_workers"] = min(parameters["num_workers"], os.cpu_count() or 1)
+    if 'maxTimeInSeconds' in options:
+        parameters["max_time_in_seconds"] = options['maxTimeInSeconds']
+    parameters.update(options.get('solverParameters', {}))
+
+    return {
+        "name": name,
+        "auto": auto,
+        "parameters": parameters
+    }
+
+def apply_profile(solver_parameters: Any, profile: Dict[str, Any]):
+    """
+    Set a resolved profile's parameters on a CpSolver's parameters
+
+    Args:
+        solver_parameters: CpSolver.parameters
+        profile: Profile returned by resolve_profile
+    """
+    for name, value in profile["parameters"].items():
+        setattr(solver_parameters, name, value)
@@ -0,0 +1,152 @@
+"""
+Immutable time grid shared by every scheduling phase
+
+The grid is built once per input from the time slot list. It holds the
+teaching days, slot attributes as NumPy arrays, the slots of each day in start
+time order, slot-number groups (TS1, TS2, ...), duration buckets, the allowed
+day patterns for multi-class courses and the overlap/adjacency relations
+between slots.
+"""
+
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from utils import parse_time, get_day_patterns
+
+# Days on which classes can be scheduled unless options.teachingDays says otherwise
+DEFAULT_TEACHING_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday")
+
+MINUTES_PER_DAY = 24 * 60
+
+class TimeGrid:
+    """Read-only view of the time slots that fall on teaching days"""
+
+    def __init__(self, time_slots: List[Dict[str, Any]], teaching_days: Sequence[str] = DEFAULT_TEACHING_DAYS,
+                 day_patterns: Optional[Dict[Any, List[List[str]]]] = None):
+        """
+        Build the time grid
+
+        Args:
+            time_slots: Time slot dictionaries from the scheduler input
+            teaching_days: Days on which classes can be scheduled, in week order
+            day_patterns: Allowed day patterns per number of classes, e.g.
+                {"2": [["Monday", "Wednesday"], ["Tuesday", "Thursday"]]}
+                (defaults to utils.get_day_patterns)
+        """
+        self._build_days(teaching_days)
+        self._build_slots(time_slots)
+        self._build_groups()
+        self._build_relations()
+        self._day_patterns = self._build_day_patterns(day_patterns)
+
+        for value in vars(self).values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+    def _build_days(self, teaching_days: Sequence[str]):
+        """Number the teaching days and rank them for balanced distribution."""
+        self.day_names = tuple(teaching_days)
+        self.num_days = len(self.day_names)
+        if not self.num_days:
+            raise ValueError("teachingDays must contain at least one day")
+
+        # Days are matched case-insensitively against the time slot data
+        self.day_index = {day.lower(): d for d, day in enumerate(self.day_names)}
+
+        # Alternate days when filling slots (Monday, Wednesday, Tuesday, Thursday)
+        day_order = list(range(0, self.num_days, 2)) + list(range(1, self.num_days, 2))
+        self.day_priority = np.empty(self.num_days, dtype=np.int32)
+        self.day_priority[day_order] = np.arange(self.num_days, dtype=np.int32)
+
+    def _build_slots(self, time_slots: List[Dict[str, Any]]):
+        """Number the time slots on teaching days and parse their times."""
+        valid_slots = [t for t in time_slots if t.get('day_of_week', '').lower() in self.day_index]
+
+        self.slot_ids = tuple(t['timeslot_id'] for t in valid_slots)
+        self.slot_index = {slot_id: s for s, slot_id in enumerate(self.slot_ids)}
+        self.num_slots = len(self.slot_ids)
+
+        self.slot_day = np.array([self.day_index[t['day_of_week'].lower()] for t in valid_slots], dtype=np.int32)
+        self.slot_duration = np.array([t['duration_minutes'] for t in valid_slots], dtype=np.int32)
+        self.slot_start = np.array([parse_time(t.get('start_time')) for t in valid_slots], dtype=np.int32)
+        self.slot_end = np.array([parse_time(t.get('end_time')) for t in valid_slots], dtype=np.int32)
+
+        # Start/end on a week-long minute axis, so slots on different days never meet
+        self.slot_week_start = self.slot_day * MINUTES_PER_DAY + self.slot_start
+        self.slot_week_end = self.slot_day * MINUTES_PER_DAY + self.slot_end
+
+        # Slot number (TS1, TS2, etc.) is the prefix of the slot ID, e.g. TS1-MON -> TS1
+        numbers = [slot_id.split('-')[0] for slot_id in self.slot_ids]
+        self.slot_number_names = tuple(sorted(set(numbers)))
+        number_index = {number: n for n, number in enumerate(self.slot_number_names)}
+        self.slot_number = np.array([number_index[number] for number in numbers], dtype=np.int32)
+
+    def _build_groups(self):
+        """Group slot indices by day, slot number and duration."""
+        # Slots of each day, ordered by start time
+        self.slots_by_day = tuple(
+            np.flatnonzero(self.slot_day == d)[np.argsort(self.slot_start[self.slot_day == d], kind='stable')]
+            for d in range(self.num_days)
+        )
+
+        # Slots sharing a slot number (TS1, TS2, etc.), in day order
+        self.slots_by_number = tuple(
+            np.flatnonzero(self.slot_number == n) for n in range(len(self.slot_number_names))
+        )
+
+        # Slots of each duration, shortest duration first
+        self.duration_buckets = {
+            int(duration): np.flatnonzero(self.slot_duration == duration)
+            for duration in np.unique(self.slot_duration)
+        }
+
+    def _build_relations(self):
+        """Precompute slot x slot overlap and break-gap relations."""
+        same_day = self.slot_day[:, None] == self.slot_day[None, :]
+
+        # Two different slots overlap if they share a day and their times intersect
+        self.overlaps = (
+            same_day
+            & (self.slot_start[:, None] < self.slot_end[None, :])
+            & (self.slot_start[None, :] < self.slot_end[:, None])
+        )
+        np.fill_diagonal(self.overlaps, False)
+
+        # Minutes from the end of slot s1 to the start of slot s2 (-1 across days)
+        self.gap_minutes = np.where(same_day, self.slot_start[None, :] - self.slot_end[:, None], -1).astype(np.int32)
+
+    def _build_day_patterns(self, day_patterns: Optional[Dict[Any, List[List[str]]]]) -> Dict[int, tuple]:
+        """Translate the allowed day patterns into day indices, dropping non-teaching days."""
+        if day_patterns is None:
+            day_patterns = {num_classes: get_day_patterns(num_classes) for num_classes in (2, 3)}
+
+        patterns = {}
+        for num_classes, day_lists in day_patterns.items():
+            patterns[int(num_classes)] = tuple(
+                tuple(self.day_index[day.lower()] for day in days)
+                for days in day_lists
+                if len(days) == int(num_classes) and all(day.lower() in self.day_index for day in days)
+            )
+        return patterns
+
+    def day_patterns(self, num_classes: int) -> tuple:
+        """Allowed day patterns (tuples of day indices) for a course with num_classes instances."""
+        return self._day_patterns.get(num_classes, ())
+
+    def consecutive_pairs(self, min_break_minutes: int = 0) -> np.ndarray:
+        """
+        Pairs of slots that are too close together to teach both
+
+        Args:
+            min_break_minutes: Minimum break between classes; slot s2 is
+                consecutive to s1 if it starts less than this many minutes
+                after s1 ends (0 means only slots that start exactly when s1
+                ends). Overlapping slots have a negative gap and are always
+                consecutive.
+
+        Returns:
+            Array of (s1, s2) slot index pairs, each overlapping pair once
+        """
+        following = (self.gap_minutes >= 0) & (self.gap_minutes < max(min_break_minutes, 1))
+        return np.argwhere(following | np.triu(self.overlaps, 1))
@@ -3,6 +3,7 @@ Helper functions for the OR-Tools scheduler
 """
 
 import json
+from itertools import compress
 from typing import Dict, List, Any, Set, Tuple
 import uuid
 
@@ -96,13 +97,18 @@ def get_day_patterns(num_classes: int) -> List[List[str]]:
     
     return patterns.get(num_classes, [])
 
-def are_time_slots_consecutive(slot1: Dict[str, Any], slot2: Dict[str, Any]) -> bool:
+def are_time_slots_consecutive(slot1: Dict[str, Any], slot2: Dict[str, Any],
+                               min_break_minutes: int = 0) -> bool:
     """
     Check if two time slots are consecutive
     
     Args:
         slot1: First time slot dictionary
         slot2: Second time slot dictionary
+        min_break_minutes: Minimum break between classes; slot2 is consecutive
+            if it starts less than this many minutes after slot1 ends
+            (0 means only slots that start exactly when slot1 ends).
+            Overlapping slots are always consecutive.
         
     Returns:
         True if the slots are consecutive, False otherwise
@@ -111,11 +117,15 @@ def are_time_slots_consecutive(slot1: Dict[str, Any], slot2: Dict[str, Any]) ->
         return False
     
     # Parse times
+    slot1_start = parse_time(slot1.get('start_time', ''))
     slot1_end = parse_time(slot1.get('end_time', ''))
     slot2_start = parse_time(slot2.get('start_time', ''))
+    slot2_end = parse_time(slot2.get('end_time', ''))
     
-    # Consecutive if end of slot1 is the same as start of slot2
-    return slot1_end == slot2_start
+    # Consecutive if slot2 starts within the break after slot1 ends, including
+    # a negative gap when the slots overlap; slot2 must not end before slot1 starts
+    gap = slot2_start - slot1_end
+    return gap < max(min_break_minutes, 1) and slot2_end > slot1_start
 
 def extract_course_associations(course_id: str, course_programs: Dict[str, Any]) -> Tuple[List[str], bool, int]:
     """
@@ -187,61 +197,107 @@ def calculate_day_imbalance(day_counts: Dict[str, int]) -> int:
     values = list(day_counts.values())
     return max(values) - min(values)
 
+def _slot_minutes(course: Dict[str, Any]) -> Tuple[int, int]:
+    """Start and end minutes of a scheduled course entry, from the entry or its time_slot_data."""
+    slot = course.get('time_slot_data') or {}
+    return (parse_time(course.get('start_time') or slot.get('start_time')),
+            parse_time(course.get('end_time') or slot.get('end_time')))
+
+def _group_by(courses: List[Dict[str, Any]], keys: List[Any]) -> Dict[Any, List[Dict[str, Any]]]:
+    """Courses grouped by key (keys run parallel to courses), in input order."""
+    groups = {}
+    for course, key in zip(courses, keys):
+        if key in groups:
+            groups[key].append(course)
+        else:
+            groups[key] = [course]
+    return groups
+
+def _course_field(courses: List[Dict[str, Any]], key: str) -> List[Any]:
+    """Field of each course entry, read from its course_data where the entry lacks it."""
+    values = [c.get(key) for c in courses]
+    if None in values:
+        values = [(c.get('course_data') or {}).get(key) if value is None else value
+                  for c, value in zip(courses, values)]
+    return values
+
 def detect_time_slot_conflicts(scheduled_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Detect conflicts where multiple courses are scheduled in the same time slot
+    Detect conflicts between courses scheduled in the same or overlapping time slots
+    
+    Courses are grouped by (day, slot) in one pass; each slot then keeps the
+    set of its professors and its core courses by program, and courses are
+    grouped by professor only in slots where a professor appears twice.
+    Conflicts found:
+    - CORE_COURSE_CONFLICT: several core courses in the same slot
+    - PROFESSOR_CONFLICT: a professor teaching several courses in the same slot
+    - PROGRAM_CONFLICT: core (required) courses of the same program in the
+      same or overlapping slots
+    - SLOT_OVERLAP_CONFLICT: a professor teaching in two different slots whose
+      times overlap
+    Overlaps are found by sorting each day's slots by start time, so only
+    slots whose parsed times intersect are compared.
     
     Args:
-        scheduled_courses: List of scheduled course dictionaries
-        
+        scheduled_courses: List of scheduled course dictionaries; is_core and
+            program_ids are read from the entry or its course_data, start_time
+            and end_time from the entry or its time_slot_data
+    
     Returns:
         List of conflicts
     """
     conflicts = []
     
-    # Group courses by time slot
-    courses_by_slot = {}
-    
+    # Courses of each (day, slot) in input order
+    slot_courses = {}
     for course in scheduled_courses:
         day = course.get('day_of_week')
         slot_id = course.get('timeslot_id')
-        
         if day and slot_id:
-            key = f"{day}_{slot_id}"
-            
-            if key not in courses_by_slot:
-                courses_by_slot[key] = []
-            
-            courses_by_slot[key].append(course)
+            key = (day, slot_id)
+            if key in slot_courses:
+                slot_courses[key].append(course)
+            else:
+                slot_courses[key] = [course]
     
-    # Check for conflicts
-    for slot_key, courses in courses_by_slot.items():
-        if len(courses) > 1:
-            day, slot_id = slot_key.split('_')
-            
-            # Check for core course conflicts
-            core_courses = [c for c in courses if c.get('is_core', False)]
-            if len(core_courses) > 1:
-                conflicts.append({
-                    "conflict_type": "CORE_COURSE_CONFLICT",
-                    "day_of_week": day,
-                    "timeslot_id": slot_id,
-                    "courses": core_courses,
-                    "description": f"Multiple core courses scheduled at the same time"
-                })
-            
-            # Check for professor conflicts
-            professors = {}
-            for course in courses:
-                prof_id = course.get('professor_id')
-                if prof_id:
-                    if prof_id not in professors:
-                        professors[prof_id] = []
-                    
-                    professors[prof_id].append(course)
-            
-            for prof_id, prof_courses in professors.items():
-                if len(prof_courses) > 1:
+    # Per slot: its professors, the courses of each repeated professor, and
+    # its core courses per program
+    slot_professors = {}
+    slot_programs = {}
+    for (day, slot_id), courses in slot_courses.items():
+        professor_ids = [c.get('professor_id') for c in courses]
+        professors = set(professor_ids)
+        professors.discard(None)
+        professors.discard('')
+        slot_professors[(day, slot_id)] = professors
+    
+        core_courses = list(compress(courses, _course_field(courses, 'is_core')))
+        program_lists = [program_ids or () for program_ids in _course_field(core_courses, 'program_ids')]
+        by_program = {}
+        for course, program_ids in zip(core_courses, program_lists):
+            for program_id in program_ids:
+                if program_id in by_program:
+                    by_program[program_id].append(course)
+                else:
+                    by_program[program_id] = [course]
+        slot_programs[(day, slot_id)] = by_program
+    
+        if len(courses) < 2:
+            continue
+    
+        if len(core_courses) > 1:
+            conflicts.append({
+                "conflict_type": "CORE_COURSE_CONFLICT",
+                "day_of_week": day,
+                "timeslot_id": slot_id,
+                "courses": core_courses,
+                "description": "Multiple core courses scheduled at the same time"
+            })
+    
+        # Only group by professor when some professor appears twice
+        if len(professors) < sum(map(bool, professor_ids)):
+            for prof_id, prof_courses in _group_by(courses, professor_ids).items():
+                if prof_id and len(prof_courses) > 1:
                     conflicts.append({
                         "conflict_type": "PROFESSOR_CONFLICT",
                         "day_of_week": day,
@@ -251,4 +307,55 @@ def detect_time_slot_conflicts(scheduled_courses: List[Dict[str, Any]]) -> List[
                         "description": f"Professor {prof_id} is scheduled to teach multiple courses at the same time"
                     })
     
-    return conflicts
\ No newline at end of file
+        for program_id, program_courses in by_program.items():
+            if len(program_courses) > 1:
+                conflicts.append({
+                    "conflict_type": "PROGRAM_CONFLICT",
+                    "day_of_week": day,
+                    "timeslot_id": slot_id,
+                    "program_id": program_id,
+                    "courses": program_courses,
+                    "description": f"Required courses of program {program_id} are scheduled at the same time"
+                })
+    
+    # Conflicts between different slots of a day whose times overlap
+    slots_by_day = {}
+    for (day, slot_id), courses in slot_courses.items():
+        start, end = _slot_minutes(courses[0])
+        if end > start:
+            slots_by_day.setdefault(day, []).append((start, end, slot_id))
+    
+    for day, slots in slots_by_day.items():
+        slots.sort()
+        for a, (start_a, end_a, slot_a) in enumerate(slots):
+            for start_b, end_b, slot_b in slots[a + 1:]:
+                if start_b >= end_a:
+                    break
+                shared = slot_professors[(day, slot_a)] & slot_professors[(day, slot_b)]
+                for prof_id in shared:
+                    conflicts.append({
+                        "conflict_type": "SLOT_OVERLAP_CONFLICT",
+                        "day_of_week": day,
+                        "timeslot_id": slot_a,
+                        "other_timeslot_id": slot_b,
+                        "professor_id": prof_id,
+                        "courses": [c for c in slot_courses[(day, slot_a)] + slot_courses[(day, slot_b)]
+                                    if c.get('professor_id') == prof_id],
+                        "description": f"Professor {prof_id} is scheduled in overlapping time slots {slot_a} and {slot_b}"
+                    })
+    
+                programs_a = slot_programs[(day, slot_a)]
+                programs_b = slot_programs[(day, slot_b)]
+                for program_id in programs_a.keys() & programs_b.keys():
+                    conflicts.append({
+                        "conflict_type": "PROGRAM_CONFLICT",
+                        "day_of_week": day,
+                        "timeslot_id": slot_a,
+                        "other_timeslot_id": slot_b,
+                        "program_id": program_id,
+                        "courses": programs_a[program_id] + programs_b[program_id],
+                        "description": f"Required courses of program {program_id} are scheduled in overlapping "
+                                       f"time slots {slot_a} and {slot_b}"
+                    })
+    
+    return conflicts
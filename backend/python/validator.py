@@ -0,0 +1,269 @@
+"""
+Independent checker for finished schedules
+
+Re-verifies the hard rules of the CP-SAT model on a list of scheduled course
+rows, whether they come from the solver or from admin overrides:
+- the professor is qualified for the course
+- the professor is available in the slot
+- a professor teaches at most one class per slot and no two overlapping
+  classes, whichever conflict model produced the schedule
+- a professor has the minimum break between two classes on the same day
+- the classes of a multi-class course follow one of the grid's day patterns
+- the classes of a multi-class course share one slot number (TS1, TS2, ...)
+
+Rows are grouped with hash indexes in a single pass, and each professor's
+day is sorted on its own, so the time grows linearly with the number of
+rows. The module only needs NumPy and does not import OR-Tools.
+"""
+
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
+
+from time_grid import TimeGrid, DEFAULT_TEACHING_DAYS
+
+# Rules in the order they are reported
+RULES = (
+    "unknown_reference",
+    "duplicate_instance",
+    "qualification",
+    "availability",
+    "double_booking",
+    "overlapping_classes",
+    "back_to_back",
+    "incomplete_course",
+    "day_pattern",
+    "slot_number"
+)
+
+class ScheduleValidator:
+    """Checks scheduled course rows against the hard rules of one scheduler input"""
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Index the scheduler input
+
+        Args:
+            data: Scheduler input (courses, professors, timeSlots,
+                professorAvailability, professorCourses and options). The
+                minBreakMinutes, teachingDays and dayPatterns options are
+                honoured as in the solver.
+        """
+        options = data.get('options', {})
+        self.min_break_minutes = options.get('minBreakMinutes', 30)
+        self.grid = TimeGrid(data['timeSlots'], options.get('teachingDays', DEFAULT_TEACHING_DAYS),
+                             options.get('dayPatterns'))
+
+        self.courses = {c['course_id']: c for c in data['courses']}
+        self.professors = {p['professor_id']: p for p in data['professors']}
+
+        # Qualified (professor, course) pairs; without professorCourses,
+        # professors teach the courses of their own department
+        professor_courses = data.get('professorCourses', [])
+        self.qualified = {(pc['professor_id'], pc['course_id']) for pc in professor_courses}
+        self.use_departments = not professor_courses
+
+        # Slot IDs each professor with availability data is available in
+        self.available = {}
+        availability = data.get('professorAvailability')
+        if isinstance(availability, dict):
+            for prof_id, days in availability.items():
+                self.available[prof_id] = {slot_id for slot_ids in days.values() for slot_id in slot_ids}
+
+        grid = self.grid
+        self.slot_day = grid.slot_day.tolist()
+        self.slot_start = grid.slot_start.tolist()
+        self.slot_end = grid.slot_end.tolist()
+        self.slot_number = grid.slot_number.tolist()
+
+    def _is_qualified(self, prof_id: str, course_id: str) -> bool:
+        """Whether the professor may teach the course."""
+        if self.use_departments:
+            return self.professors[prof_id].get('department_id') == self.courses[course_id].get('department_id')
+        return (prof_id, course_id) in self.qualified
+
+    def _violation(self, rule: str, message: str, row: Dict[str, Any],
+                   other: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Violation entry naming the offending row and, for pairwise rules, the other row."""
+        return {
+            "rule": rule,
+            "message": message,
+            "scheduled_course_id": row.get('scheduled_course_id'),
+            "course_id": row.get('course_id'),
+            "class_instance": row.get('class_instance', 1),
+            "professor_id": row.get('professor_id'),
+            "timeslot_id": row.get('timeslot_id'),
+            "is_override": bool(row.get('is_override', False)),
+            "other_scheduled_course_id": other.get('scheduled_course_id') if other else None
+        }
+
+    def validate(self, scheduled_courses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Check every row of a schedule
+
+        Args:
+            scheduled_courses: Rows shaped like result.scheduled_courses
+                (scheduled_course_id, course_id, class_instance,
+                professor_id, timeslot_id, is_override)
+
+        Returns:
+            Dictionary with valid, rows, violations (rule, message and the
+            IDs of the rows involved), counts per rule and seconds
+        """
+        start = time.perf_counter()
+
+        violations = self._check_rows(scheduled_courses)
+
+        counts = defaultdict(int)
+        for violation in violations:
+            counts[violation["rule"]] += 1
+        return {
+            "valid": not violations,
+            "rows": len(scheduled_courses),
+            "violations": violations,
+            "counts": {rule: counts[rule] for rule in RULES if counts[rule]},
+            "seconds": round(time.perf_counter() - start, 6)
+        }
+
+    def _check_rows(self, scheduled_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Index the rows by professor day and by course, checking each row on the way."""
+        violations = []
+        slot_index = self.grid.slot_index
+
+        # Rows per (professor, day) and per course, with their slot index
+        professor_days = defaultdict(list)
+        course_rows = defaultdict(dict)
+
+        for row in scheduled_courses:
+            course_id = row.get('course_id')
+            prof_id = row.get('professor_id')
+            s = slot_index.get(row.get('timeslot_id'))
+
+            if course_id not in self.courses:
+                violations.append(self._violation("unknown_reference", f"Unknown course {course_id}", row))
+                continue
+            if prof_id not in self.professors:
+                violations.append(self._violation("unknown_reference", f"Unknown professor {prof_id}", row))
+                continue
+            if s is None:
+                violations.append(self._violation(
+                    "unknown_reference", f"Unknown time slot {row.get('timeslot_id')} or not on a teaching day", row
+                ))
+                continue
+
+            instance = row.get('class_instance', 1)
+            instances = course_rows[course_id]
+            if instance in instances:
+                violations.append(self._violation(
+                    "duplicate_instance", f"Course {course_id} has instance {instance} more than once",
+                    row, instances[instance][0]
+                ))
+                continue
+            instances[instance] = (row, s)
+
+            if not self._is_qualified(prof_id, course_id):
+                violations.append(self._violation(
+                    "qualification", f"Professor {prof_id} is not qualified for {course_id}", row
+                ))
+            available = self.available.get(prof_id)
+            if available is not None and row['timeslot_id'] not in available:
+                violations.append(self._violation(
+                    "availability", f"Professor {prof_id} is not available in {row['timeslot_id']}", row
+                ))
+
+            professor_days[(prof_id, self.slot_day[s])].append((self.slot_start[s], self.slot_end[s], s, row))
+
+        for (prof_id, _), classes in professor_days.items():
+            if len(classes) > 1:
+                violations.extend(self._check_professor_day(prof_id, classes))
+
+        for course_id, instances in course_rows.items():
+            violations.extend(self._check_course(course_id, instances))
+        return violations
+
+    def _check_professor_day(self, prof_id: str, classes: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Double-booking, overlap and break checks for one professor's classes on one day
+
+        After sorting by start time, each class is compared with the class
+        that ends last among the earlier ones, which is the only one that can
+        overlap it or leave too short a break before it.
+        """
+        violations = []
+        classes.sort(key=lambda entry: (entry[0], entry[1]))
+        latest = classes[0]
+
+        for entry in classes[1:]:
+            start, end, s, row = entry
+            latest_end, latest_s, latest_row = latest[1], latest[2], latest[3]
+
+            if s == latest_s:
+                violations.append(self._violation(
+                    "double_booking", f"Professor {prof_id} teaches twice in {row['timeslot_id']}", row, latest_row
+                ))
+            elif start < latest_end:
+                violations.append(self._violation(
+                    "overlapping_classes",
+                    f"Professor {prof_id} teaches overlapping classes in {latest_row['timeslot_id']} "
+                    f"and {row['timeslot_id']}", row, latest_row
+                ))
+            elif start - latest_end < max(self.min_break_minutes, 1):
+                violations.append(self._violation(
+                    "back_to_back",
+                    f"Professor {prof_id} has {start - latest_end} minutes between {latest_row['timeslot_id']} "
+                    f"and {row['timeslot_id']} (minimum {self.min_break_minutes})", row, latest_row
+                ))
+
+            if end > latest_end:
+                latest = entry
+        return violations
+
+    def _check_course(self, course_id: str, instances: Dict[int, tuple]) -> List[Dict[str, Any]]:
+        """Instance count, day pattern and slot number checks for one course."""
+        grid = self.grid
+        num_classes = self.courses[course_id].get('num_classes', 1)
+        ordered = [instances[k] for k in sorted(instances)]
+        first_row = ordered[0][0]
+
+        if len(instances) != num_classes or any(not 1 <= k <= num_classes for k in instances):
+            return [self._violation(
+                "incomplete_course",
+                f"Course {course_id} has instances {sorted(instances)} of {num_classes} classes", first_row
+            )]
+        if num_classes == 1:
+            return []
+
+        violations = []
+        days = tuple(self.slot_day[s] for _, s in ordered)
+        patterns = grid.day_patterns(num_classes)
+        if patterns and days not in patterns:
+            allowed = ", ".join("/".join(grid.day_names[d][:3] for d in pattern) for pattern in patterns)
+            violations.append(self._violation(
+                "day_pattern",
+                f"Course {course_id} meets on {'/'.join(grid.day_names[d][:3] for d in days)}, "
+                f"not one of {allowed}", first_row
+            ))
+
+        numbers = {self.slot_number[s] for _, s in ordered}
+        if len(numbers) > 1:
+            names = ", ".join(sorted(grid.slot_number_names[n] for n in numbers))
+            violations.append(self._violation(
+                "slot_number", f"Course {course_id} uses slot numbers {names} across its classes", first_row
+            ))
+        return violations
+
+def validate_schedule(data: Dict[str, Any], scheduled_courses: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Validate a schedule against a scheduler input
+
+    Args:
+        data: Scheduler input; its scheduledCourses are validated unless
+            scheduled_courses is given
+        scheduled_courses: Rows to validate
+
+    Returns:
+        Validation report (see ScheduleValidator.validate)
+    """
+    if scheduled_courses is None:
+        scheduled_courses = data.get('scheduledCourses', [])
+    return ScheduleValidator(data).validate(scheduled_courses)